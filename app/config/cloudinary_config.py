@@ -1,6 +1,9 @@
+import logging
 import os
 from .environment import EnvironmentConfig
 
+logger = logging.getLogger(__name__)
+
 # Read all config from environment variables
 CLOUDINARY_CLOUD_NAME = os.getenv("CLOUDINARY_CLOUD_NAME")
 CLOUDINARY_API_KEY = os.getenv("CLOUDINARY_API_KEY")
@@ -26,29 +29,55 @@ if ENVIRONMENT != "testing":
                 api_secret=CLOUDINARY_API_SECRET
             )  # type: ignore
     except ImportError:
-        print("Warning: Cloudinary not available. Using local storage only.")
+        logger.warning("Cloudinary not available. Using local storage only.")
 
 ALLOWED_TYPES = {"image/jpeg", "image/png", "image/webp"}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 
-def upload_image(file, folder="cyclopedia_uploads"):
+def local_image_path(key):
+    """Sharded location of a content-addressed image under static/uploads"""
+    from pathlib import Path
+    return Path(key[:2]) / key[2:4] / key
+
+
+def upload_image(file, key, folder="cyclopedia_uploads"):
+    """
+    Store an already validated image, read from the binary file object `file`, under
+    its content key (SHA-256 plus extension).
+    Identical bytes always map to the same local file or Cloudinary public_id, so storing
+    them twice is a no-op. Blocking; call it from the threadpool.
+    """
     if ENVIRONMENT == "development":
         # Save locally only for development
+        import shutil
+        import tempfile
         from pathlib import Path
-        uploads_dir = Path("static/uploads")
-        uploads_dir.mkdir(parents=True, exist_ok=True)
-        file_path = uploads_dir / file.filename
-        with open(file_path, "wb") as buffer:
-            buffer.write(file.file.read())
-        return f"/static/uploads/{file.filename}"
+        relative = local_image_path(key)
+        target = Path("static/uploads") / relative
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=".upload-")
+            with os.fdopen(fd, "wb") as tmp:
+                shutil.copyfileobj(file, tmp)
+            os.replace(tmp_path, target)
+        return f"/static/uploads/{relative.as_posix()}"
     elif ENVIRONMENT == "testing":
         # For testing, return a mock path
-        return f"/static/uploads/{file.filename}"
+        return f"/static/uploads/{key}"
     else:
         # Upload to Cloudinary for production and any other environment
-        return upload_image_to_cloudinary(file.file, filename=file.filename, folder=folder)
+        return upload_image_to_cloudinary(file, filename=key.split(".")[0], folder=folder, overwrite=False)
+
 
-def upload_image_to_cloudinary(file, filename=None, folder="cyclopedia_uploads"):
+def delete_image(image_url):
+    """Remove a stored image, whether it lives in static/uploads or on Cloudinary"""
+    if image_url and image_url.startswith("/static/uploads/"):
+        from pathlib import Path
+        Path(image_url.lstrip("/")).unlink(missing_ok=True)
+    else:
+        delete_image_from_cloudinary(image_url)
+
+def upload_image_to_cloudinary(file, filename=None, folder="cyclopedia_uploads", overwrite=True):
     if ENVIRONMENT == "testing":
         # In testing, just return local path
         return f"/static/uploads/{filename or 'uploaded_image'}"
@@ -59,6 +88,7 @@ def upload_image_to_cloudinary(file, filename=None, folder="cyclopedia_uploads")
             folder=folder,
             resource_type="image",
             public_id=filename,
+            overwrite=overwrite,
             transformation=[
                 {"quality": "auto", "fetch_format": "auto"}
             ]
@@ -67,27 +97,67 @@ def upload_image_to_cloudinary(file, filename=None, folder="cyclopedia_uploads")
     except Exception as e:
         raise Exception(f"Failed to upload image to Cloudinary: {str(e)}")
 
+def cloudinary_public_id(image_url):
+    """Extract the Cloudinary public_id from a delivery URL; other values are returned unchanged"""
+    if image_url.startswith("http"):
+        parts = image_url.split("/")
+        if "cyclopedia_uploads" in parts:
+            upload_index = parts.index("cyclopedia_uploads")
+            return "/".join(parts[upload_index:-1]) + "/" + parts[-1].split(".")[0]
+    return image_url
+
 def delete_image_from_cloudinary(public_id):
     if ENVIRONMENT == "testing":
         # In testing, do nothing
         return
     try:
         if public_id and not public_id.startswith("/static/default/"):
-            if public_id.startswith("http"):
-                parts = public_id.split("/")
-                if "cyclopedia_uploads" in parts:
-                    upload_index = parts.index("cyclopedia_uploads")
-                    public_id = "/".join(parts[upload_index:-1]) + "/" + parts[-1].split(".")[0]
+            public_id = cloudinary_public_id(public_id)
             import cloudinary.uploader  # type: ignore
             cloudinary.uploader.destroy(public_id)
     except Exception as e:
-        print(f"Failed to delete image from Cloudinary: {str(e)}")
+        logger.warning("Failed to delete image from Cloudinary: %s", e)
+
+CLOUDINARY_DELETE_BATCH_SIZE = 100  # Most public ids the Admin API accepts per delete_resources call
+
+def _delete_cloudinary_batch(public_ids):
+    import cloudinary.api  # type: ignore
+    result = cloudinary.api.delete_resources(public_ids, resource_type="image")
+    return sum(1 for outcome in result.get("deleted", {}).values() if outcome not in ("deleted", "not_found"))
 
-def get_cloudinary_url_from_db_url(db_url):
+def delete_images(image_urls, max_workers=4):
     """
-    Convert database URL to Cloudinary URL if it's a local path
+    Delete many stored images at once: local files are unlinked, Cloudinary assets go
+    through the bulk delete API in batches with at most `max_workers` calls in flight.
+    Images that are already gone count as deleted. Returns the number of failures.
     """
-    if db_url and db_url.startswith("/static/uploads/"):
-        # This is a legacy local file, return default
-        return DEFAULT_IMAGE_URL
-    return db_url 
\ No newline at end of file
+    if ENVIRONMENT == "testing":
+        # In testing, do nothing
+        return 0
+    from concurrent.futures import ThreadPoolExecutor
+    from pathlib import Path
+    errors = 0
+    public_ids = []
+    for image_url in image_urls:
+        if image_url.startswith("/static/uploads/"):
+            try:
+                Path(image_url.lstrip("/")).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning("Failed to delete local image %s: %s", image_url, e)
+                errors += 1
+        elif not image_url.startswith("/static/"):
+            public_ids.append(cloudinary_public_id(image_url))
+
+    batch_size = CLOUDINARY_DELETE_BATCH_SIZE
+    batches = [public_ids[i:i + batch_size] for i in range(0, len(public_ids), batch_size)]
+    if not batches:
+        return errors
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_delete_cloudinary_batch, batch) for batch in batches]
+        for batch, future in zip(batches, futures):
+            try:
+                errors += future.result()
+            except Exception as e:
+                logger.warning("Failed to delete %d images from Cloudinary: %s", len(batch), e)
+                errors += len(batch)
+    return errors
@@ -63,3 +63,28 @@ def get_fk_reference(table_name):
     if is_sqlite():
         return f"{table_name}.id"
     return f"cyclopedia_owner.{table_name}.id"
+
+def attach_sqlite_fts(table, columns):
+    """
+    Create an external-content FTS5 index for `table` whenever the table itself is
+    created on SQLite, plus the triggers that keep it in sync on writes.
+    The index is keyed by the table's rowid; run
+    INSERT INTO <table>_fts(<table>_fts) VALUES('rebuild') after a VACUUM.
+    """
+    name = table.name
+    fts = f"{name}_fts"
+    cols = ", ".join(columns)
+    new_values = ", ".join(f"new.{c}" for c in columns)
+    old_values = ", ".join(f"old.{c}" for c in columns)
+    statements = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{name}', content_rowid='rowid')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {name} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_values}); END",
+    ]
+    for statement in statements:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
@@ -8,11 +8,20 @@ from app.routers.forums.forums import router as forums_router
 from fastapi.staticfiles import StaticFiles
 from app.middleware.log_to_mongo import MongoLoggingMiddleware
 from app.routers.logs.logs import router as logs_router
+from app.routers.search.search import router as search_router
 from app.config.postgres_config import Base, attach_schema_event
+from app.services.image_uploads import image_upload_queue
+from app.services.bulk_delete import resume_delete_jobs
+from app.services.cache import response_cache
+from app.services.comment_events import comment_events
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Pick up DELETE /posts/all jobs interrupted by a restart
+    resume_delete_jobs()
     yield
+    # Let in-flight image uploads finish and record their status
+    image_upload_queue.shutdown(wait=True)
 
 app = FastAPI(lifespan=lifespan)
 
@@ -34,6 +43,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
 app.add_middleware(MongoLoggingMiddleware)
@@ -43,6 +53,7 @@ app.include_router(posts_router)
 app.include_router(users_router)
 app.include_router(forums_router)
 app.include_router(logs_router)
+app.include_router(search_router)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -52,4 +63,12 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/health/cache")
+def cache_stats():
+    return response_cache.stats()
+
+@app.get("/health/streams")
+def stream_stats():
+    return comment_events.stats()
@@ -22,7 +22,7 @@ from app.config.postgres_config import Base
 from app.routers.users.models import Users
 from app.routers.posts.models import Posts
 from app.routers.comments.models import Comments, CommentLike
-from app.routers.forums.models import Forums, ForumLike, ForumComment, ForumCommentLike
+from app.routers.forums.models import Forums, ForumLike
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,30 @@
+"""comment parent indexes
+
+Revision ID: 0b7d3e5a9c21
+Revises: c2f8a41d9e07
+Create Date: 2026-10-17 21:02:45.118736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7d3e5a9c21'
+down_revision: Union[str, None] = 'c2f8a41d9e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_comments_parent_id', 'comments', ['parent_id'], unique=False)
+    op.create_index('ix_forum_comments_parent_id', 'forum_comments', ['parent_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_forum_comments_parent_id', table_name='forum_comments')
+    op.drop_index('ix_comments_parent_id', table_name='comments')
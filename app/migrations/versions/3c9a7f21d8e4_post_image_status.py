@@ -0,0 +1,29 @@
+"""post image status
+
+Revision ID: 3c9a7f21d8e4
+Revises: b7e2d4c19a53
+Create Date: 2026-10-17 16:22:47.903115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a7f21d8e4'
+down_revision: Union[str, None] = 'b7e2d4c19a53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('image_status', sa.String(length=16), server_default='ready', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.drop_column('image_status')
@@ -0,0 +1,46 @@
+"""post stats
+
+Revision ID: 41a445f832a9
+Revises: 926fee98fc58
+Create Date: 2026-10-17 14:05:47.661920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '41a445f832a9'
+down_revision: Union[str, None] = '926fee98fc58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    post_stats = op.create_table('post_stats',
+    sa.Column('post_id', sa.String(length=255), nullable=False),
+    sa.Column('stat', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('post_id', 'stat')
+    )
+    op.create_index('ix_post_stats_stat_value', 'post_stats', ['stat', 'value', 'post_id'], unique=False)
+
+    # Backfill the projection from the existing JSON stats
+    posts = sa.table('posts', sa.column('id', sa.String), sa.column('stats', sa.JSON))
+    rows = []
+    for post_id, stats in op.get_bind().execute(sa.select(posts.c.id, posts.c.stats)):
+        for name, value in (stats or {}).items():
+            if isinstance(value, (int, float)):
+                rows.append({'post_id': post_id, 'stat': name, 'value': float(value)})
+    if rows:
+        op.bulk_insert(post_stats, rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_post_stats_stat_value', table_name='post_stats')
+    op.drop_table('post_stats')
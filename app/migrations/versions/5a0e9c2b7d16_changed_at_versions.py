@@ -0,0 +1,42 @@
+"""changed_at versions
+
+Revision ID: 5a0e9c2b7d16
+Revises: 8d15c3e9f6b0
+Create Date: 2026-10-17 18:31:56.610482
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a0e9c2b7d16'
+down_revision: Union[str, None] = '8d15c3e9f6b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('changed_at', sa.DateTime(), nullable=True))
+    op.add_column('forums', sa.Column('changed_at', sa.DateTime(), nullable=True))
+    op.add_column('comments', sa.Column('changed_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE posts SET changed_at = timestamp")
+    op.execute("UPDATE forums SET changed_at = COALESCE(updated_timestamp, timestamp)")
+    op.execute("UPDATE comments SET changed_at = timestamp")
+    op.create_index('ix_posts_changed_at', 'posts', ['changed_at'], unique=False)
+    op.create_index('ix_comments_post_id_changed_at', 'comments', ['post_id', 'changed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_comments_post_id_changed_at', table_name='comments')
+    op.drop_index('ix_posts_changed_at', table_name='posts')
+    with op.batch_alter_table('comments') as batch_op:
+        batch_op.drop_column('changed_at')
+    with op.batch_alter_table('forums') as batch_op:
+        batch_op.drop_column('changed_at')
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.drop_column('changed_at')
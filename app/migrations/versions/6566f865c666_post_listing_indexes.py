@@ -0,0 +1,30 @@
+"""post listing indexes
+
+Revision ID: 6566f865c666
+Revises: 5face0d7b746
+Create Date: 2026-10-17 09:12:31.104233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6566f865c666'
+down_revision: Union[str, None] = '5face0d7b746'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_posts_timestamp_id', 'posts', ['timestamp', 'id'], unique=False)
+    op.create_index('ix_post_likes_post_id', 'post_likes', ['post_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_post_likes_post_id', table_name='post_likes')
+    op.drop_index('ix_posts_timestamp_id', table_name='posts')
@@ -0,0 +1,50 @@
+"""comment keyset indexes
+
+Revision ID: 7e4c1a9b2f58
+Revises: 0b7d3e5a9c21
+Create Date: 2026-10-17 21:48:09.530217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e4c1a9b2f58'
+down_revision: Union[str, None] = '0b7d3e5a9c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Every comment listing orders by (timestamp, id) after an equality filter on one of these
+    # columns; the parent_id variants lead with parent_id and replace the single-column indexes
+    op.drop_index('ix_comments_parent_id', table_name='comments')
+    op.drop_index('ix_forum_comments_parent_id', table_name='forum_comments')
+    op.create_index('ix_comments_timestamp_id', 'comments', ['timestamp', 'id'], unique=False)
+    op.create_index('ix_comments_post_id_timestamp_id', 'comments', ['post_id', 'timestamp', 'id'], unique=False)
+    op.create_index('ix_comments_forum_id_timestamp_id', 'comments', ['forum_id', 'timestamp', 'id'], unique=False)
+    op.create_index('ix_comments_parent_id_timestamp_id', 'comments', ['parent_id', 'timestamp', 'id'], unique=False)
+    op.create_index('ix_forum_comments_timestamp_id', 'forum_comments', ['timestamp', 'id'], unique=False)
+    op.create_index(
+        'ix_forum_comments_forum_id_timestamp_id', 'forum_comments', ['forum_id', 'timestamp', 'id'], unique=False
+    )
+    op.create_index(
+        'ix_forum_comments_parent_id_timestamp_id', 'forum_comments', ['parent_id', 'timestamp', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_forum_comments_parent_id_timestamp_id', table_name='forum_comments')
+    op.drop_index('ix_forum_comments_forum_id_timestamp_id', table_name='forum_comments')
+    op.drop_index('ix_forum_comments_timestamp_id', table_name='forum_comments')
+    op.drop_index('ix_comments_parent_id_timestamp_id', table_name='comments')
+    op.drop_index('ix_comments_forum_id_timestamp_id', table_name='comments')
+    op.drop_index('ix_comments_post_id_timestamp_id', table_name='comments')
+    op.drop_index('ix_comments_timestamp_id', table_name='comments')
+    op.create_index('ix_forum_comments_parent_id', 'forum_comments', ['parent_id'], unique=False)
+    op.create_index('ix_comments_parent_id', 'comments', ['parent_id'], unique=False)
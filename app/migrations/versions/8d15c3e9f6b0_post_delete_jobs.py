@@ -0,0 +1,41 @@
+"""post delete jobs
+
+Revision ID: 8d15c3e9f6b0
+Revises: e41f0b6c7a2d
+Create Date: 2026-10-17 17:48:03.226871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d15c3e9f6b0'
+down_revision: Union[str, None] = 'e41f0b6c7a2d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'post_delete_jobs',
+        sa.Column('id', sa.String(length=255), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('requested_by', sa.String(length=255), nullable=True),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('deleted', sa.Integer(), nullable=False),
+        sa.Column('image_errors', sa.Integer(), nullable=False),
+        sa.Column('pending_images', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('post_delete_jobs')
@@ -0,0 +1,80 @@
+"""full text search
+
+Revision ID: 926fee98fc58
+Revises: 6566f865c666
+Create Date: 2026-10-17 11:40:02.518377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '926fee98fc58'
+down_revision: Union[str, None] = '6566f865c666'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(author, '')), 'C')"
+)
+SEARCH_COLUMNS = ['title', 'content', 'author']
+
+
+def _create_sqlite_fts(table: str) -> None:
+    fts = f"{table}_fts"
+    cols = ", ".join(SEARCH_COLUMNS)
+    new_values = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+    old_values = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+    op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}', content_rowid='rowid')")
+    op.execute(
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_values}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_values}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_values}); END"
+    )
+    # Index the rows that already exist
+    op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def _drop_sqlite_fts(table: str) -> None:
+    fts = f"{table}_fts"
+    for suffix in ("ai", "ad", "au"):
+        op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+    op.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        _create_sqlite_fts('posts')
+        _create_sqlite_fts('forums')
+        return
+    for table in ('posts', 'forums'):
+        op.add_column(table, sa.Column(
+            'search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True), nullable=True
+        ))
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        _drop_sqlite_fts('forums')
+        _drop_sqlite_fts('posts')
+        return
+    for table in ('forums', 'posts'):
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
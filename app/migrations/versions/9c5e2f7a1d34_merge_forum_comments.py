@@ -0,0 +1,86 @@
+"""merge forum comments
+
+Revision ID: 9c5e2f7a1d34
+Revises: f3a6d2b8c419
+Create Date: 2026-10-17 23:12:40.218735
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c5e2f7a1d34'
+down_revision: Union[str, None] = 'f3a6d2b8c419'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Forum comments move into comments, where forum_id (and no post_id) marks them
+    op.execute("""
+        INSERT INTO comments
+            (id, comment, post_id, forum_id, user_id, parent_id, likes, username, timestamp, changed_at)
+        SELECT id, comment, NULL, forum_id, user_id, parent_id, likes, username, timestamp, timestamp
+        FROM forum_comments
+    """)
+    op.execute("""
+        INSERT INTO comment_likes (id, comment_id, user_id, created_at)
+        SELECT id, comment_id, user_id, timestamp FROM forum_comment_likes
+    """)
+    op.drop_table('forum_comment_likes')
+    op.drop_table('forum_comments')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_table('forum_comments',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('comment', sa.String(length=255), nullable=False),
+    sa.Column('forum_id', sa.String(length=255), nullable=False),
+    sa.Column('user_id', sa.String(length=255), nullable=False),
+    sa.Column('parent_id', sa.String(length=255), nullable=True),
+    sa.Column('likes', sa.Integer(), nullable=True),
+    sa.Column('username', sa.String(length=255), nullable=True),
+    sa.Column('timestamp', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['forum_id'], ['forums.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_forum_comments_timestamp_id', 'forum_comments', ['timestamp', 'id'], unique=False)
+    op.create_index(
+        'ix_forum_comments_forum_id_timestamp_id', 'forum_comments', ['forum_id', 'timestamp', 'id'], unique=False
+    )
+    op.create_index(
+        'ix_forum_comments_parent_id_timestamp_id', 'forum_comments', ['parent_id', 'timestamp', 'id'], unique=False
+    )
+    op.create_table('forum_comment_likes',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('comment_id', sa.String(length=255), nullable=False),
+    sa.Column('user_id', sa.String(length=255), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['comment_id'], ['forum_comments.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'comment_id', name='_user_forum_comment_uc')
+    )
+    op.create_index(
+        'ix_forum_comment_likes_comment_id_timestamp', 'forum_comment_likes', ['comment_id', 'timestamp', 'id'],
+        unique=False
+    )
+
+    op.execute("""
+        INSERT INTO forum_comments (id, comment, forum_id, user_id, parent_id, likes, username, timestamp)
+        SELECT id, comment, forum_id, user_id, parent_id, likes, username, timestamp
+        FROM comments WHERE forum_id IS NOT NULL AND post_id IS NULL
+    """)
+    op.execute("""
+        INSERT INTO forum_comment_likes (id, comment_id, user_id, timestamp)
+        SELECT id, comment_id, user_id, created_at FROM comment_likes
+        WHERE comment_id IN (SELECT id FROM forum_comments)
+    """)
+    op.execute("DELETE FROM comment_likes WHERE comment_id IN (SELECT id FROM forum_comments)")
+    op.execute("DELETE FROM comments WHERE id IN (SELECT id FROM forum_comments)")
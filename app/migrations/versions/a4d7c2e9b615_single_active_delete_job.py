@@ -0,0 +1,42 @@
+"""single active delete job
+
+Revision ID: a4d7c2e9b615
+Revises: d8b3f1e6c2a7
+Create Date: 2026-10-18 09:41:12.508317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d7c2e9b615'
+down_revision: Union[str, None] = 'd8b3f1e6c2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = "status IN ('queued', 'running')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the oldest active job; any other one would delete the same chunks
+    op.execute(f"""
+        UPDATE post_delete_jobs SET status = 'failed', error = 'Superseded by an earlier active job'
+        WHERE {ACTIVE} AND id NOT IN (
+            SELECT id FROM (
+                SELECT id FROM post_delete_jobs WHERE {ACTIVE} ORDER BY created_at, id LIMIT 1
+            ) AS oldest
+        )
+    """)
+    op.create_index(
+        'uq_post_delete_jobs_active', 'post_delete_jobs', [sa.text(f"({ACTIVE})")], unique=True,
+        sqlite_where=sa.text(ACTIVE), postgresql_where=sa.text(ACTIVE)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_post_delete_jobs_active', table_name='post_delete_jobs')
@@ -0,0 +1,42 @@
+"""like counters
+
+Revision ID: b7e2d4c19a53
+Revises: 41a445f832a9
+Create Date: 2026-10-17 15:40:12.518307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d4c19a53'
+down_revision: Union[str, None] = '41a445f832a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> (like table, column pointing back at the table)
+LIKE_COUNTERS = {
+    'posts': ('post_likes', 'post_id'),
+    'forums': ('forum_likes', 'forum_id'),
+    'comments': ('comment_likes', 'comment_id'),
+    'forum_comments': ('forum_comment_likes', 'comment_id'),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # posts.likes was never maintained before; bring every counter in line with its like table
+    for table, (like_table, column) in LIKE_COUNTERS.items():
+        op.execute(
+            f"UPDATE {table} SET likes = "
+            f"(SELECT COUNT(*) FROM {like_table} WHERE {like_table}.{column} = {table}.id)"
+        )
+    op.create_index('ix_posts_likes_id', 'posts', ['likes', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_posts_likes_id', table_name='posts')
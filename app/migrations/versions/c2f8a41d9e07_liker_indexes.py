@@ -0,0 +1,46 @@
+"""liker indexes
+
+Revision ID: c2f8a41d9e07
+Revises: 5a0e9c2b7d16
+Create Date: 2026-10-17 20:07:12.338104
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f8a41d9e07'
+down_revision: Union[str, None] = '5a0e9c2b7d16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('comment_likes', sa.Column('created_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE comment_likes SET created_at = CURRENT_TIMESTAMP")
+    # The composite index leads with post_id, so it replaces the single-column one
+    op.drop_index('ix_post_likes_post_id', table_name='post_likes')
+    op.create_index('ix_post_likes_post_id_created_at', 'post_likes', ['post_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_forum_likes_forum_id_timestamp', 'forum_likes', ['forum_id', 'timestamp', 'id'], unique=False)
+    op.create_index(
+        'ix_comment_likes_comment_id_created_at', 'comment_likes', ['comment_id', 'created_at', 'id'], unique=False
+    )
+    op.create_index(
+        'ix_forum_comment_likes_comment_id_timestamp', 'forum_comment_likes', ['comment_id', 'timestamp', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_forum_comment_likes_comment_id_timestamp', table_name='forum_comment_likes')
+    op.drop_index('ix_comment_likes_comment_id_created_at', table_name='comment_likes')
+    op.drop_index('ix_forum_likes_forum_id_timestamp', table_name='forum_likes')
+    op.drop_index('ix_post_likes_post_id_created_at', table_name='post_likes')
+    op.create_index('ix_post_likes_post_id', 'post_likes', ['post_id'], unique=False)
+    with op.batch_alter_table('comment_likes') as batch_op:
+        batch_op.drop_column('created_at')
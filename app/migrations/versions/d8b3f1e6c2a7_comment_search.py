@@ -0,0 +1,59 @@
+"""comment search
+
+Revision ID: d8b3f1e6c2a7
+Revises: 9c5e2f7a1d34
+Create Date: 2026-10-18 00:05:27.641093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b3f1e6c2a7'
+down_revision: Union[str, None] = '9c5e2f7a1d34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = "to_tsvector('english', coalesce(comment, ''))"
+FTS = 'comments_fts'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(f"CREATE VIRTUAL TABLE {FTS} USING fts5(comment, content='comments', content_rowid='rowid')")
+        op.execute(
+            f"CREATE TRIGGER {FTS}_ai AFTER INSERT ON comments BEGIN "
+            f"INSERT INTO {FTS}(rowid, comment) VALUES (new.rowid, new.comment); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {FTS}_ad AFTER DELETE ON comments BEGIN "
+            f"INSERT INTO {FTS}({FTS}, rowid, comment) VALUES ('delete', old.rowid, old.comment); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {FTS}_au AFTER UPDATE OF comment ON comments BEGIN "
+            f"INSERT INTO {FTS}({FTS}, rowid, comment) VALUES ('delete', old.rowid, old.comment); "
+            f"INSERT INTO {FTS}(rowid, comment) VALUES (new.rowid, new.comment); END"
+        )
+        # Index the comments that already exist
+        op.execute(f"INSERT INTO {FTS}({FTS}) VALUES ('rebuild')")
+        return
+    op.add_column('comments', sa.Column(
+        'search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True), nullable=True
+    ))
+    op.create_index('ix_comments_search_vector', 'comments', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {FTS}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {FTS}")
+        return
+    op.drop_index('ix_comments_search_vector', table_name='comments')
+    op.drop_column('comments', 'search_vector')
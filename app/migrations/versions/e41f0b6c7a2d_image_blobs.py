@@ -0,0 +1,40 @@
+"""image blobs
+
+Revision ID: e41f0b6c7a2d
+Revises: 3c9a7f21d8e4
+Create Date: 2026-10-17 17:05:19.448210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41f0b6c7a2d'
+down_revision: Union[str, None] = '3c9a7f21d8e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'image_blobs',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('url', sa.String(length=512), nullable=False),
+        sa.Column('content_type', sa.String(length=32), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('sha256')
+    )
+    op.add_column('posts', sa.Column('image_sha256', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.drop_column('image_sha256')
+    op.drop_table('image_blobs')
@@ -0,0 +1,53 @@
+"""unique likes
+
+Revision ID: f3a6d2b8c419
+Revises: 7e4c1a9b2f58
+Create Date: 2026-10-17 22:36:51.904412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a6d2b8c419'
+down_revision: Union[str, None] = '7e4c1a9b2f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# like table -> (liked table, column pointing at it, constraint name)
+LIKE_TABLES = {
+    'forum_likes': ('forums', 'forum_id', '_user_forum_uc'),
+    'comment_likes': ('comments', 'comment_id', '_user_comment_uc'),
+    'forum_comment_likes': ('forum_comments', 'comment_id', '_user_forum_comment_uc'),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, (target, column, constraint) in LIKE_TABLES.items():
+        # Keep one row per (user, target), then recount the targets that had duplicates
+        op.execute(f"""
+            UPDATE {target} SET likes = (
+                SELECT COUNT(DISTINCT user_id) FROM {table} WHERE {table}.{column} = {target}.id
+            )
+            WHERE id IN (
+                SELECT {column} FROM {table} GROUP BY user_id, {column} HAVING COUNT(*) > 1
+            )
+        """)
+        op.execute(f"""
+            DELETE FROM {table} WHERE id NOT IN (
+                SELECT MIN(id) FROM {table} GROUP BY user_id, {column}
+            )
+        """)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.create_unique_constraint(constraint, ['user_id', column])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, (_, _, constraint) in LIKE_TABLES.items():
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(constraint, type_='unique')
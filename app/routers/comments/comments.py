@@ -1,60 +1,127 @@
-from fastapi import APIRouter, status, Depends
+from fastapi import APIRouter, status, Depends, Request, Response, UploadFile, File, Query
 from fastapi.exceptions import HTTPException
-from sqlalchemy import null
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from .schemas import Comment, CommentCreate, CommentUpdate
-from .models import Comments, CommentLike
-from typing import List
-from app.auth.dependencies import get_current_user
+from .schemas import Comment, CommentCreate, CommentUpdate, CommentNode, CommentSearchResult
+from .models import Comments
+from app.routers.posts.models import Posts
+from typing import List, Optional
+from app.auth.dependencies import get_current_user, get_current_user_optional
 from app.routers.users.models import Users
 from app.config.postgres_config import get_db
-import shortuuid
+from app.services.likes import likers_page, LikersPage
+from app.services.conditional import conditional_response, make_etag
+from app.services.cache import response_cache
+from app.services.export import export_response
+from app.services.pagination import PageParams, set_next_cursor
+from app.services.comment_tree import build_tree, embedded_comments, index_thread, page_roots
+from app.services.comment_store import (
+    create_comment, delete_comment, edit_comment, find_comment, in_thread, like_comment, liked_ids, list_comments,
+    load_thread, search_comments,
+)
+from app.services.comment_events import stream_response
+from app.services.bulk_import import import_upload, ImportReport, IMPORT_CHUNK_SIZE, MAX_IMPORT_CHUNK_SIZE
 
 router = APIRouter(prefix="/comments",
                    )
 
+COMMENT_EXPORT_COLUMNS = (
+    Comments.id, Comments.comment, Comments.post_id, Comments.forum_id, Comments.parent_id,
+    Comments.user_id, Comments.username, Comments.likes, Comments.timestamp,
+)
+
 
 class Config:
     orm_mode = True
 
 
+def _comment_response(comment: Comments, liked: bool = False, reply_count: Optional[int] = None) -> Comment:
+    return Comment(
+        id=str(comment.id),
+        comment=str(comment.comment),
+        forum_id=comment.forum_id,  # type: ignore
+        post_id=comment.post_id,  # type: ignore
+        parent_id=comment.parent_id,  # type: ignore
+        user_id=comment.user_id,  # type: ignore
+        username=comment.username,  # type: ignore
+        liked_by_current_user=liked,
+        likes=comment.likes or 0,  # type: ignore
+        timestamp=comment.timestamp,  # type: ignore
+        reply_count=reply_count
+    )
+
+
+def _comment_tree(
+    db: Session,
+    kind: str,
+    owner_id: str,
+    limit: int,
+    cursor: Optional[str],
+    replies: int,
+    current_user: Optional[Users],
+    response: Response
+) -> List[CommentNode]:
+    """
+    Load a whole thread in one query and nest a page of its top-level comments,
+    each with its first `replies` replies at every level
+    """
+    roots, children = index_thread(load_thread(db, kind, owner_id))
+    page, next_cursor = page_roots(roots, limit, cursor)
+    liked = liked_ids(db, current_user, embedded_comments(page, children, replies))
+
+    def make_node(comment: Comments, nested: List[CommentNode], reply_count: int) -> CommentNode:
+        node = _comment_response(comment, str(comment.id) in liked, reply_count)
+        return CommentNode(**node.model_dump(), replies=nested)
+
+    set_next_cursor(response, next_cursor)
+    return build_tree(page, children, replies, make_node)
+
+
 @router.get("", response_model=List[Comment], status_code=status.HTTP_200_OK)
-def get_comments(db: Session = Depends(get_db)):
-    comments = db.query(Comments).all()
-    result = []
-    for c in comments:
-        result.append(Comment(
-            id=str(c.id),
-            comment=str(c.comment),
-            post_id=str(c.post_id),
-            parent_id=c.parent_id,  # type: ignore
-            user_id=c.user_id,  # type: ignore
-            username=c.username,  # type: ignore
-            liked_by_current_user=False,
-            likes=c.likes or 0,  # type: ignore
-            timestamp=c.timestamp  # type: ignore
-        ))
-    return result
+def get_comments(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    rows = list_comments(db, page, response, current_user)
+    return [_comment_response(*row) for row in rows]
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+def export_comments(format: str = Query("ndjson", description="ndjson or csv")):
+    """Stream every comment, on posts and forums alike, as NDJSON or CSV"""
+    return export_response("comments", COMMENT_EXPORT_COLUMNS, format)
+
+
+@router.get("/search", response_model=List[CommentSearchResult], status_code=status.HTTP_200_OK)
+def search_comment_text(
+    response: Response,
+    q: str = Query(..., min_length=1, description="Search terms; every term must match, as a word prefix"),
+    post_id: Optional[str] = Query(None, description="Only comments on this post"),
+    forum_id: Optional[str] = Query(None, description="Only comments on this forum"),
+    user_id: Optional[str] = Query(None, description="Only comments by this user"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    """Relevance-ranked full-text search over post and forum comment bodies, best match first"""
+    criteria = []
+    if post_id:
+        criteria.append(in_thread("post", post_id))
+    if forum_id:
+        criteria.append(in_thread("forum", forum_id))
+    if user_id:
+        criteria.append(Comments.user_id == user_id)
+    results, next_cursor = search_comments(db, q, limit, cursor, current_user, *criteria)
+    set_next_cursor(response, next_cursor)
+    return [CommentSearchResult(**_comment_response(*row).model_dump(), score=score) for row, score in results]
 
 
 @router.get("/{item_id}", response_model=Comment, status_code=200)
 def get_comment(item_id: str, db: Session = Depends(get_db)):
-    item_to_get = db.query(Comments).filter(Comments.id == item_id).first()
-
-    if item_to_get is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resource Not Found")
-
-    return Comment(
-        id=str(item_to_get.id),
-        comment=str(item_to_get.comment),
-        post_id=str(item_to_get.post_id),
-        parent_id=item_to_get.parent_id,  # type: ignore
-        user_id=item_to_get.user_id,  # type: ignore
-        username=item_to_get.username,  # type: ignore
-        liked_by_current_user=False,  # Will be set by frontend if needed
-        likes=item_to_get.likes or 0,  # type: ignore
-        timestamp=item_to_get.timestamp  # type: ignore
-    )
+    return _comment_response(find_comment(db, item_id))
 
 
 @router.post("", response_model=Comment, status_code=status.HTTP_201_CREATED)
@@ -63,29 +130,28 @@ def post_comment(
     current_user: Users = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    # Use the authenticated user's information
-    new_comment = Comments(
-        id=shortuuid.uuid(),
-        comment=comment.comment,
-        post_id=comment.post_id,
-        user_id=current_user.id,  # Use authenticated user's ID
-        username=current_user.username,  # Use authenticated user's username
-        parent_id=comment.parent_id
-    )
-    db.add(new_comment)
-    db.commit()
-    db.refresh(new_comment)
-    return Comment(
-        id=str(new_comment.id),
-        comment=str(new_comment.comment),
-        post_id=str(new_comment.post_id),
-        parent_id=new_comment.parent_id,  # type: ignore
-        user_id=new_comment.user_id,  # type: ignore
-        username=new_comment.username,  # type: ignore
-        liked_by_current_user=False,
-        likes=new_comment.likes or 0,  # type: ignore
-        timestamp=new_comment.timestamp  # type: ignore
+    new_comment = create_comment(
+        db, current_user, comment.comment, comment.post_id, comment.forum_id, comment.parent_id
     )
+    return _comment_response(new_comment)
+
+
+@router.post("/import", response_model=ImportReport, status_code=status.HTTP_200_OK)
+def import_comments(
+    file: UploadFile = File(..., description="NDJSON (one JSON object per line) or CSV with a header row"),
+    format: Optional[str] = Query(None, description="ndjson or csv; defaults to the file extension"),
+    chunk_size: int = Query(
+        IMPORT_CHUNK_SIZE, ge=1, le=MAX_IMPORT_CHUNK_SIZE, description="Rows validated and inserted per batch"
+    ),
+    current_user: Users = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import comments (comment and a post_id or forum_id, optional parent_id) authored by the
+    current user. Rows are validated and inserted in batches; invalid rows are skipped and listed
+    by line number in the report.
+    """
+    return import_upload(db, "comments", file, current_user, format, chunk_size)
 
 
 @router.put("/{item_id}", response_model=Comment, status_code=status.HTTP_200_OK)
@@ -95,27 +161,8 @@ def update_comment(
     current_user: Users = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    item_to_update = db.query(Comments).filter(Comments.id == item_id).first()
-    if item_to_update is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resource Not Found")
-    if item_to_update.user_id != current_user.id:  # type: ignore
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You can only edit your own comments")
-    item_to_update.comment = updated_comment.comment  # type: ignore
-    db.commit()
-    liked_by_current_user = db.query(CommentLike).filter_by(
-        comment_id=item_to_update.id, user_id=current_user.id
-    ).first() is not None
-    return Comment(
-        id=str(item_to_update.id),
-        comment=str(item_to_update.comment),
-        post_id=str(item_to_update.post_id),
-        parent_id=item_to_update.parent_id,  # type: ignore
-        user_id=item_to_update.user_id,  # type: ignore
-        username=item_to_update.username,  # type: ignore
-        likes=item_to_update.likes or 0,  # type: ignore
-        liked_by_current_user=liked_by_current_user,
-        timestamp=item_to_update.timestamp  # type: ignore
-    )
+    row = edit_comment(db, item_id, updated_comment.comment, current_user)
+    return _comment_response(*row)
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_200_OK)
@@ -124,91 +171,76 @@ def delete_comment_with_replies(
     current_user: Users = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    # Query the comment to delete
-    comment_to_delete = db.query(Comments).filter(Comments.id == item_id).first()
-
-    if not comment_to_delete:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
-
-    # Check if the user owns this comment
-    if comment_to_delete.user_id != current_user.id:  # type: ignore
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, 
-            detail="You can only delete your own comments"
-        )
-
-    # Delete all child comments where parent_id matches the given item ID
-    if comment_to_delete.parent_id is None:
-        child_comments = db.query(Comments).filter(Comments.parent_id == item_id).all()
-        for child in child_comments:
-         db.delete(child)
-
-    # Delete the main comment
-    db.delete(comment_to_delete)
-    db.commit()
-
+    delete_comment(db, item_id, current_user)
     return {"detail": f"Comment with id {item_id} and its replies have been deleted"}
 
 
 @router.get("/post/{post_id}", response_model=List[Comment], status_code=status.HTTP_200_OK)
-def get_comments_by_post_id(post_id: str, db: Session = Depends(get_db)):
-    comments = db.query(Comments).filter(Comments.post_id == post_id).all()
-    result = []
-    for comment in comments:
-        result.append(Comment(
-            id=str(comment.id),
-            comment=str(comment.comment),
-            post_id=str(comment.post_id),
-            parent_id=comment.parent_id,  # type: ignore
-            user_id=comment.user_id,  # type: ignore
-            username=comment.username,  # type: ignore
-            liked_by_current_user=False,
-            likes=comment.likes or 0,  # type: ignore
-            timestamp=comment.timestamp  # type: ignore
-        ))
-    return result
+def get_comments_by_post_id(
+    post_id: str,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    cached = response_cache.lookup(request, f"post-comments:{post_id}", current_user)
+    if cached is not None:
+        return cached
+    # Thread version: comment count, newest comment change and the post's own changed_at,
+    # which comment deletions bump, all from one aggregate query
+    post_changed = select(Posts.changed_at).where(Posts.id == post_id).scalar_subquery()
+    comment_count, comment_changed, post_changed_at = (
+        db.query(func.count(Comments.id), func.max(Comments.changed_at), post_changed)
+        .filter(Comments.post_id == post_id)
+        .one()
+    )
+    last_changed = max(filter(None, [comment_changed, post_changed_at]), default=None)
+    viewer = current_user.id if current_user else None
+    etag = make_etag("post-comments", post_id, comment_count, last_changed, viewer, str(request.url.query))
+    not_modified = conditional_response(request, response, etag, last_changed)
+    if not_modified is not None:
+        return not_modified
+
+    rows = list_comments(db, page, response, current_user, in_thread("post", post_id))
+    result = [_comment_response(*row) for row in rows]
+    return response_cache.store(request, response, f"post-comments:{post_id}", result, current_user)
+
+@router.get("/post/{post_id}/stream", status_code=status.HTTP_200_OK)
+def stream_post_comments(post_id: str, request: Request, db: Session = Depends(get_db)):
+    """
+    Server-Sent Events for a post's thread: `created`, `updated` and `deleted` comments
+    and `likes` counter changes as they are committed. A `resync` event means the
+    connection fell behind and dropped events; refetch the thread.
+    """
+    if db.query(Posts.id).filter(Posts.id == post_id).first() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+    return stream_response(f"post-comments:{post_id}", request)
 
 @router.get("/post/{post_id}/replies/{comment_id}", response_model=List[Comment], status_code=status.HTTP_200_OK)
-def get_comments_replied_to(comment_id: str, post_id:str,  db: Session = Depends(get_db)):
-    replies = db.query(Comments).filter(Comments.parent_id == comment_id).filter(Comments.post_id == post_id).all()
-    result = []
-    for reply in replies:
-        result.append(Comment(
-            id=str(reply.id),
-            comment=str(reply.comment),
-            post_id=str(reply.post_id),
-            parent_id=reply.parent_id,  # type: ignore
-            user_id=reply.user_id,  # type: ignore
-            username=reply.username,  # type: ignore
-            liked_by_current_user=False,
-            likes=reply.likes or 0,  # type: ignore
-            timestamp=reply.timestamp  # type: ignore
-        ))
-    return result
+def get_comments_replied_to(
+    comment_id: str,
+    post_id: str,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    rows = list_comments(db, page, response, current_user, Comments.parent_id == comment_id, in_thread("post", post_id))
+    return [_comment_response(*row) for row in rows]
 
 @router.get("/post/{post_id}/main", response_model=List[Comment], status_code=status.HTTP_200_OK)
-def get_main_comments_by_post_id(post_id: str, db: Session = Depends(get_db)):
-    main_comments = (
-        db.query(Comments)
-        .filter(Comments.post_id == post_id, Comments.parent_id == None)
-        .all()
+def get_main_comments_by_post_id(
+    post_id: str,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    rows = list_comments(
+        db, page, response, current_user, in_thread("post", post_id), Comments.parent_id == None, with_reply_counts=True
     )
-    if not main_comments:
-        return []
-    result = []
-    for comment in main_comments:
-        result.append(Comment(
-            id=str(comment.id),
-            comment=str(comment.comment),
-            post_id=str(comment.post_id),
-            parent_id=comment.parent_id,  # type: ignore
-            user_id=comment.user_id,  # type: ignore
-            username=comment.username,  # type: ignore
-            liked_by_current_user=False,
-            likes=comment.likes or 0,  # type: ignore
-            timestamp=comment.timestamp  # type: ignore
-        ))
-    return result
+    return [_comment_response(*row) for row in rows]
 
 @router.post("/{comment_id}/like", response_model=Comment, status_code=200)
 def toggle_like_comment(
@@ -216,39 +248,7 @@ def toggle_like_comment(
     current_user: Users = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    existing = db.query(CommentLike).filter_by(comment_id=comment_id, user_id=current_user.id).first()
-    comment = db.query(Comments).filter_by(id=comment_id).first()
-    if not comment:
-        raise HTTPException(status_code=404, detail="Comment not found")
-
-    if existing:
-        db.delete(existing)
-        if comment.likes and comment.likes > 0:  # type: ignore
-            comment.likes -= 1  # type: ignore
-        db.commit()
-    else:
-        like = CommentLike(
-            id=shortuuid.uuid(),
-            comment_id=comment_id, 
-            user_id=current_user.id
-        )
-        db.add(like)
-        comment.likes = (comment.likes or 0) + 1  # type: ignore
-        db.commit()
-
-    # Return the updated comment object
-    liked_by_current_user = db.query(CommentLike).filter_by(comment_id=comment_id, user_id=current_user.id).first() is not None
-    return Comment(
-        id=str(comment.id),
-        comment=str(comment.comment),
-        post_id=str(comment.post_id),
-        parent_id=comment.parent_id,  # type: ignore
-        user_id=comment.user_id,  # type: ignore
-        username=comment.username,  # type: ignore
-        liked_by_current_user=liked_by_current_user,
-        likes=comment.likes or 0,  # type: ignore
-        timestamp=comment.timestamp  # type: ignore
-    )
+    return like_comment(db, comment_id, current_user, _comment_response)
 
 @router.delete("/{comment_id}/like", response_model=Comment, status_code=200)
 def delete_like_comment(
@@ -256,93 +256,107 @@ def delete_like_comment(
     current_user: Users = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    existing = db.query(CommentLike).filter_by(comment_id=comment_id, user_id=current_user.id).first()
-    comment = db.query(Comments).filter_by(id=comment_id).first()
-    if not comment:
-        raise HTTPException(status_code=404, detail="Comment not found")
-
-    if existing:
-        db.delete(existing)
-        if comment.likes and comment.likes > 0:  # type: ignore
-            comment.likes -= 1  # type: ignore
-        db.commit()
-    # After unlike (or if not previously liked), return the updated comment object
-    liked_by_current_user = db.query(CommentLike).filter_by(comment_id=comment_id, user_id=current_user.id).first() is not None
-    return Comment(
-        id=str(comment.id),
-        comment=str(comment.comment),
-        post_id=str(comment.post_id),
-        parent_id=comment.parent_id,  # type: ignore
-        user_id=comment.user_id,  # type: ignore
-        username=comment.username,  # type: ignore
-        liked_by_current_user=liked_by_current_user,
-        likes=comment.likes or 0,  # type: ignore
-        timestamp=comment.timestamp  # type: ignore
-    )
+    return like_comment(db, comment_id, current_user, _comment_response, liked=False)
+
+@router.get("/post/{post_id}/tree", response_model=List[CommentNode], status_code=status.HTTP_200_OK)
+def get_post_comment_tree(
+    post_id: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of top-level comments to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    replies: int = Query(3, ge=0, le=50, description="Replies embedded under each comment, at every level"),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    """A post's comment thread, nested, paginated on top-level comments (oldest first)"""
+    cached = response_cache.lookup(request, f"post-comments:{post_id}", current_user)
+    if cached is not None:
+        return cached
+    tree = _comment_tree(db, "post", post_id, limit, cursor, replies, current_user, response)
+    return response_cache.store(request, response, f"post-comments:{post_id}", tree, current_user)
+
+
+@router.get("/{comment_id}/likes", response_model=LikersPage, status_code=200)
+def get_comment_likes(
+    comment_id: str,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of likes to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor of the previous page"),
+    include_usernames: bool = Query(False, description="Add each liker's username"),
+    db: Session = Depends(get_db)
+):
+    """Who liked a comment, newest first"""
+    page = likers_page(db, "comments", comment_id, limit, cursor, include_usernames)
+    set_next_cursor(response, page.next_cursor)
+    return page
+
 
 # Forum Comment Endpoints (using the same Comments table)
 @router.get("/forum/{forum_id}", response_model=List[Comment], status_code=status.HTTP_200_OK)
-def get_forum_comments(forum_id: str, db: Session = Depends(get_db)):
-    comments = db.query(Comments).filter(Comments.forum_id == forum_id).all()
-    result = []
-    for comment in comments:
-        result.append(Comment(
-            id=str(comment.id),
-            comment=str(comment.comment),
-            forum_id=str(comment.forum_id),
-            post_id=str(comment.post_id),
-            parent_id=comment.parent_id,  # type: ignore
-            user_id=comment.user_id,  # type: ignore
-            username=comment.username,  # type: ignore
-            liked_by_current_user=False,
-            likes=comment.likes or 0,  # type: ignore
-            timestamp=comment.timestamp  # type: ignore
-        ))
-    return result
+def get_forum_comments(
+    forum_id: str,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    cached = response_cache.lookup(request, f"forum-comments:{forum_id}", current_user)
+    if cached is not None:
+        return cached
+    rows = list_comments(db, page, response, current_user, in_thread("forum", forum_id))
+    result = [_comment_response(*row) for row in rows]
+    return response_cache.store(request, response, f"forum-comments:{forum_id}", result, current_user)
 
 
 @router.get("/forum/{forum_id}/main", response_model=List[Comment], status_code=status.HTTP_200_OK)
-def get_main_forum_comments(forum_id: str, db: Session = Depends(get_db)):
-    main_comments = (
-        db.query(Comments)
-        .filter(Comments.forum_id == forum_id, Comments.parent_id == None)
-        .all()
+def get_main_forum_comments(
+    forum_id: str,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    rows = list_comments(
+        db, page, response, current_user, in_thread("forum", forum_id), Comments.parent_id == None,
+        with_reply_counts=True
     )
-    result = []
-    for comment in main_comments:
-        result.append(Comment(
-            id=str(comment.id),
-            comment=str(comment.comment),
-            forum_id=str(comment.forum_id),
-            post_id=str(comment.post_id),
-            parent_id=comment.parent_id,  # type: ignore
-            user_id=comment.user_id,  # type: ignore
-            username=comment.username,  # type: ignore
-            liked_by_current_user=False,
-            likes=comment.likes or 0,  # type: ignore
-            timestamp=comment.timestamp  # type: ignore
-        ))
-    return result
+    return [_comment_response(*row) for row in rows]
+
+
+@router.get("/forum/{forum_id}/tree", response_model=List[CommentNode], status_code=status.HTTP_200_OK)
+def get_forum_comment_tree(
+    forum_id: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of top-level comments to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    replies: int = Query(3, ge=0, le=50, description="Replies embedded under each comment, at every level"),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    """A forum's comment thread, nested like GET /comments/post/{post_id}/tree"""
+    cached = response_cache.lookup(request, f"forum-comments:{forum_id}", current_user)
+    if cached is not None:
+        return cached
+    tree = _comment_tree(db, "forum", forum_id, limit, cursor, replies, current_user, response)
+    return response_cache.store(request, response, f"forum-comments:{forum_id}", tree, current_user)
 
 
 @router.get("/forum/{forum_id}/replies/{comment_id}", response_model=List[Comment], status_code=status.HTTP_200_OK)
-def get_forum_comments_replied_to(comment_id: str, forum_id: str, db: Session = Depends(get_db)):
-    replies = db.query(Comments).filter(Comments.parent_id == comment_id).filter(Comments.forum_id == forum_id).all()
-    result = []
-    for reply in replies:
-        result.append(Comment(
-            id=str(reply.id),
-            comment=str(reply.comment),
-            forum_id=str(reply.forum_id),
-            post_id=str(reply.post_id),
-            parent_id=reply.parent_id,  # type: ignore
-            user_id=reply.user_id,  # type: ignore
-            username=reply.username,  # type: ignore
-            liked_by_current_user=False,
-            likes=reply.likes or 0,  # type: ignore
-            timestamp=reply.timestamp  # type: ignore
-        ))
-    return result
+def get_forum_comments_replied_to(
+    comment_id: str,
+    forum_id: str,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    rows = list_comments(
+        db, page, response, current_user, Comments.parent_id == comment_id, in_thread("forum", forum_id)
+    )
+    return [_comment_response(*row) for row in rows]
 
 
 @router.post("/forum/{forum_id}", response_model=Comment, status_code=status.HTTP_201_CREATED)
@@ -355,28 +369,5 @@ def create_forum_comment(
     """
     Create a new comment on a forum
     """
-    new_comment = Comments(
-        id=shortuuid.uuid(),
-        comment=comment.comment,
-        forum_id=forum_id,
-        post_id=comment.post_id,  # Will be None for forum comments
-        user_id=current_user.id,
-        username=current_user.username,
-        parent_id=comment.parent_id
-    )
-    db.add(new_comment)
-    db.commit()
-    db.refresh(new_comment)
-    
-    return Comment(
-        id=str(new_comment.id),
-        comment=str(new_comment.comment),
-        forum_id=str(new_comment.forum_id),
-        post_id=str(new_comment.post_id),
-        parent_id=new_comment.parent_id,  # type: ignore
-        user_id=new_comment.user_id,  # type: ignore
-        username=new_comment.username,  # type: ignore
-        liked_by_current_user=False,
-        likes=new_comment.likes or 0,  # type: ignore
-        timestamp=new_comment.timestamp  # type: ignore
-    )
\ No newline at end of file
+    new_comment = create_comment(db, current_user, comment.comment, forum_id=forum_id, parent_id=comment.parent_id)
+    return _comment_response(new_comment)
\ No newline at end of file
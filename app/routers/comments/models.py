@@ -1,8 +1,9 @@
 from datetime import datetime
 import shortuuid
-from sqlalchemy import String, Column, ForeignKey, Integer, DateTime
-from sqlalchemy.orm import relationship
-from app.config.postgres_config import Base, get_schema_kwargs, get_fk_reference
+from sqlalchemy import String, Column, ForeignKey, Integer, DateTime, Index, UniqueConstraint, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
+from app.config.postgres_config import Base, get_schema_kwargs, get_fk_reference, is_sqlite, attach_sqlite_fts
 
 schema_kwargs = get_schema_kwargs()
 
@@ -17,18 +18,57 @@ class Comments(Base):
     likes = Column(Integer, default=0)
     username = Column(String(255), nullable=True)
     post = relationship("Posts", back_populates="comments")
+    forum = relationship("Forums", back_populates="comments")
     users = relationship("Users", back_populates="comments")
     timestamp = Column(DateTime, default=datetime.utcnow)
+    # Bumped by every write to the row, including likes; drives ETag/Last-Modified
+    changed_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    if not is_sqlite():
+        search_vector = deferred(Column(TSVECTOR, Computed(
+            "to_tsvector('english', coalesce(comment, ''))", persisted=True
+        )))
     if schema_kwargs:
-        __table_args__ = schema_kwargs  # type: ignore
+        __table_args__ = (
+            Index('ix_comments_post_id_changed_at', 'post_id', 'changed_at'),
+            Index('ix_comments_timestamp_id', 'timestamp', 'id'),
+            Index('ix_comments_post_id_timestamp_id', 'post_id', 'timestamp', 'id'),
+            Index('ix_comments_forum_id_timestamp_id', 'forum_id', 'timestamp', 'id'),
+            Index('ix_comments_parent_id_timestamp_id', 'parent_id', 'timestamp', 'id'),
+            schema_kwargs
+        )
+    else:
+        __table_args__ = (
+            Index('ix_comments_post_id_changed_at', 'post_id', 'changed_at'),
+            Index('ix_comments_timestamp_id', 'timestamp', 'id'),
+            Index('ix_comments_post_id_timestamp_id', 'post_id', 'timestamp', 'id'),
+            Index('ix_comments_forum_id_timestamp_id', 'forum_id', 'timestamp', 'id'),
+            Index('ix_comments_parent_id_timestamp_id', 'parent_id', 'timestamp', 'id'),
+        )
     comment_likes = relationship("CommentLike", backref="comment", cascade="all, delete-orphan")
 
 
+# Full-text search over comment bodies: GIN over the generated tsvector on Postgres, FTS5 on SQLite
+if is_sqlite():
+    attach_sqlite_fts(Comments.__table__, ['comment'])
+else:
+    Index('ix_comments_search_vector', Comments.search_vector, postgresql_using='gin')
+
+
 class CommentLike(Base):
     __tablename__ = 'comment_likes'
     id = Column(String(255), nullable=False, primary_key=True)
     comment_id = Column(String(255), ForeignKey(get_fk_reference('comments'), ondelete='CASCADE'), nullable=False)
     user_id = Column(String(255), ForeignKey(get_fk_reference('users'), ondelete='CASCADE'), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
     if schema_kwargs:
-        __table_args__ = schema_kwargs  # type: ignore
+        __table_args__ = (
+            UniqueConstraint('user_id', 'comment_id', name='_user_comment_uc'),
+            Index('ix_comment_likes_comment_id_created_at', 'comment_id', 'created_at', 'id'),
+            schema_kwargs
+        )
+    else:
+        __table_args__ = (
+            UniqueConstraint('user_id', 'comment_id', name='_user_comment_uc'),
+            Index('ix_comment_likes_comment_id_created_at', 'comment_id', 'created_at', 'id'),
+        )
 
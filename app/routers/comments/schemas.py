@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 
@@ -25,4 +25,13 @@ class Comment(CommentBase):
     liked_by_current_user: Optional[bool] = False
     likes: Optional[int] = 0
     timestamp: Optional[datetime] = None
+    reply_count: Optional[int] = None  # direct replies; filled by the thread listings
 
+
+class CommentSearchResult(Comment):
+    score: float  # relevance; higher is a better match
+
+
+class CommentNode(Comment):
+    """A comment with its first replies nested; reply_count still counts all of them"""
+    replies: List["CommentNode"] = []
@@ -1,43 +1,128 @@
-from fastapi import APIRouter, status, Depends, HTTPException
+from fastapi import APIRouter, status, Depends, HTTPException, Request, Response, UploadFile, File, Query
 from sqlalchemy.orm import Session
 from .schemas import ForumCreate, ForumResponse, ForumUpdate, ForumComment, ForumCommentCreate, ForumCommentUpdate
-from .models import Forums, ForumLike, ForumComment as ForumCommentModel, ForumCommentLike
-from typing import List
-from app.auth.dependencies import get_current_user
+from .models import Forums, ForumLike
+from typing import List, Optional
+from app.routers.comments.models import Comments
+from app.auth.dependencies import get_current_user, get_current_user_optional
 from app.routers.users.models import Users
 from app.config.postgres_config import get_db
+from app.services.likes import liked_target_ids, likers_page, set_like, LikersPage
+from app.services.conditional import conditional_response, make_etag
+from app.services.cache import response_cache
+from app.services.export import export_response
+from app.services.pagination import PageParams, set_next_cursor
+from app.services.comment_store import (
+    ON_FORUMS, comment_counts, comment_likers, create_comment, delete_comment, edit_comment, find_comment, in_thread,
+    like_comment, list_comments,
+)
+from app.services.comment_events import stream_response
+from app.services.bulk_import import import_upload, ImportReport, IMPORT_CHUNK_SIZE, MAX_IMPORT_CHUNK_SIZE
 import shortuuid
 from datetime import datetime
 
 router = APIRouter(prefix="/forums")
 
+FORUM_EXPORT_COLUMNS = (
+    Forums.id, Forums.title, Forums.content, Forums.author, Forums.likes, Forums.timestamp, Forums.updated_timestamp,
+)
+FORUM_COMMENT_EXPORT_COLUMNS = (
+    Comments.id, Comments.comment, Comments.forum_id, Comments.parent_id,
+    Comments.user_id, Comments.username, Comments.likes, Comments.timestamp,
+)
+
+
+def _forum_response(forum: Forums, liked: bool = False, comment_count: Optional[int] = None) -> ForumResponse:
+    return ForumResponse(
+        id=str(forum.id),
+        title=str(forum.title),
+        content=str(forum.content),
+        author=str(forum.author),
+        likes=forum.likes or 0,  # type: ignore
+        timestamp=forum.timestamp,  # type: ignore
+        updated_timestamp=forum.updated_timestamp,  # type: ignore
+        liked_by_current_user=liked,
+        comment_count=comment_count
+    )
+
+
+def _forum_comment_response(comment: Comments, liked: bool = False, reply_count: Optional[int] = None) -> ForumComment:
+    return ForumComment(
+        id=str(comment.id),
+        comment=str(comment.comment),
+        forum_id=str(comment.forum_id),
+        parent_id=comment.parent_id,  # type: ignore
+        user_id=comment.user_id,  # type: ignore
+        username=comment.username,  # type: ignore
+        liked_by_current_user=liked,
+        likes=comment.likes or 0,  # type: ignore
+        timestamp=comment.timestamp,  # type: ignore
+        reply_count=reply_count
+    )
+
 
 @router.get("", response_model=List[ForumResponse], status_code=status.HTTP_200_OK)
-def get_all_forums(db: Session = Depends(get_db)):
+def get_all_forums(
+    request: Request,
+    response: Response,
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
     """
     Get all forums - Public endpoint, no authentication required
     """
+    cached = response_cache.lookup(request, "forums", current_user)
+    if cached is not None:
+        return cached
     forums = db.query(Forums).all()
-    result = []
-    for f in forums:
-        result.append(ForumResponse(
-            id=str(f.id),
-            title=str(f.title),
-            content=str(f.content),
-            author=str(f.author),
-            likes=f.likes or 0,  # type: ignore
-            timestamp=f.timestamp,  # type: ignore
-            updated_timestamp=f.updated_timestamp,  # type: ignore
-            liked_by_current_user=False
-        ))
-    return result
+    ids = [f.id for f in forums]
+    liked = liked_target_ids(db, ForumLike, "forum_id", current_user, ids)
+    counts = comment_counts(db, "forum", ids)
+    result = [_forum_response(f, str(f.id) in liked, counts.get(str(f.id), 0)) for f in forums]
+    return response_cache.store(request, response, "forums", result, current_user)
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+def export_forums(format: str = Query("ndjson", description="ndjson or csv")):
+    """Stream every forum as NDJSON or CSV"""
+    return export_response("forums", FORUM_EXPORT_COLUMNS, format)
+
+
+@router.get("/comments/export", status_code=status.HTTP_200_OK)
+def export_forum_comments(format: str = Query("ndjson", description="ndjson or csv")):
+    """Stream every forum comment as NDJSON or CSV"""
+    return export_response("forum_comments", FORUM_COMMENT_EXPORT_COLUMNS, format, ON_FORUMS)
+
+
+@router.get("/comments", response_model=List[ForumComment], status_code=status.HTTP_200_OK)
+def get_all_forum_comments(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    """
+    Get all forum comments - mimics post comments behavior
+    """
+    rows = list_comments(db, page, response, current_user, ON_FORUMS)
+    return [_forum_comment_response(*row) for row in rows]
 
 
 @router.get("/{forum_id}", response_model=ForumResponse, status_code=status.HTTP_200_OK)
-def get_forum_by_id(forum_id: str, db: Session = Depends(get_db)):
+def get_forum_by_id(forum_id: str, request: Request, response: Response, db: Session = Depends(get_db)):
     """
-    Get a specific forum by ID - Public endpoint, no authentication required
+    Get a specific forum by ID - Public endpoint, no authentication required.
+    Answers 304 from the forum's changed_at alone when the client's copy is current.
     """
+    cached = response_cache.lookup(request, f"forum:{forum_id}")
+    if cached is not None:
+        return cached
+    changed_at = db.query(Forums.changed_at).filter(Forums.id == forum_id).scalar()
+    if changed_at is not None:
+        not_modified = conditional_response(request, response, make_etag("forum", forum_id, changed_at), changed_at)
+        if not_modified is not None:
+            return not_modified
+
     forum = db.query(Forums).filter(Forums.id == forum_id).first()
     
     if forum is None:
@@ -46,16 +131,7 @@ def get_forum_by_id(forum_id: str, db: Session = Depends(get_db)):
             detail="Forum not found"
         )
     
-    return ForumResponse(
-        id=str(forum.id),
-        title=str(forum.title),
-        content=str(forum.content),
-        author=str(forum.author),
-        likes=forum.likes or 0,  # type: ignore
-        timestamp=forum.timestamp,  # type: ignore
-        updated_timestamp=forum.updated_timestamp,  # type: ignore
-        liked_by_current_user=False
-    )
+    return response_cache.store(request, response, f"forum:{forum_id}", _forum_response(forum))
 
 
 @router.post("", response_model=ForumResponse, status_code=status.HTTP_201_CREATED)
@@ -76,6 +152,7 @@ def create_forum(
     
     db.add(new_forum)
     db.commit()
+    response_cache.invalidate("forums")
     db.refresh(new_forum)
     
     return ForumResponse(
@@ -90,6 +167,23 @@ def create_forum(
     )
 
 
+@router.post("/import", response_model=ImportReport, status_code=status.HTTP_200_OK)
+def import_forums(
+    file: UploadFile = File(..., description="NDJSON (one JSON object per line) or CSV with a header row"),
+    format: Optional[str] = Query(None, description="ndjson or csv; defaults to the file extension"),
+    chunk_size: int = Query(
+        IMPORT_CHUNK_SIZE, ge=1, le=MAX_IMPORT_CHUNK_SIZE, description="Rows validated and inserted per batch"
+    ),
+    current_user: Users = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import forums (title, content) authored by the current user. Rows are validated and inserted
+    in batches; invalid rows are skipped and listed by line number in the report.
+    """
+    return import_upload(db, "forums", file, current_user, format, chunk_size)
+
+
 @router.put("/{forum_id}", response_model=ForumResponse, status_code=status.HTTP_200_OK)
 def update_forum(
     forum_id: str,
@@ -124,6 +218,7 @@ def update_forum(
     setattr(forum, 'updated_timestamp', datetime.utcnow())
     
     db.commit()
+    response_cache.invalidate("forums", f"forum:{forum_id}")
     
     liked_by_current_user = db.query(ForumLike).filter_by(forum_id=forum_id, user_id=current_user.id).first() is not None
     
@@ -148,6 +243,7 @@ def delete_forum(forum_id: str, db: Session = Depends(get_db), current_user: Use
         raise HTTPException(status_code=403, detail="Not authorized to delete this forum")
     db.delete(forum)
     db.commit()
+    response_cache.invalidate("forums", f"forum:{forum_id}", f"forum-comments:{forum_id}")
     return
 
 
@@ -158,36 +254,15 @@ def toggle_like_forum(
     current_user: Users = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    existing = db.query(ForumLike).filter_by(forum_id=forum_id, user_id=current_user.id).first()
-    forum = db.query(Forums).filter_by(id=forum_id).first()
-    if not forum:
+    result = set_like(db, "forums", forum_id, current_user.id)
+    if result is None:
         raise HTTPException(status_code=404, detail="Forum not found")
-
-    if existing:
-        db.delete(existing)
-        current_likes = forum.likes or 0
-        if current_likes > 0:  # type: ignore
-            setattr(forum, 'likes', current_likes - 1)
-        db.commit()
-    else:
-        like = ForumLike(forum_id=forum_id, user_id=current_user.id)
-        db.add(like)
-        current_likes = forum.likes or 0
-        setattr(forum, 'likes', current_likes + 1)
-        db.commit()
-
-    # Return the updated forum object
-    liked_by_current_user = db.query(ForumLike).filter_by(forum_id=forum_id, user_id=current_user.id).first() is not None
-    return ForumResponse(
-        id=str(forum.id),
-        title=str(forum.title),
-        content=str(forum.content),
-        author=str(forum.author),
-        likes=forum.likes or 0,  # type: ignore
-        timestamp=forum.timestamp,  # type: ignore
-        updated_timestamp=forum.updated_timestamp,  # type: ignore
-        liked_by_current_user=liked_by_current_user
-    )
+    # Built before the commit expires the row
+    updated = _forum_response(result.target, result.liked)
+    db.commit()
+    if result.changed:
+        response_cache.invalidate("forums", f"forum:{forum_id}")
+    return updated
 
 
 @router.delete("/{forum_id}/like", response_model=ForumResponse, status_code=200)
@@ -196,95 +271,86 @@ def delete_like_forum(
     current_user: Users = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    existing = db.query(ForumLike).filter_by(forum_id=forum_id, user_id=current_user.id).first()
-    forum = db.query(Forums).filter_by(id=forum_id).first()
-    if not forum:
+    result = set_like(db, "forums", forum_id, current_user.id, liked=False)
+    if result is None:
         raise HTTPException(status_code=404, detail="Forum not found")
+    # Built before the commit expires the row
+    updated = _forum_response(result.target, result.liked)
+    db.commit()
+    if result.changed:
+        response_cache.invalidate("forums", f"forum:{forum_id}")
+    return updated
 
-    if existing:
-        db.delete(existing)
-        if (forum.likes or 0) > 0:  # type: ignore
-            setattr(forum, 'likes', (forum.likes or 0) - 1)
-        db.commit()
-    
-    # After unlike (or if not previously liked), return the updated forum object
-    liked_by_current_user = db.query(ForumLike).filter_by(forum_id=forum_id, user_id=current_user.id).first() is not None
-    return ForumResponse(
-        id=str(forum.id),
-        title=str(forum.title),
-        content=str(forum.content),
-        author=str(forum.author),
-        likes=forum.likes or 0,  # type: ignore
-        timestamp=forum.timestamp,  # type: ignore
-        updated_timestamp=forum.updated_timestamp,  # type: ignore
-        liked_by_current_user=liked_by_current_user
-    )
+
+@router.get("/{forum_id}/likes", response_model=LikersPage, status_code=200)
+def get_forum_likes(
+    forum_id: str,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of likes to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor of the previous page"),
+    include_usernames: bool = Query(False, description="Add each liker's username"),
+    db: Session = Depends(get_db)
+):
+    """Who liked a forum, newest first; `total` is the forum's like counter"""
+    page = likers_page(db, "forums", forum_id, limit, cursor, include_usernames)
+    set_next_cursor(response, page.next_cursor)
+    return page
 
 
 # Forum Comments Endpoints
+@router.get("/{forum_id}/stream", status_code=status.HTTP_200_OK)
+def stream_forum_comments(forum_id: str, request: Request, db: Session = Depends(get_db)):
+    """Server-Sent Events for a forum's comments, with the events of GET /comments/post/{post_id}/stream"""
+    if db.query(Forums.id).filter(Forums.id == forum_id).first() is None:
+        raise HTTPException(status_code=404, detail="Forum not found")
+    return stream_response(f"forum-comments:{forum_id}", request)
+
+
 @router.get("/{forum_id}/comments", response_model=List[ForumComment], status_code=status.HTTP_200_OK)
-def get_forum_comments(forum_id: str, db: Session = Depends(get_db)):
-    comments = db.query(ForumCommentModel).filter(ForumCommentModel.forum_id == forum_id).all()
-    result = []
-    for c in comments:
-        result.append(ForumComment(
-            id=str(c.id),
-            comment=str(c.comment),
-            forum_id=str(c.forum_id),
-            parent_id=c.parent_id,  # type: ignore
-            user_id=c.user_id,  # type: ignore
-            username=c.username,  # type: ignore
-            liked_by_current_user=False,
-            likes=c.likes or 0,  # type: ignore
-            timestamp=c.timestamp  # type: ignore
-        ))
-    return result
+def get_forum_comments(
+    forum_id: str,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    cached = response_cache.lookup(request, f"forum-comments:{forum_id}", current_user)
+    if cached is not None:
+        return cached
+    rows = list_comments(db, page, response, current_user, in_thread("forum", forum_id))
+    result = [_forum_comment_response(*row) for row in rows]
+    return response_cache.store(request, response, f"forum-comments:{forum_id}", result, current_user)
 
 
 @router.get("/{forum_id}/comments/main", response_model=List[ForumComment], status_code=status.HTTP_200_OK)
-def get_main_forum_comments(forum_id: str, db: Session = Depends(get_db)):
-    main_comments = (
-        db.query(ForumCommentModel)
-        .filter(ForumCommentModel.forum_id == forum_id, ForumCommentModel.parent_id == None)
-        .all()
+def get_main_forum_comments(
+    forum_id: str,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    rows = list_comments(
+        db, page, response, current_user, in_thread("forum", forum_id), Comments.parent_id == None,
+        with_reply_counts=True
     )
-    
-    result = []
-    for comment in main_comments:
-        result.append(ForumComment(
-            id=str(comment.id),
-            comment=str(comment.comment),
-            forum_id=str(comment.forum_id),
-            parent_id=comment.parent_id,  # type: ignore
-            user_id=comment.user_id,  # type: ignore
-            username=comment.username,  # type: ignore
-            liked_by_current_user=False,
-            likes=comment.likes or 0,  # type: ignore
-            timestamp=comment.timestamp  # type: ignore
-        ))
-    
-    return result
+    return [_forum_comment_response(*row) for row in rows]
 
 
 @router.get("/{forum_id}/comments/replies/{comment_id}", response_model=List[ForumComment], status_code=status.HTTP_200_OK)
-def get_forum_comments_replied_to(comment_id: str, forum_id: str, db: Session = Depends(get_db)):
-    replies = db.query(ForumCommentModel).filter(ForumCommentModel.parent_id == comment_id).filter(ForumCommentModel.forum_id == forum_id).all()
-    
-    result = []
-    for reply in replies:
-        result.append(ForumComment(
-            id=str(reply.id),
-            comment=str(reply.comment),
-            forum_id=str(reply.forum_id),
-            parent_id=reply.parent_id,  # type: ignore
-            user_id=reply.user_id,  # type: ignore
-            username=reply.username,  # type: ignore
-            liked_by_current_user=False,
-            likes=reply.likes or 0,  # type: ignore
-            timestamp=reply.timestamp  # type: ignore
-        ))
-    
-    return result
+def get_forum_comments_replied_to(
+    comment_id: str,
+    forum_id: str,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    rows = list_comments(
+        db, page, response, current_user, Comments.parent_id == comment_id, in_thread("forum", forum_id)
+    )
+    return [_forum_comment_response(*row) for row in rows]
 
 
 @router.post("/{forum_id}/comments", response_model=ForumComment, status_code=status.HTTP_201_CREATED)
@@ -294,28 +360,8 @@ def post_forum_comment(
     current_user: Users = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    new_comment = ForumCommentModel(
-        id=shortuuid.uuid(),
-        comment=comment.comment,
-        forum_id=forum_id,
-        user_id=current_user.id,
-        username=current_user.username,
-        parent_id=comment.parent_id
-    )
-    db.add(new_comment)
-    db.commit()
-    db.refresh(new_comment)
-    return ForumComment(
-        id=str(new_comment.id),
-        comment=str(new_comment.comment),
-        forum_id=str(new_comment.forum_id),
-        parent_id=new_comment.parent_id,  # type: ignore
-        user_id=new_comment.user_id,  # type: ignore
-        username=new_comment.username,  # type: ignore
-        liked_by_current_user=False,
-        likes=new_comment.likes or 0,  # type: ignore
-        timestamp=new_comment.timestamp  # type: ignore
-    )
+    new_comment = create_comment(db, current_user, comment.comment, forum_id=forum_id, parent_id=comment.parent_id)
+    return _forum_comment_response(new_comment)
 
 
 @router.put("/{forum_id}/comments/{comment_id}", response_model=ForumComment, status_code=status.HTTP_200_OK)
@@ -326,27 +372,8 @@ def update_forum_comment(
     current_user: Users = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    item_to_update = db.query(ForumCommentModel).filter(ForumCommentModel.id == comment_id).first()
-    if item_to_update is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resource Not Found")
-    if item_to_update.user_id != current_user.id:  # type: ignore
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You can only edit your own comments")
-    
-    item_to_update.comment = updated_comment.comment  # type: ignore
-    db.commit()
-    
-    liked_by_current_user = db.query(ForumCommentLike).filter_by(comment_id=comment_id, user_id=current_user.id).first() is not None
-    return ForumComment(
-        id=str(item_to_update.id),
-        comment=str(item_to_update.comment),
-        forum_id=str(item_to_update.forum_id),
-        parent_id=item_to_update.parent_id,  # type: ignore
-        user_id=item_to_update.user_id,  # type: ignore
-        username=item_to_update.username,  # type: ignore
-        likes=item_to_update.likes or 0,  # type: ignore
-        liked_by_current_user=liked_by_current_user,
-        timestamp=item_to_update.timestamp  # type: ignore
-    )
+    row = edit_comment(db, comment_id, updated_comment.comment, current_user, in_thread("forum", forum_id))
+    return _forum_comment_response(*row)
 
 
 @router.delete("/{forum_id}/comments/{comment_id}", status_code=status.HTTP_200_OK)
@@ -356,19 +383,7 @@ def delete_forum_comment_with_replies(
     current_user: Users = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    comment_to_delete = db.query(ForumCommentModel).filter(ForumCommentModel.id == comment_id).first()
-    if not comment_to_delete:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
-    if comment_to_delete.user_id != current_user.id:  # type: ignore
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You can only delete your own comments")
-    
-    if comment_to_delete.parent_id is None:
-        child_comments = db.query(ForumCommentModel).filter(ForumCommentModel.parent_id == comment_id).all()
-        for child in child_comments:
-            db.delete(child)
-    
-    db.delete(comment_to_delete)
-    db.commit()
+    delete_comment(db, comment_id, current_user, in_thread("forum", forum_id))
     return {"detail": f"Comment with id {comment_id} and its replies have been deleted"}
 
 
@@ -379,34 +394,7 @@ def toggle_like_forum_comment(
     current_user: Users = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    existing = db.query(ForumCommentLike).filter_by(comment_id=comment_id, user_id=current_user.id).first()
-    comment = db.query(ForumCommentModel).filter_by(id=comment_id).first()
-    if not comment:
-        raise HTTPException(status_code=404, detail="Comment not found")
-
-    if existing:
-        db.delete(existing)
-        if comment.likes and comment.likes > 0:  # type: ignore
-            comment.likes -= 1  # type: ignore
-        db.commit()
-    else:
-        like = ForumCommentLike(comment_id=comment_id, user_id=current_user.id)
-        db.add(like)
-        comment.likes = (comment.likes or 0) + 1  # type: ignore
-        db.commit()
-
-    liked_by_current_user = db.query(ForumCommentLike).filter_by(comment_id=comment_id, user_id=current_user.id).first() is not None
-    return ForumComment(
-        id=str(comment.id),
-        comment=str(comment.comment),
-        forum_id=str(comment.forum_id),
-        parent_id=comment.parent_id,  # type: ignore
-        user_id=comment.user_id,  # type: ignore
-        username=comment.username,  # type: ignore
-        liked_by_current_user=liked_by_current_user,
-        likes=comment.likes or 0,  # type: ignore
-        timestamp=comment.timestamp  # type: ignore
-    )
+    return like_comment(db, comment_id, current_user, _forum_comment_response, in_thread("forum", forum_id))
 
 
 @router.delete("/{forum_id}/comments/{comment_id}/like", response_model=ForumComment, status_code=200)
@@ -416,74 +404,18 @@ def delete_like_forum_comment(
     current_user: Users = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    existing = db.query(ForumCommentLike).filter_by(comment_id=comment_id, user_id=current_user.id).first()
-    comment = db.query(ForumCommentModel).filter_by(id=comment_id).first()
-    if not comment:
-        raise HTTPException(status_code=404, detail="Comment not found")
-
-    if existing:
-        db.delete(existing)
-        if comment.likes and comment.likes > 0:  # type: ignore
-            comment.likes -= 1  # type: ignore
-        db.commit()
-    
-    liked_by_current_user = db.query(ForumCommentLike).filter_by(comment_id=comment_id, user_id=current_user.id).first() is not None
-    return ForumComment(
-        id=str(comment.id),
-        comment=str(comment.comment),
-        forum_id=str(comment.forum_id),
-        parent_id=comment.parent_id,  # type: ignore
-        user_id=comment.user_id,  # type: ignore
-        username=comment.username,  # type: ignore
-        liked_by_current_user=liked_by_current_user,
-        likes=comment.likes or 0,  # type: ignore
-        timestamp=comment.timestamp  # type: ignore
+    return like_comment(
+        db, comment_id, current_user, _forum_comment_response, in_thread("forum", forum_id), liked=False
     )
 
 
 # General forum comment endpoints (mimicking post comments behavior)
-@router.get("/comments", response_model=List[ForumComment], status_code=status.HTTP_200_OK)
-def get_all_forum_comments(db: Session = Depends(get_db)):
-    """
-    Get all forum comments - mimics post comments behavior
-    """
-    comments = db.query(ForumCommentModel).all()
-    result = []
-    for c in comments:
-        result.append(ForumComment(
-            id=str(c.id),
-            comment=str(c.comment),
-            forum_id=str(c.forum_id),
-            parent_id=c.parent_id,  # type: ignore
-            user_id=c.user_id,  # type: ignore
-            username=c.username,  # type: ignore
-            liked_by_current_user=False,
-            likes=c.likes or 0,  # type: ignore
-            timestamp=c.timestamp  # type: ignore
-        ))
-    return result
-
-
 @router.get("/comments/{comment_id}", response_model=ForumComment, status_code=200)
 def get_forum_comment(comment_id: str, db: Session = Depends(get_db)):
     """
     Get a specific forum comment by ID - mimics post comments behavior
     """
-    comment = db.query(ForumCommentModel).filter(ForumCommentModel.id == comment_id).first()
-    if comment is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Forum comment not found")
-    
-    return ForumComment(
-        id=str(comment.id),
-        comment=str(comment.comment),
-        forum_id=str(comment.forum_id),
-        parent_id=comment.parent_id,  # type: ignore
-        user_id=comment.user_id,  # type: ignore
-        username=comment.username,  # type: ignore
-        liked_by_current_user=False,  # Will be set by frontend if needed
-        likes=comment.likes or 0,  # type: ignore
-        timestamp=comment.timestamp  # type: ignore
-    )
+    return _forum_comment_response(find_comment(db, comment_id, ON_FORUMS, label="Forum comment"))
 
 
 @router.post("/comments", response_model=ForumComment, status_code=status.HTTP_201_CREATED)
@@ -495,28 +427,10 @@ def create_forum_comment(
     """
     Create a new forum comment - mimics post comments behavior
     """
-    new_comment = ForumCommentModel(
-        id=shortuuid.uuid(),
-        comment=comment.comment,
-        forum_id=comment.forum_id,
-        user_id=current_user.id,
-        username=current_user.username,
-        parent_id=comment.parent_id
-    )
-    db.add(new_comment)
-    db.commit()
-    db.refresh(new_comment)
-    return ForumComment(
-        id=str(new_comment.id),
-        comment=str(new_comment.comment),
-        forum_id=str(new_comment.forum_id),
-        parent_id=new_comment.parent_id,  # type: ignore
-        user_id=new_comment.user_id,  # type: ignore
-        username=new_comment.username,  # type: ignore
-        liked_by_current_user=False,
-        likes=new_comment.likes or 0,  # type: ignore
-        timestamp=new_comment.timestamp  # type: ignore
+    new_comment = create_comment(
+        db, current_user, comment.comment, forum_id=comment.forum_id, parent_id=comment.parent_id
     )
+    return _forum_comment_response(new_comment)
 
 
 @router.put("/comments/{comment_id}", response_model=ForumComment, status_code=status.HTTP_200_OK)
@@ -529,27 +443,8 @@ def update_forum_comment_general(
     """
     Update a forum comment - mimics post comments behavior
     """
-    item_to_update = db.query(ForumCommentModel).filter(ForumCommentModel.id == comment_id).first()
-    if item_to_update is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Forum comment not found")
-    if item_to_update.user_id != current_user.id:  # type: ignore
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You can only edit your own comments")
-    
-    item_to_update.comment = updated_comment.comment  # type: ignore
-    db.commit()
-    
-    liked_by_current_user = db.query(ForumCommentLike).filter_by(comment_id=comment_id, user_id=current_user.id).first() is not None
-    return ForumComment(
-        id=str(item_to_update.id),
-        comment=str(item_to_update.comment),
-        forum_id=str(item_to_update.forum_id),
-        parent_id=item_to_update.parent_id,  # type: ignore
-        user_id=item_to_update.user_id,  # type: ignore
-        username=item_to_update.username,  # type: ignore
-        likes=item_to_update.likes or 0,  # type: ignore
-        liked_by_current_user=liked_by_current_user,
-        timestamp=item_to_update.timestamp  # type: ignore
-    )
+    row = edit_comment(db, comment_id, updated_comment.comment, current_user, ON_FORUMS, label="Forum comment")
+    return _forum_comment_response(*row)
 
 
 @router.delete("/comments/{comment_id}", status_code=status.HTTP_200_OK)
@@ -561,19 +456,7 @@ def delete_forum_comment_general(
     """
     Delete a forum comment with replies - mimics post comments behavior
     """
-    comment_to_delete = db.query(ForumCommentModel).filter(ForumCommentModel.id == comment_id).first()
-    if not comment_to_delete:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Forum comment not found")
-    if comment_to_delete.user_id != current_user.id:  # type: ignore
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You can only delete your own comments")
-    
-    if comment_to_delete.parent_id is None:
-        child_comments = db.query(ForumCommentModel).filter(ForumCommentModel.parent_id == comment_id).all()
-        for child in child_comments:
-            db.delete(child)
-    
-    db.delete(comment_to_delete)
-    db.commit()
+    delete_comment(db, comment_id, current_user, ON_FORUMS, label="Forum comment")
     return {"detail": f"Forum comment with id {comment_id} and its replies have been deleted"}
 
 
@@ -586,34 +469,7 @@ def toggle_like_forum_comment_general(
     """
     Toggle like on a forum comment - mimics post comments behavior
     """
-    existing = db.query(ForumCommentLike).filter_by(comment_id=comment_id, user_id=current_user.id).first()
-    comment = db.query(ForumCommentModel).filter_by(id=comment_id).first()
-    if not comment:
-        raise HTTPException(status_code=404, detail="Forum comment not found")
-
-    if existing:
-        db.delete(existing)
-        if comment.likes and comment.likes > 0:  # type: ignore
-            comment.likes -= 1  # type: ignore
-        db.commit()
-    else:
-        like = ForumCommentLike(comment_id=comment_id, user_id=current_user.id)
-        db.add(like)
-        comment.likes = (comment.likes or 0) + 1  # type: ignore
-        db.commit()
-
-    liked_by_current_user = db.query(ForumCommentLike).filter_by(comment_id=comment_id, user_id=current_user.id).first() is not None
-    return ForumComment(
-        id=str(comment.id),
-        comment=str(comment.comment),
-        forum_id=str(comment.forum_id),
-        parent_id=comment.parent_id,  # type: ignore
-        user_id=comment.user_id,  # type: ignore
-        username=comment.username,  # type: ignore
-        liked_by_current_user=liked_by_current_user,
-        likes=comment.likes or 0,  # type: ignore
-        timestamp=comment.timestamp  # type: ignore
-    )
+    return like_comment(db, comment_id, current_user, _forum_comment_response, ON_FORUMS, label="Forum comment")
 
 
 @router.delete("/comments/{comment_id}/like", response_model=ForumComment, status_code=200)
@@ -625,103 +481,73 @@ def delete_like_forum_comment_general(
     """
     Remove like from a forum comment - mimics post comments behavior
     """
-    existing = db.query(ForumCommentLike).filter_by(comment_id=comment_id, user_id=current_user.id).first()
-    comment = db.query(ForumCommentModel).filter_by(id=comment_id).first()
-    if not comment:
-        raise HTTPException(status_code=404, detail="Forum comment not found")
-
-    if existing:
-        db.delete(existing)
-        if comment.likes and comment.likes > 0:  # type: ignore
-            comment.likes -= 1  # type: ignore
-        db.commit()
-    
-    liked_by_current_user = db.query(ForumCommentLike).filter_by(comment_id=comment_id, user_id=current_user.id).first() is not None
-    return ForumComment(
-        id=str(comment.id),
-        comment=str(comment.comment),
-        forum_id=str(comment.forum_id),
-        parent_id=comment.parent_id,  # type: ignore
-        user_id=comment.user_id,  # type: ignore
-        username=comment.username,  # type: ignore
-        liked_by_current_user=liked_by_current_user,
-        likes=comment.likes or 0,  # type: ignore
-        timestamp=comment.timestamp  # type: ignore
+    return like_comment(
+        db, comment_id, current_user, _forum_comment_response, ON_FORUMS, liked=False, label="Forum comment"
     )
 
 
+@router.get("/comments/{comment_id}/likes", response_model=LikersPage, status_code=200)
+def get_forum_comment_likes(
+    comment_id: str,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of likes to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor of the previous page"),
+    include_usernames: bool = Query(False, description="Add each liker's username"),
+    db: Session = Depends(get_db)
+):
+    """Who liked a forum comment, newest first"""
+    page = comment_likers(db, comment_id, limit, cursor, include_usernames, ON_FORUMS, label="Forum comment")
+    set_next_cursor(response, page.next_cursor)
+    return page
+
+
 # Forum-specific comment endpoints (mimicking post comments behavior)
 @router.get("/forum/{forum_id}/comments", response_model=List[ForumComment], status_code=status.HTTP_200_OK)
-def get_forum_comments_by_forum_id(forum_id: str, db: Session = Depends(get_db)):
+def get_forum_comments_by_forum_id(
+    forum_id: str,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
     """
     Get all comments for a specific forum - mimics post comments behavior
     """
-    comments = db.query(ForumCommentModel).filter(ForumCommentModel.forum_id == forum_id).all()
-    
-    result = []
-    for comment in comments:
-        result.append(ForumComment(
-            id=str(comment.id),
-            comment=str(comment.comment),
-            forum_id=str(comment.forum_id),
-            parent_id=comment.parent_id,  # type: ignore
-            user_id=comment.user_id,  # type: ignore
-            username=comment.username,  # type: ignore
-            liked_by_current_user=False,
-            likes=comment.likes or 0,  # type: ignore
-            timestamp=comment.timestamp  # type: ignore
-        ))
-    
-    return result
+    rows = list_comments(db, page, response, current_user, in_thread("forum", forum_id))
+    return [_forum_comment_response(*row) for row in rows]
 
 
 @router.get("/forum/{forum_id}/comments/main", response_model=List[ForumComment], status_code=status.HTTP_200_OK)
-def get_main_forum_comments_by_forum_id(forum_id: str, db: Session = Depends(get_db)):
+def get_main_forum_comments_by_forum_id(
+    forum_id: str,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
     """
     Get main comments for a specific forum - mimics post comments behavior
     """
-    main_comments = (
-        db.query(ForumCommentModel)
-        .filter(ForumCommentModel.forum_id == forum_id, ForumCommentModel.parent_id == None)
-        .all()
+    rows = list_comments(
+        db, page, response, current_user, in_thread("forum", forum_id), Comments.parent_id == None,
+        with_reply_counts=True
     )
-    
-    result = []
-    for comment in main_comments:
-        result.append(ForumComment(
-            id=str(comment.id),
-            comment=str(comment.comment),
-            forum_id=str(comment.forum_id),
-            parent_id=comment.parent_id,  # type: ignore
-            user_id=comment.user_id,  # type: ignore
-            username=comment.username,  # type: ignore
-            liked_by_current_user=False,
-            likes=comment.likes or 0,  # type: ignore
-            timestamp=comment.timestamp  # type: ignore
-        ))
-    
-    return result
+    return [_forum_comment_response(*row) for row in rows]
 
 
 @router.get("/forum/{forum_id}/comments/replies/{comment_id}", response_model=List[ForumComment], status_code=status.HTTP_200_OK)
-def get_forum_comments_replied_to_by_forum_id(comment_id: str, forum_id: str, db: Session = Depends(get_db)):
+def get_forum_comments_replied_to_by_forum_id(
+    comment_id: str,
+    forum_id: str,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
     """
     Get replies to a specific comment in a forum - mimics post comments behavior
     """
-    replies = db.query(ForumCommentModel).filter(ForumCommentModel.parent_id == comment_id).filter(ForumCommentModel.forum_id == forum_id).all()
-    
-    result = []
-    for reply in replies:
-        result.append(ForumComment(
-            id=str(reply.id),
-            comment=str(reply.comment),
-            forum_id=str(reply.forum_id),
-            parent_id=reply.parent_id,  # type: ignore
-            user_id=reply.user_id,  # type: ignore
-            username=reply.username,  # type: ignore
-            liked_by_current_user=False,
-            likes=reply.likes or 0,  # type: ignore
-            timestamp=reply.timestamp  # type: ignore
-        ))
-    
-    return result
\ No newline at end of file
+    rows = list_comments(
+        db, page, response, current_user, Comments.parent_id == comment_id, in_thread("forum", forum_id)
+    )
+    return [_forum_comment_response(*row) for row in rows]
\ No newline at end of file
@@ -1,8 +1,9 @@
 from datetime import datetime
-from app.config.postgres_config import Base, get_schema_kwargs, get_fk_reference
-from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey
+from app.config.postgres_config import Base, get_schema_kwargs, get_fk_reference, is_sqlite, attach_sqlite_fts
+from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, Index, Computed, UniqueConstraint
+from sqlalchemy.dialects.postgresql import TSVECTOR
 import shortuuid
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 
 schema_kwargs = get_schema_kwargs()
 
@@ -15,42 +16,44 @@ class Forums(Base):
     author = Column(String(255), nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
     updated_timestamp = Column(DateTime, default=datetime.utcnow)
+    # Bumped by every write to the row, including likes; drives ETag/Last-Modified
+    changed_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    if not is_sqlite():
+        search_vector = deferred(Column(TSVECTOR, Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(content, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(author, '')), 'C')",
+            persisted=True
+        )))
     forum_likes = relationship("ForumLike", backref="forum", cascade="all, delete-orphan")
-    forum_comments = relationship("ForumComment", backref="forum", cascade="all, delete-orphan")
+    # Forum comments live in the shared comments table, marked by forum_id
+    comments = relationship("Comments", back_populates="forum", cascade="all, delete-orphan")
     if schema_kwargs:
         __table_args__ = schema_kwargs  # type: ignore
 
 
-class ForumLike(Base):
-    __tablename__ = 'forum_likes'
-    id = Column(String(255), primary_key=True, default=lambda: shortuuid.uuid())
-    forum_id = Column(String(255), ForeignKey(get_fk_reference('forums'), ondelete='CASCADE'), nullable=False)
-    user_id = Column(String(255), ForeignKey(get_fk_reference('users'), ondelete='CASCADE'), nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow)
-    if schema_kwargs:
-        __table_args__ = schema_kwargs  # type: ignore
+# Full-text search index: GIN over the generated tsvector on Postgres, FTS5 on SQLite
+if is_sqlite():
+    attach_sqlite_fts(Forums.__table__, ['title', 'content', 'author'])
+else:
+    Index('ix_forums_search_vector', Forums.search_vector, postgresql_using='gin')
 
 
-class ForumComment(Base):
-    __tablename__ = 'forum_comments'
+class ForumLike(Base):
+    __tablename__ = 'forum_likes'
     id = Column(String(255), primary_key=True, default=lambda: shortuuid.uuid())
-    comment = Column(String(255), nullable=False)
     forum_id = Column(String(255), ForeignKey(get_fk_reference('forums'), ondelete='CASCADE'), nullable=False)
     user_id = Column(String(255), ForeignKey(get_fk_reference('users'), ondelete='CASCADE'), nullable=False)
-    parent_id = Column(String(255), nullable=True)
-    likes = Column(Integer, default=0)
-    username = Column(String(255), nullable=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
-    comment_likes = relationship("ForumCommentLike", backref="comment", cascade="all, delete-orphan")
     if schema_kwargs:
-        __table_args__ = schema_kwargs  # type: ignore
-
+        __table_args__ = (
+            UniqueConstraint('user_id', 'forum_id', name='_user_forum_uc'),
+            Index('ix_forum_likes_forum_id_timestamp', 'forum_id', 'timestamp', 'id'),
+            schema_kwargs
+        )
+    else:
+        __table_args__ = (
+            UniqueConstraint('user_id', 'forum_id', name='_user_forum_uc'),
+            Index('ix_forum_likes_forum_id_timestamp', 'forum_id', 'timestamp', 'id'),
+        )
 
-class ForumCommentLike(Base):
-    __tablename__ = 'forum_comment_likes'
-    id = Column(String(255), primary_key=True, default=lambda: shortuuid.uuid())
-    comment_id = Column(String(255), ForeignKey(get_fk_reference('forum_comments'), ondelete='CASCADE'), nullable=False)
-    user_id = Column(String(255), ForeignKey(get_fk_reference('users'), ondelete='CASCADE'), nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow)
-    if schema_kwargs:
-        __table_args__ = schema_kwargs  # type: ignore
\ No newline at end of file
@@ -24,6 +24,7 @@ class ForumResponse(ForumBase):
     timestamp: datetime
     updated_timestamp: datetime
     liked_by_current_user: Optional[bool] = False
+    comment_count: Optional[int] = None  # filled by the forum listing
 
     class Config:
         orm_mode = True
@@ -51,4 +52,5 @@ class ForumComment(ForumCommentBase):
     liked_by_current_user: Optional[bool] = False
     likes: Optional[int] = 0
     timestamp: Optional[datetime] = None
+    reply_count: Optional[int] = None  # direct replies; filled by the main-comment listings
 
@@ -1,17 +1,27 @@
 from datetime import datetime
-from app.config.postgres_config import Base, get_schema_kwargs, get_fk_reference
-from sqlalchemy import Column, String, Text, Integer, DateTime, JSON, ForeignKey, UniqueConstraint
+from app.config.postgres_config import Base, get_schema_kwargs, get_fk_reference, is_sqlite, attach_sqlite_fts
+from sqlalchemy import (
+    Column, String, Text, Integer, Float, DateTime, JSON, ForeignKey, UniqueConstraint, Index, Computed, text
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 import shortuuid
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 
 schema_kwargs = get_schema_kwargs()
 
 class PostLike(Base):
     __tablename__ = 'post_likes'
     if schema_kwargs:
-        __table_args__ = (UniqueConstraint('user_id', 'post_id', name='_user_post_uc'), schema_kwargs)
+        __table_args__ = (
+            UniqueConstraint('user_id', 'post_id', name='_user_post_uc'),
+            Index('ix_post_likes_post_id_created_at', 'post_id', 'created_at', 'id'),
+            schema_kwargs
+        )
     else:
-        __table_args__ = (UniqueConstraint('user_id', 'post_id', name='_user_post_uc'),)
+        __table_args__ = (
+            UniqueConstraint('user_id', 'post_id', name='_user_post_uc'),
+            Index('ix_post_likes_post_id_created_at', 'post_id', 'created_at', 'id'),
+        )
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(String(255), ForeignKey(get_fk_reference('users')), nullable=False)
     post_id = Column(String(255), ForeignKey(get_fk_reference('posts')), nullable=False)
@@ -20,14 +30,103 @@ class PostLike(Base):
 class Posts(Base):
     __tablename__ = 'posts'
     if schema_kwargs:
-        __table_args__ = schema_kwargs
+        __table_args__ = (
+            Index('ix_posts_timestamp_id', 'timestamp', 'id'),
+            Index('ix_posts_likes_id', 'likes', 'id'),
+            Index('ix_posts_changed_at', 'changed_at'),
+            schema_kwargs
+        )
+    else:
+        __table_args__ = (
+            Index('ix_posts_timestamp_id', 'timestamp', 'id'),
+            Index('ix_posts_likes_id', 'likes', 'id'),
+            Index('ix_posts_changed_at', 'changed_at'),
+        )
     id = Column(String(255), primary_key=True, default=lambda: shortuuid.uuid())
     title = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
     image_url = Column(String(512), nullable=False)
+    # pending while the background upload runs, then ready or failed
+    image_status = Column(String(16), nullable=False, default='ready', server_default='ready')
+    # Content hash of the stored image, a reference on ImageBlob; NULL for the default image
+    image_sha256 = Column(String(64), nullable=True)
     likes = Column(Integer, default=0)
     author = Column(String(255), nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
+    # Bumped by every write to the row or its comment thread; drives ETag/Last-Modified
+    changed_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     stats = Column(JSON, nullable=True)
+    if not is_sqlite():
+        search_vector = deferred(Column(TSVECTOR, Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(content, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(author, '')), 'C')",
+            persisted=True
+        )))
     comments = relationship("Comments", back_populates="post", cascade="all, delete-orphan")
     post_likes = relationship("PostLike", backref="post", cascade="all, delete-orphan")
+    stat_values = relationship("PostStat", cascade="all, delete-orphan", passive_deletes=True)
+
+
+class PostStat(Base):
+    """Typed, indexed projection of Posts.stats used for filtering and sorting"""
+    __tablename__ = 'post_stats'
+    if schema_kwargs:
+        __table_args__ = (Index('ix_post_stats_stat_value', 'stat', 'value', 'post_id'), schema_kwargs)
+    else:
+        __table_args__ = (Index('ix_post_stats_stat_value', 'stat', 'value', 'post_id'),)
+    post_id = Column(String(255), ForeignKey(get_fk_reference('posts'), ondelete='CASCADE'), primary_key=True)
+    stat = Column(String(64), primary_key=True)
+    value = Column(Float, nullable=False)
+
+
+class ImageBlob(Base):
+    """A stored image keyed by the SHA-256 of its bytes, shared by every post that uploaded it"""
+    __tablename__ = 'image_blobs'
+    if schema_kwargs:
+        __table_args__ = schema_kwargs  # type: ignore
+    sha256 = Column(String(64), primary_key=True)
+    url = Column(String(512), nullable=False)
+    content_type = Column(String(32), nullable=False)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# True for a queued or running delete job; at most one row may match
+ACTIVE_DELETE_JOB = "status IN ('queued', 'running')"
+
+
+def active_delete_job_index() -> Index:
+    """Unique over a constant among active rows, so the database admits a single active job"""
+    return Index(
+        'uq_post_delete_jobs_active', text(f"({ACTIVE_DELETE_JOB})"), unique=True,
+        sqlite_where=text(ACTIVE_DELETE_JOB), postgresql_where=text(ACTIVE_DELETE_JOB)
+    )
+
+
+class PostDeleteJob(Base):
+    """Progress of a background DELETE /posts/all, committed after every chunk so it can resume"""
+    __tablename__ = 'post_delete_jobs'
+    if schema_kwargs:
+        __table_args__ = (active_delete_job_index(), schema_kwargs)  # type: ignore
+    else:
+        __table_args__ = (active_delete_job_index(),)  # type: ignore
+    id = Column(String(255), primary_key=True, default=lambda: shortuuid.uuid())
+    status = Column(String(16), nullable=False, default='queued')
+    requested_by = Column(String(255), nullable=True)
+    total = Column(Integer, nullable=False, default=0)
+    deleted = Column(Integer, nullable=False, default=0)
+    image_errors = Column(Integer, nullable=False, default=0)
+    # Image URLs released by the last committed chunk, deleted before the next one starts
+    pending_images = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# Full-text search index: GIN over the generated tsvector on Postgres, FTS5 on SQLite
+if is_sqlite():
+    attach_sqlite_fts(Posts.__table__, ['title', 'content', 'author'])
+else:
+    Index('ix_posts_search_vector', Posts.search_vector, postgresql_using='gin')
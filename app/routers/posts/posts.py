@@ -3,14 +3,31 @@ from datetime import datetime
 from fastapi import APIRouter, status, HTTPException, Depends, UploadFile, File, Form, Response, Query, Request
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import or_
-from .models import Posts, PostLike
-from .schemas import PostResponse
+from sqlalchemy import func
+from starlette.concurrency import run_in_threadpool
+from .models import Posts, PostLike, PostDeleteJob
+from .schemas import PostResponse, SimilarPostResponse, PostDeleteJobResponse, PostComparisonResponse
 from typing import List, Optional
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_current_user, get_current_user_optional
 from app.routers.users.models import Users
 from app.config.postgres_config import get_db
-from app.config.cloudinary_config import upload_image, delete_image_from_cloudinary, ALLOWED_TYPES, MAX_FILE_SIZE, DEFAULT_IMAGE_URL
+from app.services.pagination import decode_cursor, keyset_filter, order_columns, paginate, set_next_cursor
+from app.services.likes import liked_target_ids, likers_page, set_like, LikersPage
+from app.services.conditional import conditional_response, make_etag
+from app.services.cache import response_cache
+from app.services.search import match_filter, search_tokens
+from app.services.similarity import stats_similarity_index, METRICS as SIMILARITY_METRICS
+from app.services.post_stats import (
+    compare_stats, join_stat_sort, stat_range_filter, stat_rows, stat_sort_name, validate_stats
+)
+from app.services.uploads import spool_image_upload
+from app.services.image_uploads import image_upload_queue, IMAGE_PENDING, IMAGE_READY
+from app.services.image_store import acquire_image, release_image
+from app.services.bulk_delete import start_delete_all_job
+from app.services.export import export_response
+from app.services.comment_store import comment_counts
+from app.services.bulk_import import import_upload, ImportReport, IMPORT_CHUNK_SIZE, MAX_IMPORT_CHUNK_SIZE
+from app.config.cloudinary_config import delete_image, DEFAULT_IMAGE_URL
 import shortuuid
 import json
 
@@ -23,66 +40,184 @@ class Config:
     orm_mode = True
 
 
+POST_SORTS = ("newest", "most_liked", "title")
+MAX_COMPARE_POSTS = 20
+POST_EXPORT_COLUMNS = (
+    Posts.id, Posts.title, Posts.content, Posts.image_url, Posts.image_status,
+    Posts.likes, Posts.author, Posts.timestamp, Posts.stats,
+)
+
+
+def _post_sort_columns(sort: str, stat_value=None):
+    """Return the keyset columns for a sort option and whether they are descending"""
+    if stat_value is not None:
+        return [stat_value, Posts.id], True
+    if sort == "most_liked":
+        return [Posts.likes, Posts.id], True
+    if sort == "title":
+        return [Posts.title, Posts.id], False
+    return [Posts.timestamp, Posts.id], True
+
+
+def _post_response(post: Posts, liked: bool = False, comment_count: Optional[int] = None) -> PostResponse:
+    return PostResponse(
+        id=str(post.id),
+        title=str(post.title),
+        content=str(post.content),
+        image_url=str(post.image_url),
+        likes=post.likes or 0,  # type: ignore
+        author=str(post.author),
+        timestamp=post.timestamp,  # type: ignore
+        stats=post.stats,  # type: ignore
+        likedByCurrentUser=liked,
+        image_status=str(post.image_status or IMAGE_READY),
+        comment_count=comment_count
+    )
+
+
 @router.get("", response_model=List[PostResponse], status_code=status.HTTP_200_OK)
 def get_posts(
-    search: Optional[str] = Query(None, description="Search posts by title or content"),
+    request: Request,
+    response: Response,
+    search: Optional[str] = Query(None, description="Search posts by title, content or author"),
+    sort: str = Query("newest", description="Sort order: newest, most_liked, title or stat:<name> (highest first)"),
+    stat: Optional[List[str]] = Query(
+        None, description="Stat range filter as name:min..max, e.g. speed:9.. or control:8..10"
+    ),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of posts to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
     db: Session = Depends(get_db)
 ):
     """
-    Get all posts with optional search functionality
+    Get a page of posts with optional search and stat range filters.
+    Like counts come from the maintained Posts.likes counter, and the cursor
+    for the next page is returned in the X-Next-Cursor response header.
+    Answers 304 when If-None-Match/If-Modified-Since show the client's page is current.
     """
+    sort_stat = stat_sort_name(sort)
+    if sort not in POST_SORTS and sort_stat is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sort option")
+    cached = response_cache.lookup(request, "posts", current_user)
+    if cached is not None:
+        return cached
+
+    post_count, last_changed = db.query(func.count(Posts.id), func.max(Posts.changed_at)).one()
+    viewer = current_user.id if current_user else None
+    etag = make_etag("posts", post_count, last_changed, viewer, str(request.url.query))
+    not_modified = conditional_response(request, response, etag, last_changed)
+    if not_modified is not None:
+        return not_modified
+
     query = db.query(Posts)
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                Posts.title.ilike(search_term),
-                Posts.content.ilike(search_term),
-                Posts.author.ilike(search_term)
-            )
+    stat_value = None
+    if sort_stat is not None:
+        query, stat_value = join_stat_sort(query, sort_stat)
+    sort_columns, descending = _post_sort_columns(sort, stat_value)
+    # The sort key is selected alongside each row so the next cursor can be built from it
+    query = query.add_columns(*sort_columns)
+
+    for stat_range in stat or []:
+        query = query.filter(stat_range_filter(stat_range))
+    search_terms = search_tokens(search)
+    if search_terms:
+        query = query.filter(match_filter(Posts, search_terms))
+    if cursor:
+        query = query.filter(keyset_filter(sort_columns, decode_cursor(cursor, len(sort_columns)), descending))
+
+    rows = query.order_by(*order_columns(sort_columns, descending)).limit(limit + 1).all()
+    page, next_cursor = paginate(rows, limit, lambda row: list(row[1:]))
+    set_next_cursor(response, next_cursor)
+    ids = [row[0].id for row in page]
+    liked = liked_target_ids(db, PostLike, "post_id", current_user, ids)
+    counts = comment_counts(db, "post", ids)
+    posts = [_post_response(row[0], str(row[0].id) in liked, counts.get(str(row[0].id), 0)) for row in page]
+    return response_cache.store(request, response, "posts", posts, current_user)
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+def export_posts(format: str = Query("ndjson", description="ndjson or csv")):
+    """Stream every post as NDJSON or CSV, in the column layout POST /posts/import accepts"""
+    return export_response("posts", POST_EXPORT_COLUMNS, format)
+
+
+@router.get("/compare", response_model=PostComparisonResponse, status_code=status.HTTP_200_OK)
+def compare_posts(
+    ids: str = Query(..., description="Comma-separated post ids to compare, e.g. a,b,c"),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    """
+    Compare the stats of several posts, loaded in one query. Stats are aligned on the
+    union of keys, in the order the ids were given, with deltas, ranks and the best post.
+    """
+    post_ids = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+    if not 2 <= len(post_ids) <= MAX_COMPARE_POSTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Provide between 2 and {MAX_COMPARE_POSTS} distinct post ids"
         )
-    posts = query.all()
-    result = []
-    for post in posts:
-        likes_count = db.query(PostLike).filter_by(post_id=post.id).count()
-        # likedByCurrentUser is always False for unauthenticated
-        result.append(PostResponse(
-            id=str(post.id),
-            title=str(post.title),
-            content=str(post.content),
-            image_url=str(post.image_url),
-            likes=likes_count,
-            author=str(post.author),
-            timestamp=post.timestamp,  # type: ignore
-            stats=post.stats,  # type: ignore
-            likedByCurrentUser=False
-        ))
-    return result
+    posts = {str(p.id): p for p in db.query(Posts).filter(Posts.id.in_(post_ids)).all()}
+    missing = [i for i in post_ids if i not in posts]
+    if missing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Posts not found: {', '.join(missing)}")
+
+    ordered = [posts[i] for i in post_ids]
+    liked = liked_target_ids(db, PostLike, "post_id", current_user, post_ids)
+    return PostComparisonResponse(
+        posts=[_post_response(p, str(p.id) in liked) for p in ordered],
+        stats=compare_stats(post_ids, [p.stats for p in ordered]),
+    )
 
 
 @router.get("/{post_id}", response_model=PostResponse, status_code=status.HTTP_200_OK)
-def get_post(post_id: str, request: Request, db: Session = Depends(get_db)):
+def get_post(post_id: str, request: Request, response: Response, db: Session = Depends(get_db)):
+    user = getattr(request.state, 'user', None)
+    cached = response_cache.lookup(request, f"post:{post_id}", user)
+    if cached is not None:
+        return cached
     post = db.query(Posts).filter(Posts.id == post_id).first()
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
-    likes_count = db.query(PostLike).filter_by(post_id=post.id).count()
     liked = False
-    user = None
-    if hasattr(request, 'state') and hasattr(request.state, 'user'):
-        user = request.state.user
     if user and hasattr(user, 'id'):
         liked = db.query(PostLike).filter_by(post_id=post.id, user_id=user.id).first() is not None
-    return PostResponse(
-        id=str(post.id),
-        title=str(post.title),
-        content=str(post.content),
-        image_url=str(post.image_url),
-        likes=likes_count,
-        author=str(post.author),
-        timestamp=post.timestamp,  # type: ignore
-        stats=post.stats,  # type: ignore
-        likedByCurrentUser=liked
-    )
+    return response_cache.store(request, response, f"post:{post_id}", _post_response(post, liked), user)
+
+
+@router.get("/{post_id}/similar", response_model=List[SimilarPostResponse], status_code=status.HTTP_200_OK)
+def get_similar_posts(
+    post_id: str,
+    k: int = Query(10, ge=1, le=100, description="Number of similar posts to return"),
+    metric: str = Query("euclidean", description="Distance metric: euclidean or cosine"),
+    current_user: Optional[Users] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the posts whose stats are closest to the given post, nearest first.
+    Distances only compare the stat keys both posts have.
+    """
+    if metric not in SIMILARITY_METRICS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid distance metric")
+    stats_similarity_index.ensure_loaded(db)
+    neighbours = stats_similarity_index.nearest(post_id, k, metric)
+
+    ids = [neighbour_id for neighbour_id, _ in neighbours]
+    posts = {str(p.id): p for p in db.query(Posts).filter(Posts.id.in_(ids + [post_id])).all()}
+    if post_id not in posts:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+    liked = liked_target_ids(db, PostLike, "post_id", current_user, ids)
+    return [
+        SimilarPostResponse(**_post_response(posts[i], i in liked).model_dump(), distance=distance)
+        for i, distance in neighbours
+        if i in posts
+    ]
+
+
+def _save_post(db: Session, post: Posts) -> None:
+    db.add(post)
+    db.commit()
+    db.refresh(post)
 
 
 @router.post("", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
@@ -95,75 +230,63 @@ async def create_post(
         db: Session = Depends(get_db)
 ):
     import json
+    spooled = None
+    image_url = None
     try:
-        image_url = DEFAULT_IMAGE_URL
-
         stats_dict = None
         if stats:
             try:
                 stats_dict = json.loads(stats)
             except Exception:
                 raise HTTPException(status_code=400, detail="Invalid stats JSON format")
+            try:
+                stats_dict = validate_stats(stats_dict)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
 
         if image and image.filename:
-            # Validate file type
-            if image.content_type not in ALLOWED_TYPES:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Unsupported file type. Only JPEG, PNG, and WEBP are allowed."
-                )
-
-            # Validate file size
-            file_size = 0
-            for chunk in image.file:
-                file_size += len(chunk)
-                if file_size > MAX_FILE_SIZE:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="File size exceeds 5MB limit"
-                    )
-            image.file.seek(0)
-
-            # Upload using environment-based logic
-            try:
-                image_url = upload_image(image)
-            except Exception as e:
+            # Validate type and size in one pass over the upload the server already spooled
+            spooled = await spool_image_upload(image)
+            # Identical bytes already stored only gain a reference, without another upload
+            image_url = await run_in_threadpool(acquire_image, db, spooled.sha256)
+            if image_url is None and not image_upload_queue.reserve():
                 raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to upload image: {str(e)}"
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many image uploads in progress, please retry shortly"
                 )
 
         new_post = Posts(
             title=title,
             content=content,
-            image_url=image_url,
+            image_url=image_url or DEFAULT_IMAGE_URL,  # Replaced by the upload queue once the image is stored
+            image_status=IMAGE_PENDING if spooled and not image_url else IMAGE_READY,
+            image_sha256=spooled.sha256 if image_url else None,
             likes=0,
             author=current_user.username,  # Use authenticated user's username
             stats=stats_dict,  # Store as dict/JSON
+            stat_values=stat_rows(stats_dict),
         )
 
-        db.add(new_post)
-        db.commit()
-        db.refresh(new_post)
-
-        # Calculate likes and likedByCurrentUser
-        likes_count = db.query(PostLike).filter_by(post_id=new_post.id).count()
-        liked = False
-        if current_user:
-            liked = db.query(PostLike).filter_by(post_id=new_post.id, user_id=current_user.id).first() is not None
-
-        return PostResponse(
-            id=str(new_post.id),
-            title=str(new_post.title),
-            content=str(new_post.content),
-            image_url=str(new_post.image_url),
-            likes=likes_count,
-            author=str(new_post.author),
-            timestamp=new_post.timestamp,  # type: ignore
-            stats=new_post.stats,  # type: ignore
-            likedByCurrentUser=liked
-        )
+        try:
+            await run_in_threadpool(_save_post, db, new_post)
+        except Exception:
+            if spooled and not image_url:
+                image_upload_queue.release()
+            raise
+        response_cache.invalidate("posts")
+        stats_similarity_index.upsert(str(new_post.id), stats_dict)
 
+        if spooled and not image_url:
+            # Upload in the background; the post is returned with image_status "pending"
+            image_upload_queue.submit(str(new_post.id), spooled)
+            spooled = None
+
+        # A new post has no likes yet, so the counter and likedByCurrentUser start empty
+        return _post_response(new_post)
+
+    except HTTPException:
+        db.rollback()
+        raise
     except IntegrityError:
         db.rollback()
         raise HTTPException(
@@ -176,82 +299,105 @@ async def create_post(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating post: {str(e)}"
         )
+    finally:
+        if spooled:
+            spooled.discard()
 
 
 def is_default_image(image_url: str) -> bool:
     return image_url.startswith("/static/default/")
 
 
-@router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_post(post_id: str, db: Session = Depends(get_db), current_user: Users = Depends(get_current_user)):
-    post = db.query(Posts).filter(Posts.id == post_id).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-    if str(post.author) != str(current_user.username):
-        raise HTTPException(status_code=403, detail="Not authorized to delete this post")
-    db.delete(post)
-    db.commit()
-    return
+@router.post("/import", response_model=ImportReport, status_code=status.HTTP_200_OK)
+def import_posts(
+    file: UploadFile = File(..., description="NDJSON (one JSON object per line) or CSV with a header row"),
+    format: Optional[str] = Query(None, description="ndjson or csv; defaults to the file extension"),
+    chunk_size: int = Query(
+        IMPORT_CHUNK_SIZE, ge=1, le=MAX_IMPORT_CHUNK_SIZE, description="Rows validated and inserted per batch"
+    ),
+    current_user: Users = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import posts (title, content, optional image_url and stats) authored by the current user.
+    Rows are validated and inserted in batches; invalid rows are skipped and listed by line number
+    in the report.
+    """
+    return import_upload(db, "posts", file, current_user, format, chunk_size)
 
 
-@router.delete("/all", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/all", response_model=PostDeleteJobResponse, status_code=status.HTTP_202_ACCEPTED)
 def delete_all_posts(
     current_user: Users = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    """
+    Start a background job that deletes every post and its images, or return the
+    job already in progress. Poll GET /posts/delete-jobs/{job_id} for progress.
+    """
     # Only allow admin users to delete all posts (you might want to add an admin field to users)
-    try:
-        posts = db.query(Posts).all()
+    return start_delete_all_job(db, str(current_user.username))
 
-        for post in posts:
-            if not is_default_image(getattr(post, 'image_url', '')):
-                # Delete from Cloudinary
-                delete_image_from_cloudinary(post.image_url)
 
-        db.query(Posts).delete()
-        db.commit()
+@router.get("/delete-jobs/{job_id}", response_model=PostDeleteJobResponse, status_code=status.HTTP_200_OK)
+def get_delete_job(job_id: str, db: Session = Depends(get_db), current_user: Users = Depends(get_current_user)):
+    job = db.get(PostDeleteJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Delete job not found")
+    return job
 
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(500, f"Error deleting posts: {str(e)}")
+
+@router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_post(post_id: str, db: Session = Depends(get_db), current_user: Users = Depends(get_current_user)):
+    post = db.query(Posts).filter(Posts.id == post_id).first()
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+    if str(post.author) != str(current_user.username):
+        raise HTTPException(status_code=403, detail="Not authorized to delete this post")
+    unused_image_url = release_image(db, post.image_sha256)
+    db.delete(post)
+    db.commit()
+    response_cache.invalidate("posts", f"post:{post_id}", f"post-comments:{post_id}")
+    if unused_image_url:
+        delete_image(unused_image_url)
+    stats_similarity_index.remove(post_id)
+    return
 
 
 @router.post("/{post_id}/like", status_code=204)
 def like_post(post_id: str, db: Session = Depends(get_db), current_user: Users = Depends(get_current_user)):
-    # Check if post exists
-    post = db.query(Posts).filter(Posts.id == post_id).first()
-    if not post:
+    result = set_like(db, "posts", post_id, current_user.id, liked=True)
+    if result is None:
         raise HTTPException(status_code=404, detail="Post not found")
-    
-    like = db.query(PostLike).filter_by(user_id=current_user.id, post_id=post_id).first()
-    if like:
+    if not result.changed:
         raise HTTPException(status_code=400, detail="Already liked")
-    db.add(PostLike(user_id=current_user.id, post_id=post_id))
     db.commit()
+    response_cache.invalidate("posts", f"post:{post_id}")
     return Response(status_code=204)
 
 
 @router.delete("/{post_id}/like", status_code=204)
 def unlike_post(post_id: str, db: Session = Depends(get_db), current_user: Users = Depends(get_current_user)):
-    # Check if post exists
-    post = db.query(Posts).filter(Posts.id == post_id).first()
-    if not post:
+    result = set_like(db, "posts", post_id, current_user.id, liked=False)
+    if result is None:
         raise HTTPException(status_code=404, detail="Post not found")
-    
-    like = db.query(PostLike).filter_by(user_id=current_user.id, post_id=post_id).first()
-    if not like:
+    if not result.changed:
         raise HTTPException(status_code=400, detail="Not liked yet")
-    db.delete(like)
     db.commit()
+    response_cache.invalidate("posts", f"post:{post_id}")
     return Response(status_code=204)
 
 
-@router.get("/{post_id}/likes", status_code=200)
-def get_post_likes(post_id: str, db: Session = Depends(get_db)):
-    # Check if post exists
-    post = db.query(Posts).filter(Posts.id == post_id).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-    
-    likes = db.query(PostLike).filter_by(post_id=post_id).all()
-    return [{"user_id": like.user_id, "created_at": like.created_at} for like in likes]
+@router.get("/{post_id}/likes", response_model=LikersPage, status_code=200)
+def get_post_likes(
+    post_id: str,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of likes to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor of the previous page"),
+    include_usernames: bool = Query(False, description="Add each liker's username"),
+    db: Session = Depends(get_db)
+):
+    """Who liked a post, newest first; `total` is the post's like counter"""
+    page = likers_page(db, "posts", post_id, limit, cursor, include_usernames)
+    set_next_cursor(response, page.next_cursor)
+    return page
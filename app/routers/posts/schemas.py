@@ -1,6 +1,6 @@
 # app/routers/posts/schemas.py
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from pydantic import BaseModel, field_validator
 
 
@@ -30,6 +30,53 @@ class PostCreate(PostBase):
     pass
 
 
+class PostImport(BaseModel):
+    """One row of a bulk import; the importer sets the author, timestamps and counters"""
+    title: str
+    content: str
+    image_url: Optional[str] = None
+    stats: Optional[Dict[str, float]] = None
+
+    @field_validator('stats')
+    @classmethod
+    def validate_stats(cls, v):
+        return PostBase.validate_stats(v)
+
+
 class PostResponse(PostBase):
     id: str
     likedByCurrentUser: bool
+    image_status: str = "ready"
+    comment_count: Optional[int] = None  # filled by the post listing
+
+
+class SimilarPostResponse(PostResponse):
+    distance: float
+
+
+class StatComparison(BaseModel):
+    """One stat across the compared posts; lists are aligned with PostComparisonResponse.posts"""
+    stat: str
+    values: List[Optional[float]]
+    deltas: List[Optional[float]]  # value minus the best value for this stat
+    ranks: List[Optional[int]]  # 1 = highest; ties share a rank
+    best_post_id: str
+
+
+class PostComparisonResponse(BaseModel):
+    posts: List[PostResponse]
+    stats: List[StatComparison]
+
+
+class PostDeleteJobResponse(BaseModel):
+    id: str
+    status: str
+    total: int
+    deleted: int
+    image_errors: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,13 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+
+class SearchResult(BaseModel):
+    type: str
+    id: str
+    title: str
+    snippet: str
+    author: str
+    timestamp: Optional[datetime] = None
+    score: float
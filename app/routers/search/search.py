@@ -0,0 +1,48 @@
+from fastapi import APIRouter, status, HTTPException, Depends, Query, Response
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from .schemas import SearchResult
+from app.config.postgres_config import get_db
+from app.routers.posts.models import Posts
+from app.routers.forums.models import Forums
+from app.services.pagination import set_next_cursor
+from app.services.search import search_documents
+
+router = APIRouter(prefix="/search")
+
+SEARCH_TYPES = {
+    "posts": {"post": Posts},
+    "forums": {"forum": Forums},
+    "all": {"post": Posts, "forum": Forums},
+}
+SNIPPET_LENGTH = 200
+
+
+@router.get("", response_model=List[SearchResult], status_code=status.HTTP_200_OK)
+def search(
+    response: Response,
+    q: str = Query(..., min_length=1, description="Search terms"),
+    type: str = Query("all", description="What to search: all, posts or forums"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    db: Session = Depends(get_db)
+):
+    """
+    Relevance-ranked full-text search over posts and forums - Public endpoint
+    """
+    if type not in SEARCH_TYPES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid search type")
+    rows, next_cursor = search_documents(db, SEARCH_TYPES[type], q, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return [
+        SearchResult(
+            type=row.type,
+            id=str(row.id),
+            title=str(row.title),
+            snippet=str(row.content)[:SNIPPET_LENGTH],
+            author=str(row.author),
+            timestamp=row.timestamp,
+            score=row.score
+        )
+        for row in rows
+    ]
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, status, HTTPException, Depends
+from fastapi import APIRouter, status, HTTPException, Depends, Query
 from sqlalchemy import null
 from sqlalchemy.orm import Session
 from .models import Users
@@ -8,10 +8,13 @@ from app.auth.jwt_handler import jwt_handler
 from app.auth.dependencies import get_current_user
 from .schemas import User, UserCreate, UserLogin, UserResponse, LoginResponse
 from app.config.postgres_config import get_db
+from app.services.export import export_response
 import shortuuid
 
 router = APIRouter(prefix="/users")
 
+USER_EXPORT_COLUMNS = (Users.id, Users.username, Users.email, Users.timestamp)
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 class Config:
@@ -28,6 +31,14 @@ def get_users(db: Session = Depends(get_db)):
     users = db.query(Users).all()
     return users
 
+@router.get("/export", status_code=status.HTTP_200_OK)
+def export_users(
+    format: str = Query("ndjson", description="ndjson or csv"),
+    current_user: Users = Depends(get_current_user)
+):
+    """Stream the same user fields as GET /users as NDJSON or CSV; requires a signed-in user"""
+    return export_response("users", USER_EXPORT_COLUMNS, format)
+
 @router.get("/{user_id}", response_model=UserResponse, status_code=status.HTTP_200_OK)
 def get_user_by_id(user_id: str, db: Session = Depends(get_db)):
     user = db.query(Users).filter(Users.id == user_id).first()
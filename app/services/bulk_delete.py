@@ -0,0 +1,161 @@
+import logging
+import os
+import threading
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config.cloudinary_config import delete_images
+from app.config.postgres_config import SessionLocal
+from app.routers.posts.models import Posts, PostLike, PostDeleteJob
+from app.services.cache import response_cache
+from app.services.image_store import release_image
+from app.services.similarity import stats_similarity_index
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+ACTIVE_JOB_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+DELETE_CHUNK_SIZE = int(os.getenv("POST_DELETE_CHUNK_SIZE", "500"))
+
+logger = logging.getLogger(__name__)
+
+_running_jobs = set()
+_running_lock = threading.Lock()
+
+
+def start_delete_all_job(db: Session, requested_by: str) -> PostDeleteJob:
+    """
+    Queue a background job that deletes every post, or return the job already in progress.
+    A new job takes over the images that failed jobs had released but not yet deleted.
+    A unique index admits one active job, so of two concurrent requests the one that
+    commits second rolls back (returning its claimed images) and gets the first one's job.
+    """
+    job = _active_job(db)
+    if job is None:
+        try:
+            job = _create_job(db, requested_by)
+        except IntegrityError:
+            db.rollback()
+            job = _active_job(db)
+            if job is None:
+                raise
+    launch_delete_job(str(job.id))
+    return job
+
+
+def _active_job(db: Session):
+    return db.query(PostDeleteJob).filter(PostDeleteJob.status.in_(ACTIVE_JOB_STATUSES)).first()
+
+
+def _create_job(db: Session, requested_by: str) -> PostDeleteJob:
+    pending_images = []
+    for failed in db.query(PostDeleteJob).filter(PostDeleteJob.status == JOB_FAILED).with_for_update():
+        if failed.pending_images:
+            pending_images.extend(failed.pending_images)
+            failed.pending_images = None
+    job = PostDeleteJob(
+        status=JOB_QUEUED,
+        requested_by=requested_by,
+        total=db.query(func.count(Posts.id)).scalar(),
+        pending_images=pending_images or None
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def launch_delete_job(job_id: str, session_factory=SessionLocal, chunk_size: int = DELETE_CHUNK_SIZE) -> None:
+    """Run a job on a background thread unless this process is already running it"""
+    with _running_lock:
+        if job_id in _running_jobs:
+            return
+        _running_jobs.add(job_id)
+    threading.Thread(
+        target=run_delete_job,
+        args=(job_id, session_factory, chunk_size),
+        name=f"post-delete-{job_id}",
+        daemon=True
+    ).start()
+
+
+def resume_delete_jobs(session_factory=SessionLocal) -> None:
+    """Restart jobs a previous process left queued or running; startup goes on if the lookup fails"""
+    db = session_factory()
+    try:
+        job_ids = [row[0] for row in db.query(PostDeleteJob.id).filter(PostDeleteJob.status.in_(ACTIVE_JOB_STATUSES))]
+    except SQLAlchemyError:
+        # e.g. the post_delete_jobs migration has not been applied yet
+        logger.exception("Could not look up post delete jobs to resume")
+        return
+    finally:
+        db.close()
+    for job_id in job_ids:
+        launch_delete_job(str(job_id), session_factory)
+
+
+def run_delete_job(job_id: str, session_factory=SessionLocal, chunk_size: int = DELETE_CHUNK_SIZE) -> None:
+    """
+    Delete every post in chunks. Each chunk releases the posts' image blobs, deletes the rows
+    and records progress plus the images to remove in one transaction; those images are
+    bulk deleted before the next chunk. A crash therefore resumes from the last commit
+    without losing track of any image; a job that fails keeps its pending images for
+    the next job started.
+    """
+    db = session_factory()
+    try:
+        job = db.get(PostDeleteJob, job_id)
+        if job is None:
+            return
+        job.status = JOB_RUNNING
+        db.commit()
+        while _run_step(db, job_id, chunk_size):
+            pass
+    except Exception as e:
+        db.rollback()
+        job = db.get(PostDeleteJob, job_id)
+        if job is not None:
+            job.status = JOB_FAILED
+            job.error = str(e)
+            db.commit()
+    finally:
+        db.close()
+        with _running_lock:
+            _running_jobs.discard(job_id)
+
+
+def _run_step(db: Session, job_id: str, chunk_size: int) -> bool:
+    # Locking the job row keeps two processes resuming the same job from interleaving chunks
+    job = db.query(PostDeleteJob).filter(PostDeleteJob.id == job_id).with_for_update().one()
+
+    if job.pending_images:
+        job.image_errors = (job.image_errors or 0) + delete_images(job.pending_images)
+        job.pending_images = None
+        db.commit()
+        return True
+
+    posts = db.query(Posts.id, Posts.image_sha256).order_by(Posts.id).limit(chunk_size).all()
+    if not posts:
+        job.status = JOB_COMPLETED
+        db.commit()
+        return False
+
+    post_ids = [post_id for post_id, _ in posts]
+    # Only blobs whose last reference goes are removed; untracked URLs may be shared or external
+    unused_images = [release_image(db, image_sha256) for _, image_sha256 in posts]
+    db.query(PostLike).filter(PostLike.post_id.in_(post_ids)).delete(synchronize_session=False)
+    # Comments and stat rows go with the posts through ON DELETE CASCADE
+    db.query(Posts).filter(Posts.id.in_(post_ids)).delete(synchronize_session=False)
+    job.deleted = (job.deleted or 0) + len(post_ids)
+    job.pending_images = [url for url in unused_images if url] or None
+    db.commit()
+    # Every cached post page, post and comment thread may include the deleted rows
+    response_cache.clear()
+
+    for post_id in post_ids:
+        stats_similarity_index.remove(str(post_id))
+    return True
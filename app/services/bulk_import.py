@@ -0,0 +1,310 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import shortuuid
+from fastapi import HTTPException, UploadFile, status
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.config.cloudinary_config import DEFAULT_IMAGE_URL
+from app.routers.comments.models import Comments
+from app.routers.comments.schemas import CommentCreate
+from app.routers.forums.models import Forums
+from app.routers.forums.schemas import ForumCreate
+from app.routers.posts.models import Posts, PostStat
+from app.routers.posts.schemas import PostImport
+from app.routers.users.models import Users
+from app.services.cache import response_cache
+from app.services.image_uploads import IMAGE_READY
+from app.services.post_stats import stat_rows
+from app.services.similarity import stats_similarity_index
+
+IMPORT_KINDS = ("posts", "forums", "comments")
+IMPORT_FORMATS = ("ndjson", "csv")
+IMPORT_CHUNK_SIZE = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "500"))
+MAX_IMPORT_CHUNK_SIZE = 5000
+# Rows beyond this still count as failed but are not listed in the report
+MAX_REPORTED_ERRORS = 1000
+
+_SCHEMAS = {"posts": PostImport, "forums": ForumCreate, "comments": CommentCreate}
+_JSON_COLUMNS = {"posts": ("stats",)}
+
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    kind: str
+    total: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+
+    def add_error(self, line: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(ImportRowError(line=line, error=error))
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    """Pick the import format from a file name, falling back to the content type"""
+    name = (filename or "").lower()
+    if name.endswith(".csv") or (content_type or "").startswith("text/csv"):
+        return "csv"
+    return "ndjson"
+
+
+def read_rows(stream: io.TextIOBase, fmt: str, kind: str) -> Iterator[Tuple[int, object]]:
+    """
+    Yield (line number, raw row) from an NDJSON or CSV stream. A line that cannot be
+    decoded yields the error message as a string so it is reported against its line.
+    CSV cells are strings; empty cells become None and JSON columns (a post's stats) are decoded.
+    """
+    if fmt == "csv":
+        json_columns = _JSON_COLUMNS.get(kind, ())
+        reader = csv.DictReader(stream)
+        for row in reader:
+            record = {key: (value if value != "" else None) for key, value in row.items() if key}
+            try:
+                for column in json_columns:
+                    if record.get(column) is not None:
+                        record[column] = json.loads(record[column])
+            except json.JSONDecodeError:
+                yield reader.line_num, f"Invalid JSON in column '{column}'"
+                continue
+            yield reader.line_num, record
+        return
+
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, f"Invalid JSON: {e.msg}"
+
+
+def _validate(kind: str, rows: List[Tuple[int, object]], report: ImportReport) -> List[Tuple[int, BaseModel]]:
+    """
+    Validate a chunk with the resource's schema in one pass; failing rows are reported
+    and the remaining ones validated again together
+    """
+    adapter = TypeAdapter(List[_SCHEMAS[kind]])
+    pending = []
+    for line, row in rows:
+        if isinstance(row, str):
+            report.add_error(line, row)
+        else:
+            pending.append((line, row))
+    while pending:
+        try:
+            items = adapter.validate_python([row for _, row in pending])
+        except ValidationError as e:
+            failed = {}
+            for error in e.errors():
+                index = error["loc"][0]
+                field = ".".join(str(part) for part in error["loc"][1:])
+                failed.setdefault(index, f"{field}: {error['msg']}" if field else error["msg"])
+            for index, message in sorted(failed.items()):
+                report.add_error(pending[index][0], message)
+            pending = [row for index, row in enumerate(pending) if index not in failed]
+            continue
+        return [(line, item) for (line, _), item in zip(pending, items)]
+    return []
+
+
+def _existing_ids(db: Session, model, ids: Iterable[str]) -> set:
+    ids = set(ids)
+    if not ids:
+        return set()
+    return {row[0] for row in db.query(model.id).filter(model.id.in_(ids))}
+
+
+def _post_records(db: Session, items, user: Users, report: ImportReport):
+    now = datetime.utcnow()
+    lines, records, stat_records = [], [], []
+    for line, item in items:
+        lines.append(line)
+        post_id = shortuuid.uuid()
+        records.append({
+            "id": post_id,
+            "title": item.title,
+            "content": item.content,
+            "image_url": item.image_url or DEFAULT_IMAGE_URL,
+            "image_status": IMAGE_READY,
+            "likes": 0,
+            "author": user.username,
+            "timestamp": now,
+            "changed_at": now,
+            "stats": item.stats,
+        })
+        stat_records.extend(
+            {"post_id": post_id, "stat": row.stat, "value": row.value} for row in stat_rows(item.stats)
+        )
+    return lines, records, stat_records
+
+
+def _forum_records(db: Session, items, user: Users, report: ImportReport):
+    now = datetime.utcnow()
+    return [line for line, _ in items], [{
+        "id": shortuuid.uuid(),
+        "title": item.title,
+        "content": item.content,
+        "author": user.username,
+        "likes": 0,
+        "timestamp": now,
+        "updated_timestamp": now,
+        "changed_at": now,
+    } for _, item in items], []
+
+
+def _comment_parents(db: Session, ids: Iterable[str]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """(post_id, forum_id) of each existing comment among `ids`"""
+    ids = set(ids)
+    if not ids:
+        return {}
+    rows = db.query(Comments.id, Comments.post_id, Comments.forum_id).filter(Comments.id.in_(ids))
+    return {comment_id: (post_id, forum_id) for comment_id, post_id, forum_id in rows}
+
+
+def _comment_records(db: Session, items, user: Users, report: ImportReport):
+    """
+    Comments must name exactly one existing post or forum, and a parent_id must be an
+    existing comment on that same post or forum; the others are reported
+    """
+    posts = _existing_ids(db, Posts, (item.post_id for _, item in items if item.post_id))
+    forums = _existing_ids(db, Forums, (item.forum_id for _, item in items if item.forum_id))
+    parents = _comment_parents(db, (item.parent_id for _, item in items if item.parent_id))
+    now = datetime.utcnow()
+    lines, records = [], []
+    for line, item in items:
+        if bool(item.post_id) == bool(item.forum_id):
+            report.add_error(line, "Exactly one of post_id and forum_id is required")
+        elif item.post_id and item.post_id not in posts:
+            report.add_error(line, f"Post {item.post_id} not found")
+        elif item.forum_id and item.forum_id not in forums:
+            report.add_error(line, f"Forum {item.forum_id} not found")
+        elif item.parent_id and item.parent_id not in parents:
+            report.add_error(line, f"Parent comment {item.parent_id} not found")
+        elif item.parent_id and parents[item.parent_id] != (item.post_id or None, item.forum_id or None):
+            report.add_error(line, f"Parent comment {item.parent_id} is not on the same post or forum")
+        else:
+            lines.append(line)
+            records.append({
+                "id": shortuuid.uuid(),
+                "comment": item.comment,
+                "post_id": item.post_id,
+                "forum_id": item.forum_id,
+                "parent_id": item.parent_id,
+                "user_id": user.id,
+                "username": user.username,
+                "likes": 0,
+                "timestamp": now,
+                "changed_at": now,
+            })
+    return lines, records, []
+
+
+_BUILDERS = {
+    "posts": (Posts, _post_records),
+    "forums": (Forums, _forum_records),
+    "comments": (Comments, _comment_records),
+}
+
+
+def _after_commit(kind: str, records: List[Dict]) -> None:
+    """Keep caches, the similarity index and the parents' validators in step with the new rows"""
+    if kind == "posts":
+        response_cache.invalidate("posts")
+        for record in records:
+            stats_similarity_index.upsert(record["id"], record["stats"])
+    elif kind == "forums":
+        response_cache.invalidate("forums")
+    else:
+        post_ids = {r["post_id"] for r in records if r["post_id"]}
+        forum_ids = {r["forum_id"] for r in records if r["forum_id"]}
+        response_cache.invalidate(
+            *[f"post-comments:{i}" for i in post_ids], *[f"forum-comments:{i}" for i in forum_ids],
+            *(["posts"] if post_ids else []), *(["forums"] if forum_ids else [])
+        )
+
+
+def import_rows(
+    db: Session,
+    kind: str,
+    rows: Iterable[Tuple[int, object]],
+    user: Users,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> ImportReport:
+    """
+    Import posts, forums or comments authored by `user` from (line, row) pairs.
+    Each chunk is validated as a batch, inserted with a single executemany and committed,
+    so a failing chunk is reported row by row without undoing the chunks before it.
+    """
+    model, build = _BUILDERS[kind]
+    report = ImportReport(kind=kind)
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        report.total += len(chunk)
+        items = _validate(kind, chunk, report)
+        if not items:
+            continue
+        lines, records, stat_records = build(db, items, user, report)
+        if not records:
+            continue
+        try:
+            db.execute(insert(model), records)
+            if stat_records:
+                db.execute(insert(PostStat), stat_records)
+            if kind == "comments":
+                post_ids = {r["post_id"] for r in records if r["post_id"]}
+                if post_ids:
+                    db.query(Posts).filter(Posts.id.in_(post_ids)).update(
+                        {Posts.changed_at: datetime.utcnow()}, synchronize_session=False
+                    )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            message = f"Chunk rejected by the database: {e.__class__.__name__}"
+            for line in lines:
+                report.add_error(line, message)
+            continue
+        report.inserted += len(records)
+        _after_commit(kind, records)
+    return report
+
+
+def import_upload(
+    db: Session,
+    kind: str,
+    upload: UploadFile,
+    user: Users,
+    fmt: Optional[str] = None,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> ImportReport:
+    """Import an uploaded NDJSON or CSV file; the format defaults to the file's extension"""
+    fmt = fmt or detect_format(upload.filename, upload.content_type)
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported import format '{fmt}'. Use one of: {', '.join(IMPORT_FORMATS)}"
+        )
+    upload.file.seek(0)
+    stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    try:
+        return import_rows(db, kind, read_rows(stream, fmt, kind), user, chunk_size)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Import files must be UTF-8 encoded")
+    finally:
+        stream.detach()
@@ -0,0 +1,180 @@
+import itertools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.services.conditional import client_is_current, parse_http_date
+
+# Headers worth replaying from a cached response; content-length is recomputed
+CACHED_HEADERS = ("etag", "last-modified", "vary", "x-next-cursor")
+
+
+class CacheBackend:
+    """
+    Storage used by ResponseCache. Implement these four methods to plug in a shared
+    store such as Redis; values are (bytes, dict) tuples so they serialize anywhere.
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Process-local LRU with per-entry TTL, bounded by entry count"""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class ResponseCache:
+    """
+    Cache of serialized anonymous read responses. Every entry belongs to one tag
+    (e.g. "posts", "post:<id>", "post-comments:<id>") and write endpoints invalidate
+    exactly the tags they affect. Requests with a signed-in viewer bypass the cache
+    because their bodies carry per-user liked flags.
+
+    Each tag has a generation that `invalidate` bumps. A miss remembers the tag's
+    generation on the request and `store` drops the body if it moved since, so a read
+    that raced a write cannot cache what it saw before the write committed.
+    Generations are kept for the `max_tags` most recently invalidated tags; an older
+    tag reads as the highest generation forgotten so far, which only errs towards
+    skipping a store.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = 30.0, max_tags: int = 10000):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_tags = max_tags
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._generations: "OrderedDict[str, int]" = OrderedDict()
+        self._forgotten = 0
+        self._clock = itertools.count(1)
+        self._generation_lock = threading.Lock()
+
+    @staticmethod
+    def _key(tag: str, request: Request) -> str:
+        query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        return f"{tag}|{request.url.path}?{query}"
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _generation(self, tag: str) -> int:
+        # Callers hold _generation_lock
+        return self._generations.get(tag, self._forgotten)
+
+    def lookup(self, request: Request, tag: str, user=None) -> Optional[Response]:
+        """Return the cached response (or a 304 for it), or None on a miss or signed-in viewer"""
+        if user is not None or self.ttl <= 0:
+            return None
+        with self._generation_lock:
+            generation = self._generation(tag)
+        if not hasattr(request.state, "cache_generations"):
+            request.state.cache_generations = {}
+        request.state.cache_generations[tag] = generation
+        cached = self.backend.get(self._key(tag, request))
+        self._count(cached is not None)
+        if cached is None:
+            return None
+        body, headers = cached
+        last_modified = parse_http_date(headers["last-modified"]) if "last-modified" in headers else None
+        if client_is_current(request, headers.get("etag"), last_modified):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def store(self, request: Request, response: Response, tag: str, content: Any, user=None) -> Any:
+        """
+        Serialize `content` once, cache it for anonymous viewers and return it as the
+        response; for signed-in viewers `content` is returned untouched. The body is not
+        cached when `tag` was invalidated after this request's `lookup`.
+        """
+        if user is not None or self.ttl <= 0:
+            return content
+        body = json.dumps(jsonable_encoder(content), separators=(",", ":")).encode()
+        headers = {k: v for k, v in response.headers.items() if k.lower() in CACHED_HEADERS}
+        seen = getattr(request.state, "cache_generations", {}).get(tag)
+        with self._generation_lock:
+            if seen is None or seen == self._generation(tag):
+                self.backend.set(self._key(tag, request), (body, headers), self.ttl)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def invalidate(self, *tags: str) -> None:
+        with self._generation_lock:
+            for tag in tags:
+                self._generations[tag] = next(self._clock)
+                self._generations.move_to_end(tag)
+                self.backend.delete_prefix(f"{tag}|")
+            while len(self._generations) > self.max_tags:
+                _, generation = self._generations.popitem(last=False)
+                self._forgotten = max(self._forgotten, generation)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        stats = {"hits": hits, "misses": misses}
+        if isinstance(self.backend, MemoryCacheBackend):
+            stats["entries"] = len(self.backend)
+        return stats
+
+
+response_cache = ResponseCache(
+    MemoryCacheBackend(max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+)
@@ -0,0 +1,168 @@
+import asyncio
+import itertools
+import json
+import os
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+# Sent to a subscriber whose buffer overflowed: some events were dropped, refetch the thread
+RESYNC_EVENT = "resync"
+COMMENT_STREAM_HEARTBEAT = float(os.getenv("COMMENT_STREAM_HEARTBEAT", "15"))
+
+
+class Subscription:
+    """
+    One stream's view of a topic: a bounded buffer filled by publishers on any thread
+    and drained by the stream's coroutine. When the buffer is full the oldest event is
+    dropped and the subscription is marked lagged, so a slow client never holds up
+    publishers or grows without bound.
+    """
+
+    def __init__(self, topic: str, loop: asyncio.AbstractEventLoop, buffer_size: int):
+        self.topic = topic
+        self.loop = loop
+        self.lagged = False
+        self._events: deque = deque(maxlen=buffer_size)
+        self._ready = asyncio.Event()
+        self._lock = threading.Lock()
+
+    def push(self, event: Tuple[int, str, str]) -> None:
+        with self._lock:
+            if len(self._events) == self._events.maxlen:
+                self.lagged = True
+            self._events.append(event)
+        self.loop.call_soon_threadsafe(self._ready.set)
+
+    async def next_batch(self, timeout: float) -> Optional[Tuple[List[Tuple[int, str, str]], bool]]:
+        """Wait up to `timeout` seconds for events; returns (events, lagged) or None on timeout"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._ready.clear()
+        with self._lock:
+            events, lagged = list(self._events), self.lagged
+            self._events.clear()
+            self.lagged = False
+        return events, lagged
+
+
+class CommentEventBroker:
+    """
+    In-process pub/sub for comment threads. Topics are the threads' cache tags
+    ("post-comments:<id>", "forum-comments:<id>"), so a write publishes to the same
+    tags it invalidates. Each event is encoded once and shared by every subscriber;
+    an idle subscriber costs one parked coroutine and an empty deque.
+    """
+
+    def __init__(self, buffer_size: int = 100, max_subscribers: int = 10000):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self.published = 0
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self._count = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def check_capacity(self) -> None:
+        """Refuse a new stream with 503 once the worker holds `max_subscribers`"""
+        if self._count >= self.max_subscribers:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many open streams, retry later"
+            )
+
+    def subscribe(self, topic: str) -> Subscription:
+        """Subscribe the running event loop's caller to `topic`"""
+        subscription = Subscription(topic, asyncio.get_running_loop(), self.buffer_size)
+        with self._lock:
+            self._topics.setdefault(topic, set()).add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._topics.get(subscription.topic)
+            if subscribers is None or subscription not in subscribers:
+                return
+            subscribers.discard(subscription)
+            self._count -= 1
+            if not subscribers:
+                del self._topics[subscription.topic]
+
+    def publish(self, topics: Iterable[str], event: str, data: Any) -> int:
+        """
+        Queue `event` for every subscriber of `topics`; safe to call from worker threads.
+        Returns the number of subscribers reached.
+        """
+        with self._lock:
+            subscribers = [s for topic in topics for s in self._topics.get(topic, ())]
+            if not subscribers:
+                return 0
+            message = (next(self._ids), event, json.dumps(data, separators=(",", ":"), default=str))
+            self.published += 1
+        for subscription in subscribers:
+            try:
+                subscription.push(message)
+            except RuntimeError:
+                # The stream's event loop is gone; its generator will never clean up
+                self.unsubscribe(subscription)
+        return len(subscribers)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"subscribers": self._count, "topics": len(self._topics), "published": self.published}
+
+
+def format_event(event_id: int, event: str, data: str) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+
+async def event_stream(
+    broker: CommentEventBroker,
+    topic: str,
+    request: Request,
+    heartbeat: float,
+) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for one topic. Events that arrived together are written in one
+    chunk; a comment line every `heartbeat` seconds keeps proxies from closing an idle
+    stream and notices clients that went away.
+    """
+    subscription = broker.subscribe(topic)
+    try:
+        yield f"retry: {int(heartbeat * 1000)}\n\n"
+        while True:
+            batch = await subscription.next_batch(heartbeat)
+            if batch is None:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            events, lagged = batch
+            chunk = "".join(format_event(*event) for event in events)
+            if lagged:
+                chunk = f"event: {RESYNC_EVENT}\ndata: {{}}\n\n" + chunk
+            yield chunk
+    finally:
+        broker.unsubscribe(subscription)
+
+
+comment_events = CommentEventBroker(
+    buffer_size=int(os.getenv("COMMENT_STREAM_BUFFER", "100")),
+    max_subscribers=int(os.getenv("COMMENT_STREAM_MAX_SUBSCRIBERS", "10000")),
+)
+
+
+def stream_response(topic: str, request: Request) -> StreamingResponse:
+    """An SSE response for one comment thread, or 503 when the worker is at its stream limit"""
+    comment_events.check_capacity()
+    return StreamingResponse(
+        event_stream(comment_events, topic, request, COMMENT_STREAM_HEARTBEAT),
+        media_type="text/event-stream",
+        # Proxies such as nginx would otherwise buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
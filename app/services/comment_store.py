@@ -0,0 +1,263 @@
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import shortuuid
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, aliased
+
+from app.routers.comments.models import Comments, CommentLike
+from app.routers.posts.models import Posts
+from app.routers.users.models import Users
+from app.services.cache import response_cache
+from app.services.comment_events import comment_events
+from app.services.comment_tree import delete_subtree, reply_counts
+from app.services.conditional import touch
+from app.services.likes import LikersPage, liked_target_ids, likers_page, set_like
+from app.services.pagination import PageParams, decode_cursor, keyset_filter, order_columns, paginate, paginate_query
+from app.services.search import ranked_matches, search_tokens
+
+# Post and forum comments share one table; the column that is set says what a comment is on
+THREADS = {"post": Comments.post_id, "forum": Comments.forum_id}
+# Keyset order of every comment listing; the last column makes it unique
+COMMENT_ORDER = (Comments.timestamp, Comments.id)
+# Restricts a query to comments on forums, for the /forums routes
+ON_FORUMS = Comments.forum_id.isnot(None)
+
+
+class CommentRow(NamedTuple):
+    comment: Comments
+    liked: bool = False
+    reply_count: Optional[int] = None
+
+
+def in_thread(kind: str, owner_id: str):
+    """Filter for the comments on one post or forum (`kind` as in THREADS)"""
+    return THREADS[kind] == owner_id
+
+
+def thread_tags(comment: Comments) -> List[str]:
+    """Response cache tags of the listings that include this comment"""
+    tags = []
+    if comment.post_id is not None:
+        tags.append(f"post-comments:{comment.post_id}")
+    if comment.forum_id is not None:
+        tags.append(f"forum-comments:{comment.forum_id}")
+    return tags
+
+
+def _event_data(comment: Comments) -> dict:
+    """A comment as stream subscribers receive it; liked flags are per viewer, so left out"""
+    return {
+        "id": comment.id,
+        "comment": comment.comment,
+        "post_id": comment.post_id,
+        "forum_id": comment.forum_id,
+        "parent_id": comment.parent_id,
+        "user_id": comment.user_id,
+        "username": comment.username,
+        "likes": comment.likes or 0,
+        "timestamp": comment.timestamp.isoformat() if comment.timestamp else None,
+    }
+
+
+def _listing_tags(comment: Comments) -> List[str]:
+    """Tags of the post and forum listings, whose comment counts change when a comment is added or removed"""
+    return ["posts" if comment.post_id is not None else "forums"]
+
+
+def comment_counts(db: Session, kind: str, owner_ids: Sequence[str]) -> Dict[str, int]:
+    """Number of comments on each post or forum of a page, from one grouped aggregate"""
+    if not owner_ids:
+        return {}
+    owner = THREADS[kind]
+    rows = (
+        db.query(owner, func.count(Comments.id))
+        .filter(owner.in_([str(i) for i in owner_ids]))
+        .group_by(owner)
+        .all()
+    )
+    return {str(owner_id): count for owner_id, count in rows}
+
+
+def liked_ids(db: Session, viewer: Optional[Users], comments) -> set:
+    return liked_target_ids(db, CommentLike, "comment_id", viewer, [comment.id for comment in comments])
+
+
+def list_comments(
+    db: Session,
+    page: PageParams,
+    response,
+    viewer: Optional[Users],
+    *criteria,
+    with_reply_counts: bool = False,
+) -> List[CommentRow]:
+    """
+    One keyset page of the comments matching `criteria`, with the viewer's likes resolved
+    in one query and, for top-level listings, the direct reply counts in another
+    """
+    comments = paginate_query(db.query(Comments).filter(*criteria), COMMENT_ORDER, page, response)
+    liked = liked_ids(db, viewer, comments)
+    counts = reply_counts(db, Comments, [comment.id for comment in comments]) if with_reply_counts else None
+    return [
+        CommentRow(comment, str(comment.id) in liked, counts.get(str(comment.id), 0) if counts is not None else None)
+        for comment in comments
+    ]
+
+
+def search_comments(
+    db: Session,
+    q: str,
+    limit: int,
+    cursor: Optional[str],
+    viewer: Optional[Users],
+    *criteria,
+) -> Tuple[List[Tuple[CommentRow, float]], Optional[str]]:
+    """
+    Comments whose body matches every term of `q` (prefix matches) and `criteria`, best
+    first, from the full-text index, resumed with a (score, id) keyset cursor.
+    Returns ((row, score) pairs, next cursor).
+    """
+    tokens = search_tokens(q)
+    if not tokens:
+        return [], None
+    ranked = ranked_matches(Comments, tokens).where(*criteria).subquery()
+    comment = aliased(Comments, ranked)
+    key = [ranked.c.score, ranked.c.id]
+    query = select(comment, ranked.c.score)
+    if cursor:
+        query = query.where(keyset_filter(key, decode_cursor(cursor, len(key)), descending=True))
+    rows = db.execute(query.order_by(*order_columns(key, descending=True)).limit(limit + 1)).all()
+    page, next_cursor = paginate(rows, limit, lambda row: [row[1], row[0].id])
+    liked = liked_ids(db, viewer, [row[0] for row in page])
+    return [(CommentRow(found, str(found.id) in liked), score) for found, score in page], next_cursor
+
+
+def load_thread(db: Session, kind: str, owner_id: str) -> List[Comments]:
+    """Every comment on a post or forum, in display order, from one indexed query"""
+    return db.query(Comments).filter(in_thread(kind, owner_id)).order_by(*COMMENT_ORDER).all()
+
+
+def find_comment(db: Session, comment_id: str, *criteria, label: str = "Comment") -> Comments:
+    comment = db.query(Comments).filter(Comments.id == comment_id, *criteria).first()
+    if comment is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{label} not found")
+    return comment
+
+
+def _own_comment(db: Session, comment_id: str, user: Users, criteria, label: str, action: str) -> Comments:
+    comment = find_comment(db, comment_id, *criteria, label=label)
+    if comment.user_id != user.id:  # type: ignore
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"You can only {action} your own comments")
+    return comment
+
+
+def create_comment(
+    db: Session,
+    user: Users,
+    text: str,
+    post_id: Optional[str] = None,
+    forum_id: Optional[str] = None,
+    parent_id: Optional[str] = None,
+) -> Comments:
+    """
+    Add a comment to exactly one post or forum, replying to a parent on that same thread,
+    bumping the post's version and dropping cached listings
+    """
+    if bool(post_id) == bool(forum_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Exactly one of post_id and forum_id is required"
+        )
+    if parent_id:
+        parent = db.query(Comments.post_id, Comments.forum_id).filter(Comments.id == parent_id).first()
+        if parent is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=f"Parent comment {parent_id} not found"
+            )
+        if (parent.post_id, parent.forum_id) != (post_id, forum_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Parent comment {parent_id} is not on the same post or forum",
+            )
+    comment = Comments(
+        id=shortuuid.uuid(),
+        comment=text,
+        post_id=post_id,
+        forum_id=forum_id,
+        user_id=user.id,
+        username=user.username,
+        parent_id=parent_id
+    )
+    db.add(comment)
+    if post_id:
+        touch(db, Posts, post_id)
+    db.commit()
+    response_cache.invalidate(*thread_tags(comment), *_listing_tags(comment))
+    db.refresh(comment)
+    comment_events.publish(thread_tags(comment), "created", _event_data(comment))
+    return comment
+
+
+def edit_comment(db: Session, comment_id: str, text: str, user: Users, *criteria, label: str = "Comment") -> CommentRow:
+    comment = _own_comment(db, comment_id, user, criteria, label, "edit")
+    comment.comment = text  # type: ignore
+    db.commit()
+    response_cache.invalidate(*thread_tags(comment))
+    comment_events.publish(thread_tags(comment), "updated", _event_data(comment))
+    return CommentRow(comment, bool(liked_ids(db, user, [comment])))
+
+
+def delete_comment(db: Session, comment_id: str, user: Users, *criteria, label: str = "Comment") -> None:
+    """Delete one of the user's comments with all of its replies, at any depth"""
+    comment = _own_comment(db, comment_id, user, criteria, label, "delete")
+    tags, listing_tags = thread_tags(comment), _listing_tags(comment)
+    deleted = {"id": comment_id, "parent_id": comment.parent_id}
+    delete_subtree(db, Comments, comment_id)
+    if comment.post_id:
+        touch(db, Posts, str(comment.post_id))
+    db.commit()
+    response_cache.invalidate(*tags, *listing_tags)
+    # Replies go with the comment, so one event covers the subtree
+    comment_events.publish(tags, "deleted", deleted)
+
+
+def like_comment(
+    db: Session,
+    comment_id: str,
+    user: Users,
+    serialize: Callable,
+    *criteria,
+    liked: Optional[bool] = None,
+    label: str = "Comment",
+):
+    """
+    Like, unlike or toggle (`liked` as in set_like) a comment matching `criteria` and
+    return it as `serialize(comment, liked)`, built before the commit expires the row
+    """
+    if criteria:
+        find_comment(db, comment_id, *criteria, label=label)
+    result = set_like(db, "comments", comment_id, user.id, liked)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{label} not found")
+    updated = serialize(result.target, result.liked)
+    tags = thread_tags(result.target)
+    likes = {"id": comment_id, "likes": result.target.likes or 0}
+    db.commit()
+    if result.changed:
+        response_cache.invalidate(*tags)
+        comment_events.publish(tags, "likes", likes)
+    return updated
+
+
+def comment_likers(
+    db: Session,
+    comment_id: str,
+    limit: int,
+    cursor: Optional[str],
+    expand_users: bool,
+    *criteria,
+    label: str = "Comment",
+) -> LikersPage:
+    """One page of who liked a comment matching `criteria` (see likers_page)"""
+    if criteria:
+        find_comment(db, comment_id, *criteria, label=label)
+    return likers_page(db, "comments", comment_id, limit, cursor, expand_users)
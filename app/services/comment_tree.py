@@ -0,0 +1,89 @@
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.services.pagination import decode_cursor, paginate
+
+
+def thread_key(comment) -> Tuple[datetime, str]:
+    """Display order of a thread: oldest first, ties broken by id"""
+    return comment.timestamp or datetime.min, str(comment.id)
+
+
+def index_thread(comments: Sequence) -> Tuple[list, Dict[str, list]]:
+    """
+    Split a thread's comments, already in display order, into its top-level comments
+    and a parent id -> replies map, in one pass. Replies whose parent is gone are dropped,
+    as they are from the per-parent listings.
+    """
+    roots, children = [], {}
+    for comment in comments:
+        if comment.parent_id is None:
+            roots.append(comment)
+        else:
+            children.setdefault(str(comment.parent_id), []).append(comment)
+    return roots, children
+
+
+def page_roots(roots: list, limit: int, cursor: Optional[str]) -> Tuple[list, Optional[str]]:
+    """One page of top-level comments after `cursor`, and the cursor for the next page"""
+    if cursor:
+        timestamp, comment_id = decode_cursor(cursor, 2)
+        after = (timestamp or datetime.min, comment_id)
+        roots = [comment for comment in roots if thread_key(comment) > after]
+    return paginate(roots[:limit + 1], limit, key=lambda comment: (comment.timestamp, str(comment.id)))
+
+
+def embedded_comments(page: list, children: Dict[str, list], reply_limit: int) -> list:
+    """Every comment that appears in the tree: the page plus the first replies at each level"""
+    embedded, stack = [], list(page)
+    while stack:
+        comment = stack.pop()
+        embedded.append(comment)
+        stack.extend(children.get(str(comment.id), [])[:reply_limit])
+    return embedded
+
+
+def build_tree(page: list, children: Dict[str, list], reply_limit: int, make_node: Callable) -> List:
+    """
+    Nest the page's comments with `make_node(comment, replies, reply_count)`, bottom-up and
+    without recursion, so deep threads cannot exhaust the stack
+    """
+    nodes = {}
+    for comment in reversed(embedded_comments(page, children, reply_limit)):
+        replies = children.get(str(comment.id), [])
+        nodes[str(comment.id)] = make_node(
+            comment, [nodes[str(reply.id)] for reply in replies[:reply_limit]], len(replies)
+        )
+    return [nodes[str(comment.id)] for comment in page]
+
+
+def reply_counts(db: Session, model, comment_ids: Sequence[str]) -> Dict[str, int]:
+    """Number of direct replies of each comment on a page, from one grouped aggregate"""
+    if not comment_ids:
+        return {}
+    rows = (
+        db.query(model.parent_id, func.count(model.id))
+        .filter(model.parent_id.in_([str(i) for i in comment_ids]))
+        .group_by(model.parent_id)
+        .all()
+    )
+    return {str(parent_id): count for parent_id, count in rows}
+
+
+def delete_subtree(db: Session, model, comment_id: str) -> int:
+    """
+    Delete a comment and every reply below it, at any depth, with one DELETE driven by
+    a recursive CTE (supported by both Postgres and SQLite). Like rows go with them through
+    their ON DELETE CASCADE foreign keys. Joins the caller's transaction; returns the number
+    of comments deleted. UNION rather than UNION ALL drops ids already visited, so a
+    parent_id cycle ends the recursion instead of looping forever.
+    """
+    subtree = select(model.id).where(model.id == comment_id).cte("subtree", recursive=True)
+    subtree = subtree.union(select(model.id).where(model.parent_id == subtree.c.id))
+    result = db.execute(
+        delete(model).where(model.id.in_(select(subtree.c.id))).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
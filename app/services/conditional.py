@@ -0,0 +1,81 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy.orm import Session
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag from a cheap version fingerprint: counts, max timestamps, viewer and query"""
+    payload = json.dumps(parts, default=str, separators=(",", ":"))
+    return '"' + hashlib.sha256(payload.encode()).hexdigest()[:32] + '"'
+
+
+def _http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in header.split(",")]
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def parse_http_date(value: str) -> Optional[datetime]:
+    """Parse an HTTP date into a naive UTC datetime, or None when malformed"""
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    since = parse_http_date(header)
+    if since is None:
+        return False
+    return last_modified.replace(tzinfo=None, microsecond=0) <= since
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """
+    Put the validators on `response` and return a bodiless 304 when the client's copy
+    is current, so the caller can skip loading and serializing rows.
+    """
+    headers = {"ETag": etag, "Vary": "Authorization"}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    response.headers.update(headers)
+
+    if client_is_current(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
+
+
+def client_is_current(request: Request, etag: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """
+    Evaluate If-None-Match, or If-Modified-Since when no If-None-Match was sent
+    (RFC 9110 precedence), against the representation's validators
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag is not None and _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    return bool(if_modified_since and last_modified and _not_modified_since(if_modified_since, last_modified))
+
+
+def touch(db: Session, model, target_id: str) -> None:
+    """Bump a row's changed_at so cached representations that depend on it are invalidated"""
+    db.query(model).filter(model.id == target_id).update(
+        {model.changed_at: datetime.utcnow()}, synchronize_session=False
+    )
@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import Iterator, Sequence
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.config.postgres_config import SessionLocal
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# Rows fetched per round trip; on Postgres yield_per streams through a server-side cursor
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def export_lines(
+    columns: Sequence,
+    fmt: str,
+    where=None,
+    session_factory=SessionLocal,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[str]:
+    """
+    Yield an export of `columns` ordered by the first one, optionally restricted by a
+    `where` clause, one batch of rows at a time.
+    The generator owns its session, since the request's session is closed before the
+    response body is sent. CSV starts with a header row; JSON columns are encoded as JSON text.
+    """
+    names = [column.key for column in columns]
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        yield buffer.getvalue()
+
+    db = session_factory()
+    try:
+        query = select(*columns)
+        if where is not None:
+            query = query.where(where)
+        result = db.execute(query.order_by(columns[0]).execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            if fmt == "csv":
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows([_csv_value(value) for value in row] for row in partition)
+                yield buffer.getvalue()
+            else:
+                yield "".join(
+                    json.dumps({name: _json_value(value) for name, value in zip(names, row)}) + "\n"
+                    for row in partition
+                )
+    finally:
+        db.close()
+
+
+def export_response(name: str, columns: Sequence, fmt: str, where=None) -> StreamingResponse:
+    """Stream an NDJSON or CSV export of a table (or the rows matching `where`) as a file download"""
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    return StreamingResponse(
+        export_lines(columns, fmt, where),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+    )
@@ -0,0 +1,49 @@
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.routers.posts.models import ImageBlob
+from app.services.uploads import SpooledImage
+
+
+def acquire_image(db: Session, sha256: str) -> Optional[str]:
+    """
+    Take one more reference on an already stored image and return its URL,
+    or None if no image with this content hash is stored yet.
+    The reference joins the caller's transaction.
+    """
+    updated = (
+        db.query(ImageBlob)
+        .filter(ImageBlob.sha256 == sha256)
+        .update({ImageBlob.ref_count: ImageBlob.ref_count + 1}, synchronize_session=False)
+    )
+    if not updated:
+        return None
+    return db.query(ImageBlob.url).filter(ImageBlob.sha256 == sha256).scalar()
+
+
+def register_image(db: Session, image: SpooledImage, url: str) -> None:
+    """
+    Record a freshly stored image with its first reference. A concurrent upload of the
+    same bytes makes the commit fail with IntegrityError; retry with `acquire_image`.
+    """
+    db.add(ImageBlob(sha256=image.sha256, url=url, content_type=image.content_type, size=image.size, ref_count=1))
+
+
+def release_image(db: Session, sha256: Optional[str]) -> Optional[str]:
+    """
+    Drop one reference. When it was the last one the blob row is removed and its URL
+    returned, so the caller can delete the stored file once the transaction commits.
+    """
+    if not sha256:
+        return None
+    (
+        db.query(ImageBlob)
+        .filter(ImageBlob.sha256 == sha256)
+        .update({ImageBlob.ref_count: ImageBlob.ref_count - 1}, synchronize_session=False)
+    )
+    url = db.query(ImageBlob.url).filter(ImageBlob.sha256 == sha256, ImageBlob.ref_count <= 0).scalar()
+    if url is None:
+        return None
+    db.query(ImageBlob).filter(ImageBlob.sha256 == sha256, ImageBlob.ref_count <= 0).delete(synchronize_session=False)
+    return url
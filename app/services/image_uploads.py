@@ -0,0 +1,143 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Callable, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config.cloudinary_config import upload_image, delete_image
+from app.config.postgres_config import SessionLocal
+from app.routers.posts.models import ImageBlob, Posts
+from app.services.cache import response_cache
+from app.services.image_store import acquire_image, register_image
+from app.services.uploads import SpooledImage
+
+IMAGE_PENDING = "pending"
+IMAGE_READY = "ready"
+IMAGE_FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+
+class ImageUploadQueue:
+    """
+    Bounded background pool that uploads spooled post images and records the
+    outcome on the post. At most `max_workers` uploads run at once and at most
+    `max_pending` may be queued or running; callers `reserve()` a slot before
+    creating the post so a full queue is reported before anything is written.
+    """
+
+    def __init__(
+        self,
+        upload: Callable[[BinaryIO, str], str] = upload_image,
+        session_factory=SessionLocal,
+        max_workers: int = 4,
+        max_pending: int = 64,
+        attempts: int = 3,
+        backoff: float = 0.5
+    ):
+        self._upload = upload
+        self._session_factory = session_factory
+        self._max_workers = max_workers
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._attempts = attempts
+        self._backoff = backoff
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def reserve(self) -> bool:
+        """Claim a queue slot without blocking; False when the queue is full"""
+        return self._slots.acquire(blocking=False)
+
+    def release(self) -> None:
+        """Give back a slot reserved for an upload that will not be submitted"""
+        self._slots.release()
+
+    def submit(self, post_id: str, image: SpooledImage) -> Future:
+        """
+        Store `image` for an already committed post using a reserved slot. Bytes that
+        are already stored only gain a reference and are never uploaded again.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="image-upload")
+            return self._executor.submit(self._run, post_id, image)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _run(self, post_id: str, image: SpooledImage) -> str:
+        try:
+            db = self._session_factory()
+            try:
+                return self._store(db, post_id, image)
+            except Exception:
+                # Nobody waits on the future, so a post left pending here would never settle
+                logger.exception("Storing the image of post %s failed", post_id)
+                db.rollback()
+                return self._mark_failed(db, post_id)
+            finally:
+                db.close()
+        finally:
+            image.discard()
+            self._slots.release()
+
+    def _store(self, db: Session, post_id: str, image: SpooledImage) -> str:
+        for _ in range(2):
+            image_url = acquire_image(db, image.sha256)
+            uploaded = image_url is None
+            if uploaded:
+                image_url = self._upload_with_retries(image)
+                if image_url is None:
+                    return self._mark_failed(db, post_id)
+                register_image(db, image, image_url)
+
+            values = {Posts.image_status: IMAGE_READY, Posts.image_url: image_url, Posts.image_sha256: image.sha256}
+            if not self._update_post(db, post_id, values):
+                # The post was deleted while its image was uploading
+                db.rollback()
+                if uploaded and db.get(ImageBlob, image.sha256) is None:
+                    delete_image(image_url)
+                return IMAGE_FAILED
+            try:
+                db.commit()
+                response_cache.invalidate("posts", f"post:{post_id}")
+                return IMAGE_READY
+            except IntegrityError:
+                # A concurrent upload registered the same bytes first; take a reference on it instead
+                db.rollback()
+        raise RuntimeError(f"Could not register image {image.sha256}")
+
+    def _upload_with_retries(self, image: SpooledImage) -> Optional[str]:
+        key = image.content_key
+        for attempt in range(self._attempts):
+            try:
+                return self._upload(image.rewind(), key)
+            except Exception as e:
+                logger.warning("Image upload for %s failed (attempt %d/%d): %s", key, attempt + 1, self._attempts, e)
+                if attempt + 1 < self._attempts:
+                    time.sleep(self._backoff * 2 ** attempt)
+        return None
+
+    def _mark_failed(self, db: Session, post_id: str) -> str:
+        self._update_post(db, post_id, {Posts.image_status: IMAGE_FAILED})
+        db.commit()
+        response_cache.invalidate("posts", f"post:{post_id}")
+        return IMAGE_FAILED
+
+    @staticmethod
+    def _update_post(db: Session, post_id: str, values) -> bool:
+        return db.query(Posts).filter(Posts.id == post_id).update(values, synchronize_session=False) > 0
+
+
+image_upload_queue = ImageUploadQueue(
+    max_workers=int(os.getenv("IMAGE_UPLOAD_CONCURRENCY", "4")),
+    max_pending=int(os.getenv("IMAGE_UPLOAD_MAX_PENDING", "64")),
+    attempts=int(os.getenv("IMAGE_UPLOAD_ATTEMPTS", "3"))
+)
@@ -0,0 +1,211 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set
+
+import shortuuid
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import String, case, delete, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.routers.comments.models import Comments, CommentLike
+from app.routers.forums.models import Forums, ForumLike
+from app.routers.posts.models import Posts, PostLike
+from app.routers.users.models import Users
+from app.services.pagination import decode_cursor, keyset_filter, order_columns, paginate
+
+# Denormalized counter owner -> (like table, column pointing back at the owner)
+LIKE_COUNTERS = {
+    "posts": (Posts, PostLike, PostLike.post_id),
+    "forums": (Forums, ForumLike, ForumLike.forum_id),
+    "comments": (Comments, CommentLike, CommentLike.comment_id),
+}
+
+# Like table -> the column holding when the like was made
+_LIKED_AT = {
+    PostLike: PostLike.created_at,
+    ForumLike: ForumLike.timestamp,
+    CommentLike: CommentLike.created_at,
+}
+
+
+def liked_target_ids(db: Session, like_model, target_attr: str, user, target_ids: Iterable) -> Set[str]:
+    """
+    Return the subset of `target_ids` the user has liked, resolved for a whole page
+    with a single `IN (...)` query against `like_model`
+    """
+    ids = list(dict.fromkeys(str(i) for i in target_ids))
+    if user is None or not ids:
+        return set()
+    target_column = getattr(like_model, target_attr)
+    rows = (
+        db.query(target_column)
+        .filter(like_model.user_id == user.id, target_column.in_(ids))
+        .all()
+    )
+    return {str(row[0]) for row in rows}
+
+
+def adjust_like_count(db: Session, model, target_id: str, delta: int):
+    """
+    Shift the `likes` counter of one row by `delta` in a single UPDATE, so
+    concurrent toggles cannot overwrite each other. The counter never drops below zero.
+    The change joins the caller's transaction; commit it together with the like row.
+    Returns the updated row, or None when it does not exist.
+    """
+    adjusted = func.coalesce(model.likes, 0) + delta
+    return db.scalars(
+        update(model)
+        .where(model.id == target_id)
+        .values(likes=case((adjusted < 0, 0), else_=adjusted))
+        .returning(model)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+
+class LikeResult(NamedTuple):
+    target: Any  # the liked row, with its counter as of this change
+    liked: bool  # whether the user likes it now
+    changed: bool  # whether a like row was added or removed
+
+
+def _insert_like(db: Session, name: str, target_id: str, user_id: str):
+    """
+    INSERT a like only if the target exists and the user has not liked it yet, in one
+    statement: INSERT ... SELECT ... WHERE EXISTS ... ON CONFLICT DO NOTHING RETURNING
+    """
+    model, like_model, target_column = LIKE_COUNTERS[name]
+    values = {"user_id": user_id, target_column.key: target_id, _LIKED_AT[like_model].key: datetime.utcnow()}
+    if isinstance(like_model.id.type, String):
+        values["id"] = shortuuid.uuid()
+    source = select(*[literal(value) for value in values.values()]).where(
+        select(model.id).where(model.id == target_id).exists()
+    )
+    dialect_insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    return (
+        dialect_insert(like_model)
+        .from_select(list(values), source)
+        .on_conflict_do_nothing(index_elements=[like_model.user_id, target_column])
+        .returning(like_model.id)
+    )
+
+
+def set_like(
+    db: Session,
+    name: str,
+    target_id: str,
+    user_id: str,
+    liked: Optional[bool] = None,
+) -> Optional[LikeResult]:
+    """
+    Like (`liked=True`), unlike (`False`) or toggle (`None`) a post, forum or comment
+    (`name` as in LIKE_COUNTERS) for a user. The unique (user, target)
+    constraint arbitrates concurrent requests: the like row is changed with one
+    INSERT ... ON CONFLICT DO NOTHING or DELETE ... RETURNING, and only a real change
+    moves the counter, with an UPDATE ... RETURNING that also yields the row.
+    Joins the caller's transaction. Returns None when the target does not exist.
+    """
+    model, like_model, target_column = LIKE_COUNTERS[name]
+    delta = None
+    if liked is not True:
+        removed = db.execute(
+            delete(like_model)
+            .where(like_model.user_id == user_id, target_column == target_id)
+            .returning(like_model.id)
+        ).first()
+        if removed is not None or liked is False:
+            delta = -1 if removed is not None else 0
+    if delta is None:
+        delta = 1 if db.execute(_insert_like(db, name, target_id, user_id)).first() is not None else 0
+
+    if delta:
+        target = adjust_like_count(db, model, target_id, delta)
+    else:
+        target = db.query(model).filter(model.id == target_id).first()
+    if target is None:
+        return None
+    return LikeResult(target=target, liked=delta > 0 or (delta == 0 and liked is not False), changed=delta != 0)
+
+
+def reconcile_like_counts(db: Session) -> Dict[str, Dict[str, int]]:
+    """
+    Recompute every denormalized `likes` counter from its like table with one
+    set-based UPDATE per table, touching only rows that drifted.
+    Returns, per table, how many rows were corrected and the total absolute drift.
+    """
+    report = {}
+    for name, (model, like_model, target_column) in LIKE_COUNTERS.items():
+        actual = (
+            select(func.count())
+            .select_from(like_model)
+            .where(target_column == model.id)
+            .scalar_subquery()
+        )
+        drifted = func.coalesce(model.likes, -1) != actual
+        rows, drift = (
+            db.query(func.count(model.id), func.coalesce(func.sum(func.abs(func.coalesce(model.likes, 0) - actual)), 0))
+            .filter(drifted)
+            .one()
+        )
+        if rows:
+            db.query(model).filter(drifted).update({model.likes: actual}, synchronize_session=False)
+        report[name] = {"rows": int(rows), "drift": int(drift)}
+    db.commit()
+    return report
+
+
+class Liker(BaseModel):
+    user_id: str
+    username: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class LikersPage(BaseModel):
+    total: int  # the owner's likes counter
+    likes: List[Liker]
+    next_cursor: Optional[str] = None
+
+
+_LABELS = {"posts": "Post", "forums": "Forum", "comments": "Comment"}
+
+
+def likers_page(
+    db: Session,
+    name: str,
+    target_id: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    expand_users: bool = False,
+) -> LikersPage:
+    """
+    One page of who liked a post, forum or comment (`name` as in LIKE_COUNTERS),
+    newest first, resumed with a (liked at, id) keyset cursor.
+    The total is the owner's denormalized counter, so no COUNT(*) runs; usernames
+    are added with a single join when `expand_users` is set. Raises 404 for an unknown target.
+    """
+    model, like_model, target_column = LIKE_COUNTERS[name]
+    total = db.query(model.likes).filter(model.id == target_id).first()
+    if total is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{_LABELS[name]} not found")
+
+    key = [_LIKED_AT[like_model], like_model.id]
+    columns = [like_model.user_id, *key]
+    if expand_users:
+        query = db.query(*columns, Users.username).outerjoin(Users, Users.id == like_model.user_id)
+    else:
+        query = db.query(*columns)
+    query = query.filter(target_column == target_id)
+    if cursor:
+        query = query.filter(keyset_filter(key, decode_cursor(cursor, 2), descending=True))
+    rows = query.order_by(*order_columns(key, descending=True)).limit(limit + 1).all()
+    page, next_cursor = paginate(rows, limit, key=lambda row: (row[1], row[2]))
+
+    return LikersPage(
+        total=total[0] or 0,
+        likes=[
+            Liker(user_id=str(row[0]), created_at=row[1], username=row[3] if expand_users else None)
+            for row in page
+        ],
+        next_cursor=next_cursor,
+    )
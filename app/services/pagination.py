@@ -0,0 +1,103 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Literal, Optional, Sequence
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import and_, or_
+
+
+def _encode_value(value: Any):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the sort key of the last row of a page into an opaque cursor
+    """
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor, expecting `size` key values
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("cursor has the wrong shape")
+        return [_decode_value(v) for v in values]
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def keyset_filter(columns: Sequence[Any], values: Sequence[Any], descending: bool = False):
+    """
+    Build the WHERE clause that resumes a scan ordered by `columns` right after `values`
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        comparison = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal_prefix, comparison))
+    return or_(*clauses)
+
+
+def order_columns(columns: Sequence[Any], descending: bool = False) -> List[Any]:
+    return [c.desc() if descending else c.asc() for c in columns]
+
+
+def paginate(rows: list, limit: int, key) -> tuple:
+    """
+    Trim a `limit + 1` result set to one page and build the cursor for the next one.
+    Returns (page_rows, next_cursor)
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(key(page[-1]))
+
+
+def set_next_cursor(response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+
+class PageParams:
+    """The limit/cursor/order query parameters shared by the keyset-paginated listings"""
+
+    def __init__(
+        self,
+        limit: int = Query(50, ge=1, le=200, description="Maximum number of items to return"),
+        cursor: Optional[str] = Query(
+            None, description="Opaque cursor from the X-Next-Cursor header of the previous page"
+        ),
+        order: Literal["asc", "desc"] = Query("asc", description="asc for oldest first, desc for newest first"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.descending = order == "desc"
+
+
+def paginate_query(query, columns: Sequence[Any], page: PageParams, response=None) -> list:
+    """
+    Run `query` for one page ordered by `columns`, which must end in a unique column,
+    resuming after the page's cursor. The next cursor is set on `response` when given.
+    """
+    if page.cursor:
+        query = query.filter(keyset_filter(columns, decode_cursor(page.cursor, len(columns)), page.descending))
+    rows = query.order_by(*order_columns(columns, page.descending)).limit(page.limit + 1).all()
+    rows, next_cursor = paginate(rows, page.limit, lambda row: [getattr(row, column.key) for column in columns])
+    if response is not None:
+        set_next_cursor(response, next_cursor)
+    return rows
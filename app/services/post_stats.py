@@ -0,0 +1,111 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from app.routers.posts.models import Posts, PostStat
+from app.routers.posts.schemas import PostBase, StatComparison
+
+STAT_SORT_PREFIX = "stat:"
+_stats_adapter = TypeAdapter(Dict[str, float])
+
+
+def validate_stats(raw) -> Dict[str, float]:
+    """Validate a stats payload with the same rules as PostBase.stats"""
+    try:
+        stats = _stats_adapter.validate_python(raw)
+    except ValidationError:
+        raise ValueError("Stats must be an object of numeric values")
+    return PostBase.validate_stats(stats)
+
+
+def stat_rows(stats: Optional[Dict[str, float]]) -> List[PostStat]:
+    """Build the post_stats rows that mirror a post's stats dict"""
+    return [PostStat(stat=name, value=float(value)) for name, value in (stats or {}).items()]
+
+
+def parse_stat_range(raw: str) -> Tuple[str, Optional[float], Optional[float]]:
+    """
+    Parse a `name:min..max` filter. Either bound may be omitted (`speed:9..`, `spin:..7`),
+    and a single value (`control:8`) matches that value exactly.
+    """
+    name, _, bounds = raw.rpartition(":")
+    try:
+        if not name or not bounds:
+            raise ValueError
+        if ".." in bounds:
+            low, _, high = bounds.partition("..")
+            minimum = float(low) if low else None
+            maximum = float(high) if high else None
+        else:
+            minimum = maximum = float(bounds)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid stat filter '{raw}', expected name:min..max"
+        )
+    return name, minimum, maximum
+
+
+def stat_range_filter(raw: str):
+    """WHERE clause keeping posts whose stat falls in the range, served by ix_post_stats_stat_value"""
+    name, minimum, maximum = parse_stat_range(raw)
+    matching = select(PostStat.post_id).where(PostStat.stat == name)
+    if minimum is not None:
+        matching = matching.where(PostStat.value >= minimum)
+    if maximum is not None:
+        matching = matching.where(PostStat.value <= maximum)
+    return Posts.id.in_(matching)
+
+
+def stat_sort_name(sort: str) -> Optional[str]:
+    if sort.startswith(STAT_SORT_PREFIX) and len(sort) > len(STAT_SORT_PREFIX):
+        return sort[len(STAT_SORT_PREFIX):]
+    return None
+
+
+def join_stat_sort(query, name: str):
+    """
+    Join the stat used by `sort=stat:<name>` and return (query, value_column).
+    Posts that do not have the stat are left out of the results.
+    """
+    sorted_stat = aliased(PostStat)
+    query = query.join(sorted_stat, (sorted_stat.post_id == Posts.id) & (sorted_stat.stat == name))
+    return query, sorted_stat.value
+
+
+def compare_stats(post_ids: Sequence[str], stats: Sequence[Optional[Dict[str, float]]]) -> List[StatComparison]:
+    """
+    Align several posts' stats on the union of their keys and compute, per stat,
+    each post's delta from the best value, its rank (1 = highest, ties share a rank)
+    and the best post. Posts lacking a stat get None for it.
+    """
+    keys = sorted({name for post_stats in stats for name in (post_stats or {})})
+    if not keys:
+        return []
+    values = np.full((len(stats), len(keys)), np.nan)
+    column = {name: j for j, name in enumerate(keys)}
+    for i, post_stats in enumerate(stats):
+        for name, value in (post_stats or {}).items():
+            values[i, column[name]] = value
+
+    present = ~np.isnan(values)
+    best = np.nanmax(values, axis=0)
+    deltas = values - best
+    # Rank = 1 + number of posts with a strictly higher value for the same stat
+    ranks = (values[np.newaxis, :, :] > values[:, np.newaxis, :]).sum(axis=1) + 1
+    best_index = np.nanargmax(values, axis=0)
+
+    return [
+        StatComparison(
+            stat=name,
+            values=[float(v) if ok else None for v, ok in zip(values[:, j], present[:, j])],
+            deltas=[float(d) if ok else None for d, ok in zip(deltas[:, j], present[:, j])],
+            ranks=[int(r) if ok else None for r, ok in zip(ranks[:, j], present[:, j])],
+            best_post_id=post_ids[int(best_index[j])],
+        )
+        for j, name in enumerate(keys)
+    ]
@@ -0,0 +1,91 @@
+import re
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Float, cast, column, func, literal, literal_column, select, table, union_all
+from sqlalchemy.orm import Session
+
+from app.config.postgres_config import is_sqlite
+from app.services.pagination import decode_cursor, keyset_filter, order_columns, paginate
+
+MAX_SEARCH_TOKENS = 8
+# bm25 column weights for the FTS5 tables, in (title, content, author) order
+SQLITE_BM25_WEIGHTS = "10.0, 4.0, 1.0"
+# Tables whose FTS5 index has other columns; comments only index the body
+_SQLITE_TABLE_WEIGHTS = {"comments": "1.0"}
+
+
+def search_tokens(q: Optional[str]) -> List[str]:
+    """Split user input into the alphanumeric terms that are sent to the index"""
+    if not q:
+        return []
+    return re.findall(r"[^\W_]+", q.lower())[:MAX_SEARCH_TOKENS]
+
+
+def _pg_tsquery(tokens: Sequence[str]):
+    # Every term is a prefix match so results update as the user types
+    return func.to_tsquery("english", " & ".join(f"{t}:*" for t in tokens))
+
+
+def _sqlite_match(tokens: Sequence[str]) -> str:
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+def match_filter(model, tokens: Sequence[str]):
+    """WHERE clause restricting `model` to rows whose search index matches every token"""
+    if is_sqlite():
+        return model.id.in_(select(ranked_matches(model, tokens).subquery().c.id))
+    return model.search_vector.op("@@")(_pg_tsquery(tokens))
+
+
+def ranked_matches(model, tokens: Sequence[str]):
+    """
+    Select the matching rows of `model` with a relevance `score` column,
+    where a higher score means a better match
+    """
+    if is_sqlite():
+        fts_name = f"{model.__tablename__}_fts"
+        fts = table(fts_name, column("rowid"))
+        weights = _SQLITE_TABLE_WEIGHTS.get(model.__tablename__, SQLITE_BM25_WEIGHTS)
+        score = -literal_column(f"bm25({fts_name}, {weights})")
+        return (
+            select(model, cast(score, Float).label("score"))
+            .join(fts, fts.c.rowid == literal_column(f"{model.__tablename__}.rowid"))
+            .where(literal_column(fts_name).op("MATCH")(_sqlite_match(tokens)))
+        )
+    query = _pg_tsquery(tokens)
+    return (
+        select(model, cast(func.ts_rank_cd(model.search_vector, query), Float).label("score"))
+        .where(model.search_vector.op("@@")(query))
+    )
+
+
+def search_documents(db: Session, models: dict, q: str, limit: int, cursor: Optional[str] = None):
+    """
+    Relevance-ranked, keyset-paginated search over several models that share
+    title/content/author/timestamp columns. `models` maps a result type name to a model.
+    Returns (rows, next_cursor) where each row has type, id, title, content, author, timestamp and score.
+    """
+    tokens = search_tokens(q)
+    if not tokens:
+        return [], None
+
+    selects = []
+    for kind, model in models.items():
+        ranked = ranked_matches(model, tokens).subquery()
+        selects.append(select(
+            literal(kind).label("type"),
+            ranked.c.id,
+            ranked.c.title,
+            ranked.c.content,
+            ranked.c.author,
+            ranked.c.timestamp,
+            ranked.c.score,
+        ))
+    results = union_all(*selects).subquery()
+
+    sort_columns = [results.c.score, results.c.type, results.c.id]
+    query = select(results)
+    if cursor:
+        query = query.where(keyset_filter(sort_columns, decode_cursor(cursor, len(sort_columns)), descending=True))
+    rows = db.execute(query.order_by(*order_columns(sort_columns, descending=True)).limit(limit + 1)).all()
+    return paginate(rows, limit, lambda row: [row.score, row.type, row.id])
@@ -0,0 +1,150 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.routers.posts.models import Posts
+
+METRICS = ("euclidean", "cosine")
+
+
+class StatsSimilarityIndex:
+    """
+    In-memory matrix of every post's stats for nearest-neighbour lookups.
+
+    Row i holds the stats of post `ids[i]`; column j holds stat `keys[j]`.
+    Missing stats are stored as 0 in `values` and 0 in `mask`, so distances can
+    be restricted to the keys two posts share with plain matrix products.
+    The matrix is built from the database on first use and then kept up to date
+    by upsert/remove calls from the write endpoints.
+    """
+
+    def __init__(self, initial_capacity: int = 256):
+        self._lock = threading.RLock()
+        self._initial_capacity = initial_capacity
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop the matrix; it is rebuilt from the database on the next lookup"""
+        with self._lock:
+            self._loaded = False
+            self._keys: List[str] = []
+            self._key_index: Dict[str, int] = {}
+            self._ids: List[str] = []
+            self._row_of: Dict[str, int] = {}
+            self._values = np.zeros((self._initial_capacity, 0))
+            self._mask = np.zeros((self._initial_capacity, 0))
+
+    @property
+    def size(self) -> int:
+        return len(self._ids)
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            for post_id, stats in db.execute(select(Posts.id, Posts.stats).where(Posts.stats.isnot(None))):
+                self._upsert(str(post_id), stats)
+            self._loaded = True
+
+    def upsert(self, post_id: str, stats: Optional[Dict[str, float]]) -> None:
+        with self._lock:
+            if self._loaded:
+                self._upsert(post_id, stats)
+
+    def remove(self, post_id: str) -> None:
+        with self._lock:
+            if self._loaded:
+                self._remove(post_id)
+
+    def nearest(self, post_id: str, k: int = 10, metric: str = "euclidean") -> List[Tuple[str, float]]:
+        """
+        Return up to k (post_id, distance) pairs closest to `post_id`, nearest first,
+        comparing only the stats both posts have. Cosine distance is 1 - cosine similarity.
+        """
+        with self._lock:
+            row = self._row_of.get(post_id)
+            if row is None:
+                return []
+            n = len(self._ids)
+            values = self._values[:n]
+            mask = self._mask[:n]
+            query = values[row]
+            query_mask = mask[row]
+
+            shared = mask @ query_mask
+            dot = values @ query
+            row_sq_on_shared = (values * values) @ query_mask
+            query_sq_on_shared = mask @ (query * query)
+            if metric == "cosine":
+                denominator = np.sqrt(row_sq_on_shared * query_sq_on_shared)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    distances = 1.0 - dot / denominator
+                distances[denominator == 0] = np.inf
+            else:
+                distances = np.sqrt(np.maximum(row_sq_on_shared - 2.0 * dot + query_sq_on_shared, 0.0))
+            distances[shared == 0] = np.inf
+            distances[row] = np.inf
+
+            candidates = int(np.isfinite(distances).sum())
+            k = min(k, candidates)
+            if k <= 0:
+                return []
+            nearest = np.argpartition(distances, k - 1)[:k]
+            nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+            return [(self._ids[i], float(distances[i])) for i in nearest]
+
+    def _upsert(self, post_id: str, stats: Optional[Dict[str, float]]) -> None:
+        if not stats:
+            self._remove(post_id)
+            return
+        for key in stats:
+            if key not in self._key_index:
+                self._add_key(key)
+        row = self._row_of.get(post_id)
+        if row is None:
+            row = len(self._ids)
+            if row == self._values.shape[0]:
+                self._grow_rows()
+            self._ids.append(post_id)
+            self._row_of[post_id] = row
+        self._values[row] = 0.0
+        self._mask[row] = 0.0
+        for key, value in stats.items():
+            column = self._key_index[key]
+            self._values[row, column] = float(value)
+            self._mask[row, column] = 1.0
+
+    def _remove(self, post_id: str) -> None:
+        row = self._row_of.pop(post_id, None)
+        if row is None:
+            return
+        # Move the last row into the gap so the live rows stay contiguous
+        last = len(self._ids) - 1
+        if row != last:
+            moved_id = self._ids[last]
+            self._values[row] = self._values[last]
+            self._mask[row] = self._mask[last]
+            self._ids[row] = moved_id
+            self._row_of[moved_id] = row
+        self._values[last] = 0.0
+        self._mask[last] = 0.0
+        self._ids.pop()
+
+    def _add_key(self, key: str) -> None:
+        self._key_index[key] = len(self._keys)
+        self._keys.append(key)
+        self._values = np.pad(self._values, ((0, 0), (0, 1)))
+        self._mask = np.pad(self._mask, ((0, 0), (0, 1)))
+
+    def _grow_rows(self) -> None:
+        extra = max(self._values.shape[0], 1)
+        self._values = np.pad(self._values, ((0, extra), (0, 0)))
+        self._mask = np.pad(self._mask, ((0, extra), (0, 0)))
+
+
+stats_similarity_index = StatsSimilarityIndex()
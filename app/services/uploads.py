@@ -0,0 +1,104 @@
+import hashlib
+import io
+from typing import BinaryIO, Optional
+
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+
+from app.config.cloudinary_config import ALLOWED_TYPES, MAX_FILE_SIZE
+
+CHUNK_SIZE = 256 * 1024
+
+IMAGE_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp"}
+
+
+def sniff_image_type(header: bytes) -> Optional[str]:
+    """
+    Detect the image type from the file's magic bytes, ignoring the client's content_type
+    """
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+class SpooledImage:
+    """
+    An upload's spooled body, taken over from the request, with its sniffed type, size
+    and SHA-256. The file stays in memory or on disk as the server spooled it.
+    """
+
+    def __init__(self, file: BinaryIO, content_type: str, size: int, sha256: str):
+        self.file = file
+        self.content_type = content_type
+        self.size = size
+        self.sha256 = sha256
+
+    @property
+    def extension(self) -> str:
+        return IMAGE_EXTENSIONS[self.content_type]
+
+    @property
+    def content_key(self) -> str:
+        """Storage name derived from the bytes, so identical uploads share one file"""
+        return f"{self.sha256}{self.extension}"
+
+    def rewind(self) -> BinaryIO:
+        """The file positioned at its first byte, ready to be read again"""
+        self.file.seek(0)
+        return self.file
+
+    def discard(self) -> None:
+        self.file.close()
+
+
+def _unsupported_type() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Unsupported file type. Only JPEG, PNG, and WEBP are allowed."
+    )
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"File size exceeds {max_size // (1024 * 1024)}MB limit"
+    )
+
+
+async def spool_image_upload(
+    upload: UploadFile,
+    max_size: int = MAX_FILE_SIZE,
+    chunk_size: int = CHUNK_SIZE
+) -> SpooledImage:
+    """
+    Validate and hash an uploaded image in one pass over the body the server already
+    spooled, then take that file over from the request instead of copying it.
+    The type is sniffed from the first chunk and the upload is rejected as soon as
+    it passes `max_size`; hashing runs in the threadpool so large uploads never block
+    the event loop. The caller owns the returned file and must `discard()` it.
+    """
+    if upload.size is not None and upload.size > max_size:
+        raise _too_large(max_size)
+
+    await upload.seek(0)
+    chunk = await upload.read(chunk_size)
+    content_type = sniff_image_type(chunk)
+    if content_type not in ALLOWED_TYPES:
+        raise _unsupported_type()
+
+    hasher = hashlib.sha256()
+    size = 0
+    while chunk:
+        size += len(chunk)
+        if size > max_size:
+            raise _too_large(max_size)
+        await run_in_threadpool(hasher.update, chunk)
+        chunk = await upload.read(chunk_size)
+
+    # The request closes its form files when it ends; leave it an empty one to close
+    file, upload.file = upload.file, io.BytesIO()
+    return SpooledImage(file, str(content_type), size, hasher.hexdigest())
@@ -1,4 +1,5 @@
 import pytest
+import shortuuid
 from fastapi.testclient import TestClient
 from app.main import app
 
@@ -11,6 +12,21 @@ def client():
 def auth_headers():
     return {"Authorization": "Bearer testtoken"}
 
+def register_and_login(client):
+    username = f"user{shortuuid.uuid()[:10]}"
+    password = "testpass123"
+    client.post("/users", json={"username": username, "email": f"{username}@example.com", "password": password})
+    response = client.post("/users/login", json={"username": username, "password": password})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+@pytest.fixture(scope="session")
+def user_headers(client):
+    return register_and_login(client)
+
+@pytest.fixture(scope="session")
+def other_user_headers(client):
+    return register_and_login(client)
+
 @pytest.fixture(scope="session")
 def test_user():
     class User:
@@ -0,0 +1,166 @@
+import threading
+import time
+
+from sqlalchemy import text
+
+from app.config.postgres_config import SessionLocal
+from app.routers.posts.models import ImageBlob, Posts, PostDeleteJob
+from app.services import bulk_delete
+from app.services.bulk_delete import run_delete_job
+
+
+def create_posts(client, headers, count):
+    return [
+        client.post("/posts", data={"title": f"Bulk {i}", "content": "x"}, headers=headers).json()["id"]
+        for i in range(count)
+    ]
+
+
+class TestDeleteAllPosts:
+    def test_job_deletes_posts_in_chunks_and_resumes_pending_images(self, client, user_headers):
+        post_ids = create_posts(client, user_headers, 3)
+        client.post(f"/posts/{post_ids[0]}/like", headers=user_headers)
+        client.post("/comments", json={"comment": "bye", "post_id": post_ids[1]}, headers=user_headers)
+
+        db = SessionLocal()
+        try:
+            # A job interrupted after committing a chunk but before deleting its images
+            job = PostDeleteJob(status="running", total=3, deleted=1, pending_images=["/static/uploads/missing.png"])
+            db.add(job)
+            db.commit()
+            run_delete_job(str(job.id), SessionLocal, chunk_size=2)
+
+            db.expire_all()
+            job = db.get(PostDeleteJob, job.id)
+            assert job.status == "completed"
+            assert job.deleted >= 4
+            assert job.image_errors == 0
+            assert job.pending_images is None
+            assert db.query(Posts).count() == 0
+        finally:
+            db.close()
+
+    def test_endpoint_returns_job_with_progress(self, client, user_headers):
+        create_posts(client, user_headers, 2)
+        response = client.delete("/posts/all", headers=user_headers)
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+
+        for _ in range(100):
+            job = client.get(f"/posts/delete-jobs/{job_id}", headers=user_headers).json()
+            if job["status"] == "completed":
+                break
+            time.sleep(0.05)
+        assert job["status"] == "completed"
+        assert job["deleted"] >= 2
+        assert client.get("/posts").json() == []
+
+    def test_new_job_deletes_images_a_failed_job_left_pending(self, client, user_headers, monkeypatch):
+        deleted_images = []
+        monkeypatch.setattr(bulk_delete, "delete_images", lambda urls: deleted_images.extend(urls) or 0)
+        db = SessionLocal()
+        try:
+            failed = PostDeleteJob(status="failed", error="connection reset", pending_images=["https://cdn/a.png"])
+            db.add(failed)
+            db.commit()
+            failed_id = failed.id
+
+            job_id = client.delete("/posts/all", headers=user_headers).json()["id"]
+            for _ in range(100):
+                if client.get(f"/posts/delete-jobs/{job_id}", headers=user_headers).json()["status"] == "completed":
+                    break
+                time.sleep(0.05)
+            db.expire_all()
+            assert db.get(PostDeleteJob, job_id).status == "completed"
+            assert db.get(PostDeleteJob, failed_id).pending_images is None
+            assert deleted_images == ["https://cdn/a.png"]
+        finally:
+            db.close()
+
+    def test_job_deletes_only_images_left_without_references(self, client, user_headers, monkeypatch):
+        deleted_images = []
+        monkeypatch.setattr(bulk_delete, "delete_images", lambda urls: deleted_images.extend(urls) or 0)
+        post_ids = create_posts(client, user_headers, 4)
+        shared, kept = "a" * 64, "b" * 64
+        db = SessionLocal()
+        try:
+            db.add(ImageBlob(sha256=shared, url="https://cdn/shared.png", content_type="image/png", size=1, ref_count=2))
+            # Still referenced by something the job does not delete
+            db.add(ImageBlob(sha256=kept, url="https://cdn/kept.png", content_type="image/png", size=1, ref_count=2))
+            images = [
+                ("https://cdn/shared.png", shared),
+                ("https://cdn/shared.png", shared),
+                ("https://cdn/kept.png", kept),
+                ("https://cdn/untracked.png", None),
+            ]
+            for post_id, (image_url, sha256) in zip(post_ids, images):
+                post = db.get(Posts, post_id)
+                post.image_url, post.image_sha256 = image_url, sha256
+            job = PostDeleteJob(status="queued")
+            db.add(job)
+            db.commit()
+            run_delete_job(str(job.id), SessionLocal, chunk_size=3)
+
+            db.expire_all()
+            assert db.get(PostDeleteJob, job.id).status == "completed"
+            assert deleted_images == ["https://cdn/shared.png"]
+            assert db.get(ImageBlob, shared) is None
+            assert db.get(ImageBlob, kept).ref_count == 1
+            db.delete(db.get(ImageBlob, kept))
+            db.commit()
+        finally:
+            db.close()
+
+    def test_concurrent_starts_share_one_job(self, client, monkeypatch):
+        launched = []
+        monkeypatch.setattr(bulk_delete, "launch_delete_job", launched.append)
+        # Both requests see no active job before either inserts one
+        both_looked = threading.Barrier(2, timeout=5)
+        first_lookups = []
+        active_job = bulk_delete._active_job
+
+        def racing_active_job(db):
+            job = active_job(db)
+            if len(first_lookups) < 2:
+                first_lookups.append(job)
+                both_looked.wait()
+            return job
+
+        monkeypatch.setattr(bulk_delete, "_active_job", racing_active_job)
+        jobs = []
+
+        def start():
+            db = SessionLocal()
+            try:
+                jobs.append(str(bulk_delete.start_delete_all_job(db, "racer").id))
+            finally:
+                db.close()
+
+        threads = [threading.Thread(target=start) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        db = SessionLocal()
+        try:
+            active = db.query(PostDeleteJob).filter(PostDeleteJob.status.in_(bulk_delete.ACTIVE_JOB_STATUSES)).all()
+            assert first_lookups == [None, None]
+            assert len(jobs) == 2 and jobs[0] == jobs[1] == active[0].id
+            assert len(active) == 1
+            active[0].status = "completed"
+            db.commit()
+        finally:
+            db.close()
+
+    def test_unknown_job_returns_404(self, client, user_headers):
+        assert client.get("/posts/delete-jobs/nope", headers=user_headers).status_code == 404
+
+    def test_resume_logs_and_returns_when_jobs_table_is_missing(self, caplog):
+        def missing_table_session():
+            db = SessionLocal()
+            db.query = lambda *entities: db.execute(text("SELECT id FROM no_such_delete_jobs"))
+            return db
+
+        bulk_delete.resume_delete_jobs(missing_table_session)
+        assert "Could not look up post delete jobs" in caplog.text
@@ -0,0 +1,94 @@
+import io
+import json
+
+import shortuuid
+
+from app.services.bulk_import import read_rows
+
+
+def _ndjson(*rows):
+    return "\n".join(r if isinstance(r, str) else json.dumps(r) for r in rows).encode()
+
+
+def test_read_rows_decodes_csv_stats_and_blank_cells():
+    stream = io.StringIO('title,content,image_url,stats\nA,x,,"{""speed"": 9}"\nB,y,,{oops\n')
+    rows = list(read_rows(stream, "csv", "posts"))
+    assert rows[0] == (2, {"title": "A", "content": "x", "image_url": None, "stats": {"speed": 9}})
+    assert rows[1] == (3, "Invalid JSON in column 'stats'")
+
+
+def test_import_posts_reports_row_errors(client, user_headers):
+    title = f"Imported {shortuuid.uuid()[:8]}"
+    body = _ndjson(
+        {"title": title, "content": "one", "stats": {"speed": 9}},
+        "{not json",
+        {"title": title, "content": "two", "stats": {"speed": 11}},
+        "",
+        {"content": "no title"},
+        {"title": title, "content": "three"},
+    )
+    response = client.post(
+        "/posts/import", params={"chunk_size": 2},
+        files={"file": ("posts.ndjson", body, "application/x-ndjson")}, headers=user_headers
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["total"], report["inserted"], report["failed"]) == (5, 2, 3)
+    assert [e["line"] for e in report["errors"]] == [2, 3, 5]
+    assert "between 5 and 10" in report["errors"][1]["error"]
+    assert report["errors"][2]["error"].startswith("title:")
+
+    posts = client.get("/posts", params={"search": title}).json()
+    assert sorted(p["content"] for p in posts) == ["one", "three"]
+    assert {p["stats"]["speed"] for p in posts if p["stats"]} == {9}
+    speedy = client.get("/posts", params={"stat": "speed:9..9", "limit": 100}).json()
+    assert any(p["content"] == "one" and p["title"] == title for p in speedy)
+
+
+def test_import_comments_checks_targets(client, user_headers):
+    post_id = client.post("/posts", data={"title": "Import target", "content": "x"}, headers=user_headers).json()["id"]
+    forum_id = client.post("/forums", json={"title": "Import forum", "content": "x"}, headers=user_headers).json()["id"]
+    csv_body = (
+        "comment,post_id,forum_id\n"
+        f"on post,{post_id},\n"
+        f"on forum,,{forum_id}\n"
+        "orphan,missing,\n"
+        f"both,{post_id},{forum_id}\n"
+    ).encode()
+    response = client.post(
+        "/comments/import", files={"file": ("comments.csv", csv_body, "text/csv")}, headers=user_headers
+    )
+    report = response.json()
+    assert (report["inserted"], report["failed"]) == (2, 2)
+    assert [e["line"] for e in report["errors"]] == [4, 5]
+    comments = client.get(f"/comments/post/{post_id}").json()
+    assert [c["comment"] for c in comments] == ["on post"]
+
+
+def test_import_comments_checks_parents(client, user_headers):
+    post_id = client.post("/posts", data={"title": "Import parents", "content": "x"}, headers=user_headers).json()["id"]
+    other_id = client.post("/posts", data={"title": "Other parents", "content": "x"}, headers=user_headers).json()["id"]
+    root = {"comment": "root", "post_id": post_id}
+    parent_id = client.post("/comments", json=root, headers=user_headers).json()["id"]
+    csv_body = (
+        "comment,post_id,parent_id\n"
+        f"reply,{post_id},{parent_id}\n"
+        f"lost,{post_id},missing\n"
+        f"elsewhere,{other_id},{parent_id}\n"
+    ).encode()
+    response = client.post(
+        "/comments/import", files={"file": ("comments.csv", csv_body, "text/csv")}, headers=user_headers
+    )
+    report = response.json()
+    assert (report["inserted"], report["failed"]) == (1, 2)
+    assert [e["line"] for e in report["errors"]] == [3, 4]
+    assert client.get(f"/comments/post/{post_id}/replies/{parent_id}").json()[0]["comment"] == "reply"
+
+
+def test_import_forums_requires_auth_and_known_format(client, user_headers):
+    files = {"file": ("forums.ndjson", _ndjson({"title": "F", "content": "c"}), "application/x-ndjson")}
+    assert client.post("/forums/import", files=files).status_code in (401, 403)
+    response = client.post("/forums/import", params={"format": "xml"}, files=files, headers=user_headers)
+    assert response.status_code == 400
+    response = client.post("/forums/import", files=files, headers=user_headers)
+    assert response.json()["inserted"] == 1
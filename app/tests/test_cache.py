@@ -0,0 +1,77 @@
+import time
+
+from fastapi import Request, Response
+
+from app.services.cache import MemoryCacheBackend, ResponseCache, response_cache
+
+
+def make_request(path="/posts"):
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+
+class TestMemoryCacheBackend:
+    def test_evicts_least_recently_used(self):
+        backend = MemoryCacheBackend(max_entries=2)
+        backend.set("a", 1, ttl=60)
+        backend.set("b", 2, ttl=60)
+        assert backend.get("a") == 1
+        backend.set("c", 3, ttl=60)
+        assert backend.get("b") is None
+        assert backend.get("a") == 1 and backend.get("c") == 3
+
+    def test_expires_entries(self):
+        backend = MemoryCacheBackend()
+        backend.set("a", 1, ttl=0.01)
+        time.sleep(0.02)
+        assert backend.get("a") is None
+
+    def test_delete_prefix(self):
+        backend = MemoryCacheBackend()
+        backend.set("post:1|/posts/1?", 1, ttl=60)
+        backend.set("post:10|/posts/10?", 2, ttl=60)
+        backend.delete_prefix("post:1|")
+        assert backend.get("post:1|/posts/1?") is None
+        assert backend.get("post:10|/posts/10?") == 2
+
+
+class TestResponseCache:
+    def test_store_skips_a_body_read_before_an_invalidation(self):
+        cache = ResponseCache(MemoryCacheBackend(), max_tags=1)
+        stale = make_request()
+        assert cache.lookup(stale, "posts") is None
+        cache.invalidate("posts")
+        cache.store(stale, Response(), "posts", ["old"])
+        assert cache.lookup(make_request(), "posts") is None
+
+        fresh = make_request()
+        cache.lookup(fresh, "posts")
+        cache.invalidate("post:1", "post:2")
+        cache.store(fresh, Response(), "posts", ["new"])
+        assert cache.lookup(make_request(), "posts") is None
+
+        current = make_request()
+        cache.lookup(current, "posts")
+        cache.store(current, Response(), "posts", ["new"])
+        assert cache.lookup(make_request(), "posts").body == b'["new"]'
+
+    def test_anonymous_reads_are_cached_and_invalidated_by_writes(self, client, user_headers):
+        forum = client.post("/forums", json={"title": "Hot forum", "content": "x"}, headers=user_headers).json()
+        client.get(f"/forums/{forum['id']}")
+        before = client.get("/health/cache").json()
+        assert client.get(f"/forums/{forum['id']}").json()["likes"] == 0
+        assert client.get("/health/cache").json()["hits"] == before["hits"] + 1
+
+        client.post(f"/forums/{forum['id']}/like", headers=user_headers)
+        assert client.get(f"/forums/{forum['id']}").json()["likes"] == 1
+
+    def test_signed_in_viewers_bypass_the_cache(self, client, user_headers):
+        before = response_cache.stats()
+        client.get("/forums", headers=user_headers)
+        after = response_cache.stats()
+        assert (after["hits"], after["misses"]) == (before["hits"], before["misses"])
+
+    def test_comment_thread_invalidated_by_new_comment(self, client, user_headers):
+        post = client.post("/posts", data={"title": "Thread cache", "content": "x"}, headers=user_headers).json()
+        assert client.get(f"/comments/post/{post['id']}").json() == []
+        client.post("/comments", json={"comment": "hi", "post_id": post["id"]}, headers=user_headers)
+        assert [c["comment"] for c in client.get(f"/comments/post/{post['id']}").json()] == ["hi"]
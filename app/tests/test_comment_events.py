@@ -0,0 +1,103 @@
+import asyncio
+import json
+import threading
+
+from app.services.comment_events import CommentEventBroker, comment_events, event_stream
+
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+class TestCommentEventBroker:
+    def test_delivers_events_published_from_other_threads(self):
+        broker = CommentEventBroker()
+
+        async def scenario():
+            subscription = broker.subscribe("post-comments:1")
+            publisher = threading.Thread(target=broker.publish, args=(["post-comments:1"], "created", {"id": "c1"}))
+            publisher.start()
+            batch = await subscription.next_batch(1)
+            publisher.join()
+            assert broker.publish(["post-comments:2"], "created", {"id": "c2"}) == 0
+            broker.unsubscribe(subscription)
+            return batch
+
+        events, lagged = asyncio.run(scenario())
+        assert [(event, json.loads(data)) for _, event, data in events] == [("created", {"id": "c1"})]
+        assert lagged is False
+        assert broker.stats()["subscribers"] == 0
+
+    def test_full_buffer_drops_oldest_and_flags_lag(self):
+        broker = CommentEventBroker(buffer_size=2)
+
+        async def scenario():
+            subscription = broker.subscribe("forum-comments:1")
+            for i in range(3):
+                broker.publish(["forum-comments:1"], "likes", {"likes": i})
+            return await subscription.next_batch(1)
+
+        events, lagged = asyncio.run(scenario())
+        assert [json.loads(data)["likes"] for _, _, data in events] == [1, 2]
+        assert lagged is True
+
+    def test_stream_sends_resync_after_overflow_and_unsubscribes(self):
+        broker = CommentEventBroker(buffer_size=1)
+        request = FakeRequest()
+
+        async def scenario():
+            stream = event_stream(broker, "post-comments:1", request, heartbeat=0.01)
+            assert (await stream.__anext__()).startswith("retry:")
+            broker.publish(["post-comments:1"], "created", {"id": "a"})
+            broker.publish(["post-comments:1"], "created", {"id": "b"})
+            chunk = await stream.__anext__()
+            assert await stream.__anext__() == ": keep-alive\n\n"
+            request.disconnected = True
+            assert [piece async for piece in stream] == []
+            return chunk
+
+        chunk = asyncio.run(scenario())
+        assert chunk.startswith("event: resync\n")
+        assert '"id":"b"' in chunk and '"id":"a"' not in chunk
+        assert broker.stats()["subscribers"] == 0
+
+
+class TestCommentStreams:
+    def test_comment_writes_are_published_to_the_thread(self, client, user_headers):
+        post_id = client.post("/posts", data={"title": "Live post", "content": "x"}, headers=user_headers).json()["id"]
+
+        async def scenario():
+            subscription = comment_events.subscribe(f"post-comments:{post_id}")
+            try:
+                created = await asyncio.to_thread(
+                    client.post, "/comments", json={"comment": "live", "post_id": post_id}, headers=user_headers
+                )
+                comment_id = created.json()["id"]
+                await asyncio.to_thread(client.post, f"/comments/{comment_id}/like", headers=user_headers)
+                await asyncio.to_thread(client.delete, f"/comments/{comment_id}", headers=user_headers)
+                events = []
+                while len(events) < 3:
+                    batch = await subscription.next_batch(1)
+                    assert batch is not None
+                    events.extend(batch[0])
+                return comment_id, events
+            finally:
+                comment_events.unsubscribe(subscription)
+
+        comment_id, events = asyncio.run(scenario())
+        assert [event for _, event, _ in events] == ["created", "likes", "deleted"]
+        assert [json.loads(data)["id"] for _, _, data in events] == [comment_id] * 3
+        assert json.loads(events[1][2])["likes"] == 1
+
+    def test_stream_endpoints_check_the_thread_and_capacity(self, client, user_headers, monkeypatch):
+        assert client.get("/comments/post/missing/stream").status_code == 404
+        assert client.get("/forums/missing/stream").status_code == 404
+        forum = {"title": "Full forum", "content": "x"}
+        forum_id = client.post("/forums", json=forum, headers=user_headers).json()["id"]
+        monkeypatch.setattr(comment_events, "max_subscribers", 0)
+        assert client.get(f"/forums/{forum_id}/stream").status_code == 503
+        assert client.get("/health/streams").json()["subscribers"] == 0
@@ -62,3 +62,204 @@ class TestComments:
             assert "content" in data
             assert "post_id" in data
             assert "author" in data
+
+    def test_comment_lists_resolve_liked_by_current_user(self, client, user_headers):
+        post = client.post("/posts", data={"title": "Commented", "content": "x"}, headers=user_headers).json()
+        first = client.post("/comments", json={"comment": "first", "post_id": post["id"]}, headers=user_headers).json()
+        body = {"comment": "reply", "post_id": post["id"], "parent_id": first["id"]}
+        reply = client.post("/comments", json=body, headers=user_headers).json()
+        client.post(f"/comments/{reply['id']}/like", headers=user_headers)
+
+        comments = client.get(f"/comments/post/{post['id']}", headers=user_headers).json()
+        assert {c["id"]: c["liked_by_current_user"] for c in comments} == {first["id"]: False, reply["id"]: True}
+        replies = client.get(f"/comments/post/{post['id']}/replies/{first['id']}", headers=user_headers).json()
+        assert [c["liked_by_current_user"] for c in replies] == [True]
+        anonymous = client.get(f"/comments/post/{post['id']}").json()
+        assert not any(c["liked_by_current_user"] for c in anonymous)
+
+    def test_comment_thread_conditional_get(self, client, user_headers):
+        post = client.post("/posts", data={"title": "Cached thread", "content": "x"}, headers=user_headers).json()
+        first = client.post("/comments", json={"comment": "first", "post_id": post["id"]}, headers=user_headers).json()
+        url = f"/comments/post/{post['id']}"
+
+        response = client.get(url, headers=user_headers)
+        etag = response.headers["ETag"]
+        assert client.get(url, headers={**user_headers, "If-None-Match": etag}).status_code == 304
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 200  # another viewer
+
+        client.post(f"/comments/{first['id']}/like", headers=user_headers)
+        liked = client.get(url, headers={**user_headers, "If-None-Match": etag})
+        assert liked.status_code == 200
+        assert liked.headers["ETag"] != etag
+
+        client.delete(f"/comments/{first['id']}", headers=user_headers)
+        emptied = client.get(url, headers={**user_headers, "If-None-Match": liked.headers["ETag"]})
+        assert emptied.status_code == 200
+        assert emptied.json() == []
+
+    def test_comment_tree_nests_and_paginates(self, client, user_headers):
+        post_id = client.post("/posts", data={"title": "Threaded", "content": "x"}, headers=user_headers).json()["id"]
+
+        def comment(text, parent_id=None):
+            body = {"comment": text, "post_id": post_id, "parent_id": parent_id}
+            return client.post("/comments", json=body, headers=user_headers).json()["id"]
+
+        first = comment("first")
+        second = comment("second")
+        replies = [comment(f"reply {i}", first) for i in range(3)]
+        comment("nested", replies[0])
+
+        page = client.get(f"/comments/post/{post_id}/tree", params={"limit": 1, "replies": 2})
+        assert page.status_code == 200
+        [root] = page.json()
+        assert root["id"] == first
+        assert root["reply_count"] == 3
+        assert [r["comment"] for r in root["replies"]] == ["reply 0", "reply 1"]
+        assert root["replies"][0]["replies"][0]["comment"] == "nested"
+        assert root["replies"][1]["reply_count"] == 0
+
+        rest = client.get(
+            f"/comments/post/{post_id}/tree", params={"limit": 1, "cursor": page.headers["X-Next-Cursor"]}
+        )
+        assert [c["id"] for c in rest.json()] == [second]
+        assert "X-Next-Cursor" not in rest.headers
+
+    def test_forum_comment_tree(self, client, user_headers):
+        forum = {"title": "Tree forum", "content": "x"}
+        forum_id = client.post("/forums", json=forum, headers=user_headers).json()["id"]
+        root = client.post(
+            f"/comments/forum/{forum_id}", json={"comment": "root", "forum_id": forum_id}, headers=user_headers
+        ).json()
+        client.post(
+            f"/comments/forum/{forum_id}", json={"comment": "reply", "forum_id": forum_id, "parent_id": root["id"]},
+            headers=user_headers
+        )
+        tree = client.get(f"/comments/forum/{forum_id}/tree", params={"replies": 0}).json()
+        assert [(c["comment"], c["reply_count"], c["replies"]) for c in tree] == [("root", 1, [])]
+
+    def test_delete_removes_whole_subtree_and_likes(self, client, user_headers):
+        from app.config.postgres_config import SessionLocal
+        from app.routers.comments.models import Comments, CommentLike
+
+        post_id = client.post("/posts", data={"title": "Pruned", "content": "x"}, headers=user_headers).json()["id"]
+        parent_id, ids = None, []
+        for depth in range(4):
+            body = {"comment": f"depth {depth}", "post_id": post_id, "parent_id": parent_id}
+            parent_id = client.post("/comments", json=body, headers=user_headers).json()["id"]
+            ids.append(parent_id)
+        client.post(f"/comments/{ids[-1]}/like", headers=user_headers)
+        kept = {"comment": "kept", "post_id": post_id}
+        sibling = client.post("/comments", json=kept, headers=user_headers).json()["id"]
+
+        response = client.delete(f"/comments/{ids[1]}", headers=user_headers)
+        assert response.status_code == 200
+        db = SessionLocal()
+        try:
+            remaining = {row[0] for row in db.query(Comments.id).filter(Comments.post_id == post_id)}
+            assert remaining == {ids[0], sibling}
+            assert db.query(CommentLike).filter(CommentLike.comment_id == ids[-1]).count() == 0
+        finally:
+            db.close()
+
+    def test_delete_terminates_on_a_parent_cycle(self, client, user_headers):
+        from app.config.postgres_config import SessionLocal
+        from app.routers.comments.models import Comments
+
+        post_id = client.post("/posts", data={"title": "Cyclic", "content": "x"}, headers=user_headers).json()["id"]
+        first = client.post("/comments", json={"comment": "a", "post_id": post_id}, headers=user_headers).json()["id"]
+        body = {"comment": "b", "post_id": post_id, "parent_id": first}
+        second = client.post("/comments", json=body, headers=user_headers).json()["id"]
+        db = SessionLocal()
+        try:
+            db.query(Comments).filter(Comments.id == first).update({Comments.parent_id: second})
+            db.commit()
+            assert client.delete(f"/comments/{first}", headers=user_headers).status_code == 200
+            assert db.query(Comments).filter(Comments.post_id == post_id).count() == 0
+        finally:
+            db.close()
+
+    def test_reply_parent_must_exist_on_the_same_thread(self, client, user_headers):
+        def post():
+            return client.post("/posts", data={"title": "Thread", "content": "x"}, headers=user_headers).json()["id"]
+
+        post_id, other_post_id = post(), post()
+        parent = client.post("/comments", json={"comment": "a", "post_id": post_id}, headers=user_headers).json()["id"]
+
+        elsewhere = {"comment": "b", "post_id": other_post_id, "parent_id": parent}
+        response = client.post("/comments", json=elsewhere, headers=user_headers)
+        assert response.status_code == 400
+        assert "not on the same post or forum" in response.json()["detail"]
+        missing = {"comment": "b", "post_id": post_id, "parent_id": "nope"}
+        assert client.post("/comments", json=missing, headers=user_headers).status_code == 400
+        assert client.get(f"/comments/post/{other_post_id}").json() == []
+
+    def test_main_comments_include_reply_counts(self, client, user_headers):
+        post_id = client.post("/posts", data={"title": "Counted", "content": "x"}, headers=user_headers).json()["id"]
+        busy = client.post("/comments", json={"comment": "busy", "post_id": post_id}, headers=user_headers).json()["id"]
+        client.post("/comments", json={"comment": "quiet", "post_id": post_id}, headers=user_headers)
+        for i in range(2):
+            reply = {"comment": f"r{i}", "post_id": post_id, "parent_id": busy}
+            client.post("/comments", json=reply, headers=user_headers)
+
+        main = client.get(f"/comments/post/{post_id}/main").json()
+        assert {c["comment"]: c["reply_count"] for c in main} == {"busy": 2, "quiet": 0}
+
+    def test_comment_listings_paginate_with_cursor_and_order(self, client, user_headers):
+        post_id = client.post("/posts", data={"title": "Paged", "content": "x"}, headers=user_headers).json()["id"]
+        texts = [f"c{i}" for i in range(5)]
+        for text in texts:
+            client.post("/comments", json={"comment": text, "post_id": post_id}, headers=user_headers)
+
+        for url in (f"/comments/post/{post_id}", f"/comments/post/{post_id}/main"):
+            seen, cursor = [], None
+            while True:
+                params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+                response = client.get(url, params=params)
+                assert response.status_code == 200
+                seen += [c["comment"] for c in response.json()]
+                cursor = response.headers.get("X-Next-Cursor")
+                if not cursor:
+                    break
+            assert seen == texts
+
+        newest = client.get(f"/comments/post/{post_id}", params={"limit": 2, "order": "desc"}).json()
+        assert [c["comment"] for c in newest] == ["c4", "c3"]
+        assert client.get(f"/comments/post/{post_id}", params={"order": "sideways"}).status_code == 422
+
+    def test_search_comments_ranks_scopes_and_paginates(self, client, user_headers, other_user_headers):
+        post_id = client.post("/posts", data={"title": "Searched", "content": "x"}, headers=user_headers).json()["id"]
+        forum = {"title": "Searched forum", "content": "x"}
+        forum_id = client.post("/forums", json=forum, headers=user_headers).json()["id"]
+        word = "zebrafish"
+
+        def comment(text, headers=user_headers):
+            return client.post("/comments", json={"comment": text, "post_id": post_id}, headers=headers).json()
+
+        strong = comment(f"{word} {word} {word}")["id"]
+        weak = comment(f"one {word} among many other words here")["id"]
+        theirs = comment(f"{word} too", other_user_headers)
+        on_forum = client.post(
+            f"/forums/{forum_id}/comments", json={"comment": word, "forum_id": forum_id}, headers=user_headers
+        ).json()["id"]
+        comment("unrelated")
+
+        ranked = client.get("/comments/search", params={"q": word[:6], "post_id": post_id}).json()
+        assert [c["id"] for c in ranked][0] == strong
+        assert {c["id"] for c in ranked} == {strong, weak, theirs["id"]}
+        assert ranked[0]["score"] >= ranked[-1]["score"]
+
+        seen, cursor = [], None
+        while True:
+            params = {"q": word, "limit": 1, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/comments/search", params=params)
+            seen += [c["id"] for c in response.json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        assert set(seen) >= {strong, weak, theirs["id"], on_forum} and len(seen) == len(set(seen))
+
+        in_forum = client.get("/comments/search", params={"q": word, "forum_id": forum_id}).json()
+        assert [c["id"] for c in in_forum] == [on_forum]
+        by_user = client.get("/comments/search", params={"q": word, "user_id": theirs["user_id"]}).json()
+        assert [c["id"] for c in by_user] == [theirs["id"]]
+        assert client.get("/comments/search", params={"q": "!!"}).json() == []
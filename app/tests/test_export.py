@@ -0,0 +1,46 @@
+import csv
+import io
+import json
+
+import shortuuid
+
+
+def test_export_posts_ndjson_round_trips_stats(client, user_headers):
+    title = f"Exported {shortuuid.uuid()[:8]}"
+    post = {"title": title, "content": "x", "stats": json.dumps({"speed": 8})}
+    client.post("/posts", data=post, headers=user_headers)
+    response = client.get("/posts/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert 'filename="posts.ndjson"' in response.headers["content-disposition"]
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    row = next(r for r in rows if r["title"] == title)
+    assert row["stats"] == {"speed": 8}
+    assert set(row) == {"id", "title", "content", "image_url", "image_status", "likes", "author", "timestamp", "stats"}
+
+
+def test_export_csv_has_header_and_encoded_json(client, user_headers):
+    title = f"Exported csv {shortuuid.uuid()[:8]}"
+    client.post("/posts", data={"title": title, "content": "x", "stats": json.dumps({"spin": 6})}, headers=user_headers)
+    response = client.get("/posts/export", params={"format": "csv"})
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    row = next(r for r in rows if r["title"] == title)
+    assert json.loads(row["stats"]) == {"spin": 6.0}
+
+
+def test_export_users_omits_passwords(client, user_headers):
+    response = client.get("/users/export", params={"format": "csv"}, headers=user_headers)
+    header = response.text.splitlines()[0]
+    assert header == "id,username,email,timestamp"
+    assert client.get("/users/export", params={"format": "xml"}, headers=user_headers).status_code == 400
+
+
+def test_export_users_requires_authentication(client):
+    assert client.get("/users/export").status_code in (401, 403)
+
+
+def test_export_comments_and_forum_comments(client):
+    assert client.get("/comments/export").status_code == 200
+    assert client.get("/forums/export", params={"format": "csv"}).text.startswith("id,title,content")
+    assert client.get("/forums/comments/export", params={"format": "csv"}).text.startswith("id,comment,forum_id")
@@ -50,4 +50,119 @@ class TestForums:
             assert isinstance(data, dict)
             assert "id" in data
             assert "title" in data
-            assert "content" in data 
\ No newline at end of file
+            assert "content" in data 
+
+
+class TestForumActivity:
+    def test_forum_lists_resolve_liked_by_current_user(self, client, user_headers):
+        forum = client.post("/forums", json={"title": "Liked forum", "content": "x"}, headers=user_headers).json()
+        client.post(f"/forums/{forum['id']}/like", headers=user_headers)
+        forums = {f["id"]: f for f in client.get("/forums", headers=user_headers).json()}
+        assert forums[forum["id"]]["liked_by_current_user"] is True
+        anonymous = {f["id"]: f for f in client.get("/forums").json()}
+        assert anonymous[forum["id"]]["liked_by_current_user"] is False
+
+        url = f"/forums/{forum['id']}/comments"
+        first = client.post(url, json={"comment": "a", "forum_id": forum["id"]}, headers=user_headers).json()
+        second = client.post(url, json={"comment": "b", "forum_id": forum["id"]}, headers=user_headers).json()
+        client.post(f"/forums/{forum['id']}/comments/{first['id']}/like", headers=user_headers)
+        comments = client.get(f"/forums/{forum['id']}/comments", headers=user_headers).json()
+        assert {c["id"]: c["liked_by_current_user"] for c in comments} == {first["id"]: True, second["id"]: False}
+
+    def test_get_forum_conditional_get(self, client, user_headers):
+        forum = client.post("/forums", json={"title": "Cached forum", "content": "x"}, headers=user_headers).json()
+        response = client.get(f"/forums/{forum['id']}")
+        etag, last_modified = response.headers["ETag"], response.headers["Last-Modified"]
+        assert client.get(f"/forums/{forum['id']}", headers={"If-None-Match": etag}).status_code == 304
+        assert client.get(f"/forums/{forum['id']}", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+        client.post(f"/forums/{forum['id']}/like", headers=user_headers)
+        changed = client.get(f"/forums/{forum['id']}", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.json()["likes"] == 1
+
+    def test_delete_forum_comment_removes_nested_replies(self, client, user_headers):
+        forum = {"title": "Pruned forum", "content": "x"}
+        forum_id = client.post("/forums", json=forum, headers=user_headers).json()["id"]
+        parent_id, ids = None, []
+        for depth in range(3):
+            body = {"comment": f"depth {depth}", "forum_id": forum_id, "parent_id": parent_id}
+            parent_id = client.post(f"/forums/{forum_id}/comments", json=body, headers=user_headers).json()["id"]
+            ids.append(parent_id)
+        client.post(f"/forums/{forum_id}/comments/{ids[-1]}/like", headers=user_headers)
+
+        response = client.delete(f"/forums/{forum_id}/comments/{ids[0]}", headers=user_headers)
+        assert response.status_code == 200
+        assert client.get(f"/forums/{forum_id}/comments").json() == []
+
+    def test_main_forum_comments_include_reply_counts(self, client, user_headers):
+        forum = {"title": "Counted forum", "content": "x"}
+        forum_id = client.post("/forums", json=forum, headers=user_headers).json()["id"]
+        url = f"/forums/{forum_id}/comments"
+        root = client.post(url, json={"comment": "root", "forum_id": forum_id}, headers=user_headers).json()["id"]
+        client.post(url, json={"comment": "reply", "forum_id": forum_id, "parent_id": root}, headers=user_headers)
+
+        for main_url in (f"{url}/main", f"/forums/forum/{forum_id}/comments/main"):
+            assert [(c["comment"], c["reply_count"]) for c in client.get(main_url).json()] == [("root", 1)]
+
+    def test_forum_comment_listings_paginate(self, client, user_headers):
+        forum = {"title": "Paged forum", "content": "x"}
+        forum_id = client.post("/forums", json=forum, headers=user_headers).json()["id"]
+        for i in range(3):
+            comment = {"comment": f"f{i}", "forum_id": forum_id}
+            client.post(f"/forums/{forum_id}/comments", json=comment, headers=user_headers)
+
+        first = client.get(f"/forums/{forum_id}/comments", params={"limit": 2})
+        assert [c["comment"] for c in first.json()] == ["f0", "f1"]
+        rest = client.get(f"/forums/{forum_id}/comments", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+        assert [c["comment"] for c in rest.json()] == ["f2"]
+        assert client.get("/forums/comments", params={"limit": 1}).status_code == 200
+
+    def test_forum_and_post_comments_share_one_engine(self, client, user_headers):
+        forum = {"title": "Shared forum", "content": "x"}
+        forum_id = client.post("/forums", json=forum, headers=user_headers).json()["id"]
+        post = {"title": "Shared post", "content": "x"}
+        post_id = client.post("/posts", data=post, headers=user_headers).json()["id"]
+        on_forum = client.post(
+            f"/forums/{forum_id}/comments", json={"comment": "f", "forum_id": forum_id}, headers=user_headers
+        ).json()
+        on_post = client.post("/comments", json={"comment": "p", "post_id": post_id}, headers=user_headers).json()
+
+        assert [c["id"] for c in client.get(f"/comments/forum/{forum_id}").json()] == [on_forum["id"]]
+        assert client.get(f"/comments/{on_forum['id']}").json()["forum_id"] == forum_id
+        assert client.post(f"/comments/{on_forum['id']}/like", headers=user_headers).json()["likes"] == 1
+        listed = client.get(f"/forums/{forum_id}/comments", headers=user_headers).json()
+        assert listed[0]["liked_by_current_user"] is True
+        # The forum-side routes never reach comments on posts
+        assert client.get(f"/forums/comments/{on_post['id']}").status_code == 404
+        assert client.delete(f"/forums/comments/{on_post['id']}", headers=user_headers).status_code == 404
+        assert on_post["id"] not in {c["id"] for c in client.get("/forums/comments", params={"limit": 200}).json()}
+
+    def test_forum_like_routes_only_reach_comments_on_that_forum(self, client, user_headers):
+        forum_id, other_id = (
+            client.post("/forums", json={"title": title, "content": "x"}, headers=user_headers).json()["id"]
+            for title in ("Liked forum", "Other forum")
+        )
+        post_id = client.post("/posts", data={"title": "Liked post", "content": "x"}, headers=user_headers).json()["id"]
+        on_forum = client.post(
+            f"/forums/{forum_id}/comments", json={"comment": "f", "forum_id": forum_id}, headers=user_headers
+        ).json()["id"]
+        on_post = client.post("/comments", json={"comment": "p", "post_id": post_id}, headers=user_headers).json()["id"]
+
+        for path in (f"/forums/{forum_id}/comments/{on_post}/like", f"/forums/comments/{on_post}/like"):
+            assert client.post(path, headers=user_headers).status_code == 404
+            assert client.delete(path, headers=user_headers).status_code == 404
+        assert client.get(f"/forums/comments/{on_post}/likes").status_code == 404
+        assert client.post(f"/forums/{other_id}/comments/{on_forum}/like", headers=user_headers).status_code == 404
+        assert client.get(f"/comments/{on_post}").json()["likes"] == 0
+
+        assert client.post(f"/forums/{forum_id}/comments/{on_forum}/like", headers=user_headers).json()["likes"] == 1
+        assert client.get(f"/forums/comments/{on_forum}/likes").json()["total"] == 1
+
+    def test_get_forums_include_comment_counts(self, client, user_headers):
+        forum = {"title": "Chatty forum", "content": "x"}
+        forum_id = client.post("/forums", json=forum, headers=user_headers).json()["id"]
+        counts = lambda: {f["id"]: f["comment_count"] for f in client.get("/forums").json()}
+        assert counts()[forum_id] == 0
+        client.post(f"/forums/{forum_id}/comments", json={"comment": "a", "forum_id": forum_id}, headers=user_headers)
+        assert counts()[forum_id] == 1
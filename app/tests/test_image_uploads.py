@@ -0,0 +1,130 @@
+import hashlib
+import io
+import os
+
+
+from app.config.postgres_config import SessionLocal
+from app.routers.posts.models import ImageBlob, Posts
+from app.services.image_uploads import ImageUploadQueue, image_upload_queue
+from app.services.uploads import SpooledImage
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+def spooled_image(data=None):
+    data = data or PNG + os.urandom(16)
+    return SpooledImage(io.BytesIO(data), "image/png", len(data), hashlib.sha256(data).hexdigest())
+
+
+def create_post(client, headers):
+    return client.post("/posts", data={"title": "Queued", "content": "x"}, headers=headers).json()["id"]
+
+
+def image_state(post_id):
+    db = SessionLocal()
+    try:
+        return db.query(Posts.image_status, Posts.image_url).filter(Posts.id == post_id).one()
+    finally:
+        db.close()
+
+
+class TestImageUploadQueue:
+    def test_retries_then_marks_post_ready(self, client, user_headers):
+        calls = []
+
+        def flaky_upload(file, filename):
+            calls.append(file.read())
+            if len(calls) < 2:
+                raise RuntimeError("CDN timeout")
+            return f"https://cdn.example.com/{filename}"
+
+        queue = ImageUploadQueue(upload=flaky_upload, max_workers=1, backoff=0)
+        post_id = create_post(client, user_headers)
+        image = spooled_image()
+        assert queue.reserve()
+        assert queue.submit(post_id, image).result(timeout=5) == "ready"
+        assert image_state(post_id) == ("ready", f"https://cdn.example.com/{image.content_key}")
+        assert len(calls) == 2 and calls[0] == calls[1]
+        assert image.file.closed
+        queue.shutdown()
+
+    def test_marks_post_failed_after_last_attempt(self, client, user_headers):
+        def broken_upload(file, filename):
+            raise RuntimeError("CDN down")
+
+        queue = ImageUploadQueue(upload=broken_upload, max_workers=1, attempts=2, backoff=0)
+        post_id = create_post(client, user_headers)
+        assert queue.reserve()
+        assert queue.submit(post_id, spooled_image()).result(timeout=5) == "failed"
+        assert image_state(post_id)[0] == "failed"
+        queue.shutdown()
+
+    def test_marks_post_failed_when_storing_raises(self, client, user_headers, monkeypatch):
+        def broken_store(db, post_id, image):
+            raise RuntimeError("database unavailable")
+
+        queue = ImageUploadQueue(max_workers=1, max_pending=1, backoff=0)
+        monkeypatch.setattr(queue, "_store", broken_store)
+        post_id = create_post(client, user_headers)
+        image = spooled_image()
+        assert queue.reserve()
+        assert queue.submit(post_id, image).result(timeout=5) == "failed"
+        assert image_state(post_id)[0] == "failed"
+        assert image.file.closed
+        assert queue.reserve()
+        queue.shutdown()
+
+    def test_reserve_is_bounded(self):
+        queue = ImageUploadQueue(max_pending=1)
+        assert queue.reserve()
+        assert not queue.reserve()
+        queue.release()
+        assert queue.reserve()
+
+    def test_create_post_returns_pending_image(self, client, user_headers, monkeypatch):
+        monkeypatch.setattr(image_upload_queue, "_upload", lambda file, filename: f"https://cdn.example.com/{filename}")
+        response = client.post(
+            "/posts",
+            data={"title": "With image", "content": "x"},
+            files={"image": ("photo.png", io.BytesIO(PNG + os.urandom(16)), "image/png")},
+            headers=user_headers,
+        )
+        assert response.status_code == 201
+        assert response.json()["image_status"] == "pending"
+
+    def test_identical_images_are_stored_once(self, client, user_headers):
+        data = PNG + os.urandom(32)
+        uploads = []
+
+        def upload(file, key):
+            uploads.append(key)
+            return f"https://cdn.example.com/{key}"
+
+        queue = ImageUploadQueue(upload=upload, max_workers=1, backoff=0)
+        first_id = create_post(client, user_headers)
+        assert queue.reserve()
+        queue.submit(first_id, spooled_image(data)).result(timeout=5)
+        queue.shutdown()
+
+        second = client.post(
+            "/posts",
+            data={"title": "Same image", "content": "x"},
+            files={"image": ("other-name.png", io.BytesIO(data), "image/png")},
+            headers=user_headers,
+        ).json()
+        assert second["image_status"] == "ready"
+        assert second["image_url"] == image_state(first_id)[1]
+        assert len(uploads) == 1
+
+        sha256 = hashlib.sha256(data).hexdigest()
+        db = SessionLocal()
+        try:
+            assert db.get(ImageBlob, sha256).ref_count == 2
+            client.delete(f"/posts/{first_id}", headers=user_headers)
+            db.expire_all()
+            assert db.get(ImageBlob, sha256).ref_count == 1
+            client.delete(f"/posts/{second['id']}", headers=user_headers)
+            db.expire_all()
+            assert db.get(ImageBlob, sha256) is None
+        finally:
+            db.close()
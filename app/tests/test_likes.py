@@ -0,0 +1,101 @@
+from app.config.postgres_config import SessionLocal
+from app.routers.forums.models import Forums, ForumLike
+from app.routers.posts.models import Posts
+from app.routers.users.models import Users
+from app.services.likes import reconcile_like_counts, set_like
+
+
+class TestReconcileLikeCounts:
+    def test_corrects_drifted_counters(self, client, user_headers):
+        post_id = client.post("/posts", data={"title": "Drifted", "content": "x"}, headers=user_headers).json()["id"]
+        client.post(f"/posts/{post_id}/like", headers=user_headers)
+
+        db = SessionLocal()
+        try:
+            db.query(Posts).filter(Posts.id == post_id).update({Posts.likes: 5})
+            db.commit()
+            report = reconcile_like_counts(db)
+            assert report["posts"]["rows"] >= 1
+            assert report["posts"]["drift"] >= 4
+            assert db.query(Posts.likes).filter(Posts.id == post_id).scalar() == 1
+            assert reconcile_like_counts(db)["posts"] == {"rows": 0, "drift": 0}
+        finally:
+            db.close()
+
+
+class TestLikersPage:
+    def test_pages_newest_first_with_counter_total(self, client, user_headers, other_user_headers):
+        post_id = client.post("/posts", data={"title": "Liked", "content": "x"}, headers=user_headers).json()["id"]
+        client.post(f"/posts/{post_id}/like", headers=user_headers)
+        client.post(f"/posts/{post_id}/like", headers=other_user_headers)
+
+        first = client.get(f"/posts/{post_id}/likes", params={"limit": 1, "include_usernames": True})
+        assert first.status_code == 200
+        page = first.json()
+        assert page["total"] == 2
+        assert len(page["likes"]) == 1
+        assert page["likes"][0]["username"]
+        assert first.headers["X-Next-Cursor"] == page["next_cursor"]
+
+        second = client.get(f"/posts/{post_id}/likes", params={"limit": 1, "cursor": page["next_cursor"]}).json()
+        assert second["next_cursor"] is None
+        assert second["likes"][0]["username"] is None
+        assert second["likes"][0]["user_id"] != page["likes"][0]["user_id"]
+        assert second["likes"][0]["created_at"] <= page["likes"][0]["created_at"]
+
+    def test_forum_and_comment_likers(self, client, user_headers):
+        forum = {"title": "Liked forum", "content": "x"}
+        forum_id = client.post("/forums", json=forum, headers=user_headers).json()["id"]
+        client.post(f"/forums/{forum_id}/like", headers=user_headers)
+        assert client.get(f"/forums/{forum_id}/likes").json()["total"] == 1
+
+        post_id = client.post("/posts", data={"title": "Commented", "content": "x"}, headers=user_headers).json()["id"]
+        comment = {"comment": "hi", "post_id": post_id}
+        comment_id = client.post("/comments", json=comment, headers=user_headers).json()["id"]
+        client.post(f"/comments/{comment_id}/like", headers=user_headers)
+        likers = client.get(f"/comments/{comment_id}/likes").json()
+        assert likers["total"] == 1 and len(likers["likes"]) == 1
+
+        assert client.get("/comments/missing/likes").status_code == 404
+        assert client.get("/forums/comments/missing/likes").status_code == 404
+
+
+class TestSetLike:
+    def test_like_rows_stay_unique_and_counter_follows(self, client, user_headers):
+        forum_id = client.post("/forums", json={"title": "Spammed", "content": "x"}, headers=user_headers).json()["id"]
+        db = SessionLocal()
+        try:
+            author = db.query(Forums.author).filter(Forums.id == forum_id).scalar()
+            user_id = db.query(Users.id).filter(Users.username == author).scalar()
+
+            first = set_like(db, "forums", forum_id, user_id, liked=True)
+            again = set_like(db, "forums", forum_id, user_id, liked=True)
+            db.commit()
+            assert (first.changed, first.liked, first.target.likes) == (True, True, 1)
+            assert (again.changed, again.liked, again.target.likes) == (False, True, 1)
+            assert db.query(ForumLike).filter(ForumLike.forum_id == forum_id).count() == 1
+
+            toggled = set_like(db, "forums", forum_id, user_id)
+            db.commit()
+            assert (toggled.changed, toggled.liked) == (True, False)
+            assert db.query(Forums.likes).filter(Forums.id == forum_id).scalar() == 0
+            assert set_like(db, "forums", "missing", user_id) is None
+        finally:
+            db.close()
+
+    def test_toggle_endpoints_report_state(self, client, user_headers):
+        post_id = client.post("/posts", data={"title": "Toggled", "content": "x"}, headers=user_headers).json()["id"]
+        comment = {"comment": "c", "post_id": post_id}
+        comment_id = client.post("/comments", json=comment, headers=user_headers).json()["id"]
+
+        liked = client.post(f"/comments/{comment_id}/like", headers=user_headers).json()
+        assert (liked["liked_by_current_user"], liked["likes"]) == (True, 1)
+        unliked = client.post(f"/comments/{comment_id}/like", headers=user_headers).json()
+        assert (unliked["liked_by_current_user"], unliked["likes"]) == (False, 0)
+        still = client.delete(f"/comments/{comment_id}/like", headers=user_headers).json()
+        assert (still["liked_by_current_user"], still["likes"]) == (False, 0)
+
+        assert client.post(f"/posts/{post_id}/like", headers=user_headers).status_code == 204
+        assert client.post(f"/posts/{post_id}/like", headers=user_headers).status_code == 400
+        assert client.delete(f"/posts/{post_id}/like", headers=user_headers).status_code == 204
+        assert client.delete(f"/posts/{post_id}/like", headers=user_headers).status_code == 400
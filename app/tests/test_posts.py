@@ -1,4 +1,6 @@
 import pytest
+import json
+import shortuuid
 from fastapi import status
 
 class TestPosts:
@@ -76,3 +78,180 @@ class TestPosts:
             assert "title" in data
             assert "content" in data
             assert "author" in data
+
+    def test_get_posts_keyset_pagination(self, client, user_headers):
+        marker = f"paged{shortuuid.uuid()[:8]}"
+        for i in range(3):
+            client.post("/posts", data={"title": f"{marker} {i}", "content": "content"}, headers=user_headers)
+        first = client.get("/posts", params={"search": marker, "sort": "title", "limit": 2})
+        assert first.status_code == status.HTTP_200_OK
+        assert [p["title"] for p in first.json()] == [f"{marker} 0", f"{marker} 1"]
+        cursor = first.headers["X-Next-Cursor"]
+        second = client.get("/posts", params={"search": marker, "sort": "title", "limit": 2, "cursor": cursor})
+        assert [p["title"] for p in second.json()] == [f"{marker} 2"]
+        assert "X-Next-Cursor" not in second.headers
+
+    def test_get_posts_most_liked_sort(self, client, user_headers):
+        marker = f"liked{shortuuid.uuid()[:8]}"
+        ids = [
+            client.post(
+                "/posts", data={"title": f"{marker} {i}", "content": "content"}, headers=user_headers
+            ).json()["id"]
+            for i in range(2)
+        ]
+        client.post(f"/posts/{ids[1]}/like", headers=user_headers)
+        response = client.get("/posts", params={"search": marker, "sort": "most_liked"})
+        data = response.json()
+        assert [p["id"] for p in data] == [ids[1], ids[0]]
+        assert data[0]["likes"] == 1
+
+    def test_get_posts_invalid_cursor(self, client):
+        response = client.get("/posts", params={"cursor": "not-a-cursor"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_get_posts_invalid_sort(self, client):
+        response = client.get("/posts", params={"sort": "random"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_get_posts_stat_filters_and_sort(self, client, user_headers):
+        marker = f"stats{shortuuid.uuid()[:8]}"
+        created = {}
+        for name, stats in {
+            "fast": {"speed": 9.5, "control": 8, "spin": 7},
+            "spinny": {"speed": 9, "control": 8.5, "spin": 9.5},
+            "slow": {"speed": 6, "control": 9, "spin": 10},
+        }.items():
+            response = client.post(
+                "/posts",
+                data={"title": f"{marker} {name}", "content": "blade", "stats": json.dumps(stats)},
+                headers=user_headers,
+            )
+            created[name] = response.json()["id"]
+        response = client.get("/posts", params={
+            "search": marker, "stat": ["speed:9..", "control:8..10"], "sort": "stat:spin"
+        })
+        assert response.status_code == status.HTTP_200_OK
+        assert [p["id"] for p in response.json()] == [created["spinny"], created["fast"]]
+
+        exact = client.get("/posts", params={"search": marker, "stat": "control:9"})
+        assert [p["id"] for p in exact.json()] == [created["slow"]]
+
+    def test_get_posts_invalid_stat_filter(self, client):
+        response = client.get("/posts", params={"stat": "speed"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_create_post_rejects_out_of_range_stats(self, client, user_headers):
+        response = client.post(
+            "/posts",
+            data={"title": "Bad stats", "content": "x", "stats": json.dumps({"speed": 11})},
+            headers=user_headers,
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_get_similar_posts(self, client, user_headers):
+        a, b = f"a{shortuuid.uuid()[:8]}", f"b{shortuuid.uuid()[:8]}"
+        client.get("/posts/fake-id/similar")  # make sure the index is built before the posts below exist
+        ids = {}
+        for name, stats in {
+            "base": {a: 8, b: 8},
+            "close": {a: 8.5, b: 8},
+            "far": {a: 5, b: 10},
+        }.items():
+            response = client.post(
+                "/posts", data={"title": name, "content": "x", "stats": json.dumps(stats)}, headers=user_headers
+            )
+            ids[name] = response.json()["id"]
+        response = client.get(f"/posts/{ids['base']}/similar", params={"k": 2})
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [p["id"] for p in data] == [ids["close"], ids["far"]]
+        assert data[0]["distance"] == pytest.approx(0.5)
+
+        client.delete(f"/posts/{ids['close']}", headers=user_headers)
+        response = client.get(f"/posts/{ids['base']}/similar", params={"k": 2, "metric": "cosine"})
+        assert [p["id"] for p in response.json()] == [ids["far"]]
+
+    def test_get_similar_posts_not_found(self, client):
+        response = client.get("/posts/fake-id/similar")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_get_similar_posts_invalid_metric(self, client):
+        response = client.get("/posts/fake-id/similar", params={"metric": "manhattan"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_get_posts_resolves_liked_by_current_user(self, client, user_headers, other_user_headers):
+        marker = f"mine{shortuuid.uuid()[:8]}"
+        ids = [
+            client.post("/posts", data={"title": f"{marker} {i}", "content": "x"}, headers=user_headers).json()["id"]
+            for i in range(2)
+        ]
+        client.post(f"/posts/{ids[0]}/like", headers=user_headers)
+        posts = client.get("/posts", params={"search": marker}, headers=user_headers).json()
+        liked = {p["id"]: p["likedByCurrentUser"] for p in posts}
+        assert liked == {ids[0]: True, ids[1]: False}
+        other = client.get("/posts", params={"search": marker}, headers=other_user_headers).json()
+        assert not any(p["likedByCurrentUser"] for p in other)
+        anonymous = client.get("/posts", params={"search": marker}).json()
+        assert not any(p["likedByCurrentUser"] for p in anonymous)
+
+    def test_like_counter_is_maintained(self, client, user_headers, other_user_headers):
+        post_id = client.post("/posts", data={"title": "Counted", "content": "x"}, headers=user_headers).json()["id"]
+        client.post(f"/posts/{post_id}/like", headers=user_headers)
+        client.post(f"/posts/{post_id}/like", headers=other_user_headers)
+        assert client.get(f"/posts/{post_id}").json()["likes"] == 2
+        client.delete(f"/posts/{post_id}/like", headers=user_headers)
+        assert client.get(f"/posts/{post_id}").json()["likes"] == 1
+
+    def test_get_posts_include_comment_counts(self, client, user_headers):
+        marker = f"talk{shortuuid.uuid()[:8]}"
+        busy, quiet = [
+            client.post("/posts", data={"title": f"{marker} {i}", "content": "x"}, headers=user_headers).json()["id"]
+            for i in range(2)
+        ]
+        counts = lambda: {p["id"]: p["comment_count"] for p in client.get("/posts", params={"search": marker}).json()}
+        assert counts() == {busy: 0, quiet: 0}
+
+        first = client.post("/comments", json={"comment": "a", "post_id": busy}, headers=user_headers).json()["id"]
+        client.post("/comments", json={"comment": "b", "post_id": busy, "parent_id": first}, headers=user_headers)
+        assert counts() == {busy: 2, quiet: 0}
+        client.delete(f"/comments/{first}", headers=user_headers)
+        assert counts() == {busy: 0, quiet: 0}
+
+    def test_get_posts_conditional_get(self, client, user_headers):
+        post = {"title": "Cached post", "content": "x"}
+        post_id = client.post("/posts", data=post, headers=user_headers).json()["id"]
+        response = client.get("/posts", params={"limit": 5})
+        etag = response.headers["ETag"]
+        assert client.get("/posts", params={"limit": 5}, headers={"If-None-Match": etag}).status_code == 304
+        assert client.get("/posts", params={"limit": 6}, headers={"If-None-Match": etag}).status_code == 200
+
+        client.post(f"/posts/{post_id}/like", headers=user_headers)
+        assert client.get("/posts", params={"limit": 5}, headers={"If-None-Match": etag}).status_code == 200
+
+    def test_compare_posts_aligns_stats(self, client, user_headers):
+        def create(stats):
+            return client.post(
+                "/posts", data={"title": "Compared", "content": "x", "stats": json.dumps(stats)}, headers=user_headers
+            ).json()["id"]
+
+        a = create({"speed": 9, "spin": 7})
+        b = create({"speed": 8, "control": 6})
+        c = create({"speed": 9})
+        response = client.get("/posts/compare", params={"ids": f"{a},{b},{c}"})
+        assert response.status_code == 200
+        body = response.json()
+        assert [p["id"] for p in body["posts"]] == [a, b, c]
+        stats = {s["stat"]: s for s in body["stats"]}
+        assert list(stats) == ["control", "speed", "spin"]
+        assert stats["speed"]["values"] == [9, 8, 9]
+        assert stats["speed"]["deltas"] == [0, -1, 0]
+        assert stats["speed"]["ranks"] == [1, 3, 1]
+        assert stats["speed"]["best_post_id"] == a
+        assert stats["control"]["values"] == [None, 6, None]
+        assert stats["control"]["ranks"] == [None, 1, None]
+        assert stats["control"]["best_post_id"] == b
+
+    def test_compare_posts_validation(self, client, user_headers):
+        post_id = client.post("/posts", data={"title": "Alone", "content": "x"}, headers=user_headers).json()["id"]
+        assert client.get("/posts/compare", params={"ids": post_id}).status_code == 400
+        assert client.get("/posts/compare", params={"ids": f"{post_id},missing"}).status_code == 404
@@ -0,0 +1,63 @@
+import pytest
+import shortuuid
+from fastapi import status
+
+class TestSearch:
+    def test_search_requires_query(self, client):
+        response = client.get("/search")
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_search_invalid_type(self, client):
+        response = client.get("/search", params={"q": "blade", "type": "users"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_search_without_terms_returns_empty(self, client):
+        response = client.get("/search", params={"q": "!!!"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == []
+
+    def test_search_posts_and_forums_ranked(self, client, user_headers):
+        word = f"zq{shortuuid.uuid()[:8].lower()}"
+        in_title = client.post(
+            "/posts", data={"title": f"{word} blade", "content": "fast"}, headers=user_headers
+        ).json()
+        in_content = client.post(
+            "/posts", data={"title": "Rubber", "content": f"pairs well with {word}"}, headers=user_headers
+        ).json()
+        forum = client.post(
+            "/forums", json={"title": f"Thoughts on {word}", "content": "discuss"}, headers=user_headers
+        ).json()
+
+        response = client.get("/search", params={"q": word})
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()
+        assert {(r["type"], r["id"]) for r in results} == {
+            ("post", in_title["id"]), ("post", in_content["id"]), ("forum", forum["id"])
+        }
+        post_ids = [r["id"] for r in results if r["type"] == "post"]
+        assert post_ids == [in_title["id"], in_content["id"]]
+
+        forums_only = client.get("/search", params={"q": word, "type": "forums"}).json()
+        assert [r["id"] for r in forums_only] == [forum["id"]]
+
+    def test_search_prefix_and_pagination(self, client, user_headers):
+        word = f"zq{shortuuid.uuid()[:8].lower()}"
+        for i in range(3):
+            client.post("/posts", data={"title": f"{word} {i}", "content": "content"}, headers=user_headers)
+        first = client.get("/search", params={"q": word[:-2], "type": "posts", "limit": 2})
+        assert len(first.json()) == 2
+        second = client.get(
+            "/search", params={"q": word[:-2], "type": "posts", "limit": 2, "cursor": first.headers["X-Next-Cursor"]}
+        )
+        assert len(second.json()) == 1
+        seen = {r["id"] for r in first.json()} | {r["id"] for r in second.json()}
+        assert len(seen) == 3
+
+    def test_get_posts_search_uses_index(self, client, user_headers):
+        word = f"zq{shortuuid.uuid()[:8].lower()}"
+        created = client.post("/posts", data={"title": "Plain title", "content": "x"}, headers=user_headers).json()
+        client.post("/posts", data={"title": f"{word} titled", "content": "x"}, headers=user_headers)
+        response = client.get("/posts", params={"search": word})
+        assert [p["title"] for p in response.json()] == [f"{word} titled"]
+        by_author = client.get("/posts", params={"search": created["author"], "limit": 100})
+        assert created["id"] in {p["id"] for p in by_author.json()}
@@ -0,0 +1,35 @@
+import pytest
+from app.services.similarity import StatsSimilarityIndex
+
+
+def build_index(posts):
+    index = StatsSimilarityIndex(initial_capacity=1)
+    index._loaded = True
+    for post_id, stats in posts.items():
+        index.upsert(post_id, stats)
+    return index
+
+
+class TestStatsSimilarityIndex:
+    def test_euclidean_uses_shared_keys_only(self):
+        index = build_index({
+            "a": {"speed": 8, "spin": 8},
+            "b": {"speed": 9},
+            "c": {"speed": 5, "spin": 5},
+            "d": {"control": 7},
+        })
+        assert index.nearest("a", k=10) == [("b", pytest.approx(1.0)), ("c", pytest.approx(18 ** 0.5))]
+
+    def test_cosine_distance(self):
+        index = build_index({"a": {"x": 1, "y": 0.0}, "b": {"x": 2, "y": 0.0}, "c": {"x": 0.0, "y": 3}})
+        result = dict(index.nearest("a", k=2, metric="cosine"))
+        assert result["b"] == pytest.approx(0.0)
+        assert result["c"] == pytest.approx(1.0)
+
+    def test_remove_and_update_keep_rows_consistent(self):
+        index = build_index({"a": {"x": 5}, "b": {"x": 6}, "c": {"x": 9}})
+        index.remove("a")
+        index.upsert("c", {"x": 6.5})
+        assert index.size == 2
+        assert index.nearest("b", k=5) == [("c", pytest.approx(0.5))]
+        assert index.nearest("a", k=5) == []
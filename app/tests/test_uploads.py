@@ -0,0 +1,58 @@
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.services.uploads import sniff_image_type, spool_image_upload
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 64
+WEBP = b"RIFF\x00\x00\x00\x00WEBPVP8 " + b"\x00" * 64
+
+
+def spool(data, **kwargs):
+    return asyncio.run(spool_image_upload(UploadFile(io.BytesIO(data), filename="photo.bin"), **kwargs))
+
+
+class TestImageUploads:
+    def test_sniff_image_type(self):
+        assert sniff_image_type(PNG) == "image/png"
+        assert sniff_image_type(JPEG) == "image/jpeg"
+        assert sniff_image_type(WEBP) == "image/webp"
+        assert sniff_image_type(b"GIF89a") is None
+
+    def test_spool_hashes_and_takes_over_the_upload_file(self):
+        data = PNG + os.urandom(4096)
+        body = io.BytesIO(data)
+        upload = UploadFile(body, filename="photo.bin")
+        spooled = asyncio.run(spool_image_upload(upload, chunk_size=1000))
+        try:
+            assert spooled.content_type == "image/png"
+            assert spooled.size == len(data)
+            assert spooled.sha256 == hashlib.sha256(data).hexdigest()
+            assert spooled.content_key == f"{spooled.sha256}.png"
+            assert spooled.file is body and upload.file is not body
+            assert spooled.rewind().read() == data
+            asyncio.run(upload.close())
+            assert not body.closed
+        finally:
+            spooled.discard()
+        assert body.closed
+
+    def test_spool_rejects_oversize_upload(self):
+        with pytest.raises(HTTPException) as exc:
+            spool(JPEG + b"\x00" * 5000, max_size=4096, chunk_size=1024)
+        assert exc.value.status_code == 400
+
+    def test_create_post_sniffs_type_instead_of_trusting_content_type(self, client, user_headers):
+        response = client.post(
+            "/posts",
+            data={"title": "Fake image", "content": "x"},
+            files={"image": ("fake.png", b"not an image at all", "image/png")},
+            headers=user_headers,
+        )
+        assert response.status_code == 400
+        assert "Unsupported file type" in response.json()["detail"]
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Recompute the denormalized like counters of posts, forums and comments (on
+posts and forums alike) from their like tables and report the drift that was corrected.
+Safe to run against a live database; each table is fixed with one UPDATE.
+"""
+
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Add the app directory to the path
+sys.path.append(str(Path(__file__).parent / "app"))
+
+load_dotenv()
+
+from app.config.postgres_config import SessionLocal
+from app.services.likes import reconcile_like_counts
+
+
+def main():
+    """Reconcile all like counters and print a per-table drift report"""
+    db = SessionLocal()
+    try:
+        report = reconcile_like_counts(db)
+    finally:
+        db.close()
+
+    for table, result in report.items():
+        print(f"{table}: {result['rows']} rows corrected, total drift {result['drift']}")
+    if not any(result["rows"] for result in report.values()):
+        print("✓ All like counters are consistent")
+
+
+if __name__ == "__main__":
+    main()